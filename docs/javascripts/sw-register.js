@@ -0,0 +1,12 @@
+/* Регистрация service worker для офлайн-доступа к документации (см. scripts/precache.py) */
+(function () {
+  if (!("serviceWorker" in navigator))
+    return;
+
+  var script = document.currentScript;
+  var swUrl = new URL("../sw.js", script.src);
+
+  window.addEventListener("load", function () {
+    navigator.serviceWorker.register(swUrl.href, { scope: new URL("./", swUrl).href });
+  });
+})();
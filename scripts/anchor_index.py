@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Единый индекс заголовков и якорей инструкции
+
+Строится одним проходом по всем частям и заменяет ручные таблицы
+ссылок: anchor_mapping в MkDocsConverter, канонические записи
+hyperlink_mapping.json и ручное оглавление add_table_of_contents.
+
+Для каждого заголовка (#, ##, ###) вычисляются:
+- slug — такой же, как у MkDocs (toc + slugify_unicode в mkdocs.yml)
+- bookmark — имя закладки Word для generate_instruction.py, уникальное
+  в документе (повторы заголовков — с суффиксом _1, _2, как у slug)
+- page — страница сайта из file_mapping
+
+hyperlink_mapping.json теперь хранит только синонимы якорей
+("#звонки" → "Аналитика - Коммуникации"); якоря самих заголовков
+выводятся из текста частей. Неразрешённые ссылки собираются в dangling.
+
+Проверка ссылок:
+    python scripts/anchor_index.py
+"""
+
+import re
+import sys
+import json
+from collections import namedtuple
+from pathlib import Path
+
+
+HEADING_RE = re.compile(r'^(#{1,3})\s+(.+?)\s*#*\s*$')
+LINK_RE = re.compile(r'\[([^\]]+)\]\((#[^)]+)\)')
+
+Heading = namedtuple('Heading', 'title level part page slug bookmark')
+
+
+def slugify(title, separator='-'):
+    """Slug заголовка как у markdown.extensions.toc.slugify_unicode"""
+    value = re.sub(r'[^\w\s-]', '', title).strip().lower()
+    return re.sub(r'[{}\s]+'.format(separator), separator, value)
+
+
+def bookmark_id(title):
+    """Имя закладки Word для заголовка"""
+    return title.replace(" ", "_").replace(".", "_").replace("-", "_").replace("(", "").replace(")", "")
+
+
+def part_name_of(path):
+    """Имя части по файлу: X.md и X_NEW.md — это часть X (см. read_part)"""
+    stem = Path(path).stem
+    return stem[:-len("_NEW")] if stem.endswith("_NEW") else stem
+
+
+def read_part(parts_path, part_name):
+    """Текст части (версия _NEW в приоритете) или None"""
+    for name in (f"{part_name}_NEW.md", f"{part_name}.md"):
+        part_file = Path(parts_path) / name
+        if part_file.exists():
+            with open(part_file, 'r', encoding='utf-8') as f:
+                return f.read()
+    return None
+
+
+def iter_headings(content):
+    """Заголовки части вне блоков кода: (номер строки, уровень, заголовок, slug)"""
+    page_slugs = set()
+    in_code_block = False
+
+    for line_number, line in enumerate(content.split('\n')):
+        if line.strip().startswith('```'):
+            in_code_block = not in_code_block
+            continue
+        if in_code_block:
+            continue
+
+        match = HEADING_RE.match(line)
+        if not match:
+            continue
+
+        level = len(match.group(1))
+        title = match.group(2).strip()
+
+        # Уникальный slug в пределах страницы, как markdown.extensions.toc.unique
+        slug = base_slug = slugify(title)
+        counter = 0
+        while slug in page_slugs:
+            counter += 1
+            slug = f"{base_slug}_{counter}"
+        page_slugs.add(slug)
+        yield line_number, level, title, slug
+
+
+def load_aliases(mapping_file):
+    """Синонимы якорей из hyperlink_mapping.json: якорь → заголовок"""
+    mapping_file = Path(mapping_file)
+    if not mapping_file.exists():
+        return {}
+    with open(mapping_file, 'r', encoding='utf-8') as f:
+        return json.load(f).get('hyperlink_mapping', {})
+
+
+class AnchorIndex:
+    def __init__(self):
+        self.anchors = {}      # '#slug' → Heading
+        self.titles = {}       # заголовок → Heading
+        self.part_titles = {}  # часть → заголовок первого уровня
+        self.dangling = []     # (часть, якорь) неразрешённых ссылок
+        self.removed = set()   # якоря заголовков, вырезанных из сборки роли
+        self.bookmarks = {}    # (часть, заголовок) → закладки его вхождений по порядку
+        self.bookmark_names = set()
+
+    @classmethod
+    def build(cls, parts, page_for_part=None, aliases=None, full_parts=None):
+        """Строит индекс по {часть: текст} в порядке частей
+
+        page_for_part — {часть: путь в docs/}, aliases — {якорь: заголовок}.
+        full_parts — {часть: текст} полной сборки для сборки роли: якоря,
+        которые есть только в ней, попадают в removed, а ссылки на них
+        становятся простым текстом, а не битыми ссылками.
+        """
+        index = cls()
+        page_for_part = page_for_part or {}
+
+        for part_name, content in parts.items():
+            if content is not None:
+                index.add_part(part_name, content, page_for_part.get(part_name))
+
+        # Синонимы явно заданы человеком и важнее совпавших подзаголовков
+        for anchor, title in (aliases or {}).items():
+            heading = index.titles.get(title)
+            if heading is not None:
+                index.anchors[anchor] = heading
+
+        if full_parts is not None:
+            full = cls.build(full_parts, aliases=aliases)
+            index.removed = set(full.anchors) - set(index.anchors)
+
+        return index
+
+    @classmethod
+    def from_directory(cls, parts_path, part_names, page_for_part=None, aliases_file=None):
+        """Читает части с диска и строит индекс"""
+        parts = {name: read_part(parts_path, name) for name in part_names}
+        aliases = load_aliases(aliases_file) if aliases_file else {}
+        return cls.build(parts, page_for_part, aliases)
+
+    def add_part(self, part_name, content, page=None):
+        """Добавляет заголовки одной части"""
+        for _, level, title, slug in iter_headings(content):
+            # Уникальная закладка в пределах документа, тем же способом, что и slug
+            bookmark = base_bookmark = bookmark_id(title)
+            counter = 0
+            while bookmark in self.bookmark_names:
+                counter += 1
+                bookmark = f"{base_bookmark}_{counter}"
+            self.bookmark_names.add(bookmark)
+            self.bookmarks.setdefault((part_name, title), []).append(bookmark)
+
+            heading = Heading(title, level, part_name, page, slug, bookmark)
+            self.anchors.setdefault(f"#{slug}", heading)
+            self.titles.setdefault(title, heading)
+            if level == 1:
+                self.part_titles.setdefault(part_name, title)
+
+    def resolve(self, anchor, part_name=None):
+        """Якорь → Heading; неразрешённые якоря (кроме вырезанных) записываются в dangling"""
+        heading = self.anchors.get(anchor)
+        if heading is None and anchor not in self.removed:
+            self.dangling.append((part_name, anchor))
+        return heading
+
+    def page_link(self, anchor, current_page, part_name=None):
+        """Относительная ссылка MkDocs на якорь из current_page или None"""
+        heading = self.resolve(anchor, part_name)
+        if heading is None or heading.page is None:
+            return None
+
+        if heading.page == current_page:
+            return f"#{heading.slug}"
+
+        link = '../' * current_page.count('/') + heading.page
+        if heading.level > 1:
+            link += f"#{heading.slug}"
+        return link
+
+    def check_links(self, parts):
+        """Проверяет все ссылки [...](#якорь) в {часть: текст}"""
+        for part_name, content in parts.items():
+            if content is None:
+                continue
+            for _, anchor in LINK_RE.findall(content):
+                self.resolve(anchor, part_name)
+        return self.dangling
+
+    def report_dangling(self):
+        """Печатает неразрешённые ссылки (без повторов)"""
+        seen = sorted(set(self.dangling), key=lambda item: (item[0] or '', item[1]))
+        if not seen:
+            return
+        print(f"Неразрешённые ссылки: {len(seen)}")
+        for part_name, anchor in seen:
+            print(f"  {part_name or '?'}: {anchor}")
+
+
+def main():
+    from convert_to_mkdocs import MkDocsConverter
+
+    base_path = Path(__file__).parent.parent
+    converter = MkDocsConverter(base_path)
+    parts = {name: read_part(converter.source_path, name) for name in converter.file_mapping}
+
+    index = converter.anchor_index
+    index.check_links(parts)
+
+    print(f"Заголовков: {len(index.titles)}, якорей: {len(index.anchors)}")
+    index.report_dangling()
+    if index.dangling:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Бенчмарк генераторов DOCX и MkDocs
+
+Этапы:
+- parse          — чтение частей и построение индекса заголовков
+- docx_render    — create_document + оглавление + add_section_to_doc
+- docx_save      — save_document (воспроизводимый write_docx) во временный файл
+- mkdocs_convert — convert_files (convert_content + запись страниц)
+- image_copy     — copy_screenshots в пустой каталог
+
+Отдельно замеряется запуск: импорт модулей и generate_instruction.py --list
+в свежем интерпретаторе (startup в JSON).
+
+Корпуса:
+- scaled (по умолчанию) — реальная инструкция (x1) и её копии (x10, x100):
+  части повторяются с уникальными заголовками, скриншоты общие
+- synthetic — synthetic_corpus.py: сгенерированные части и заглушки
+  скриншотов, число скриншотов растёт вместе с масштабом
+Всё работает офлайн во временном каталоге, исходное дерево не меняется.
+
+Результаты пишутся в JSON, чтобы сравнивать коммиты:
+    python scripts/benchmark.py --scales 1 10 100 --output bench.json
+    python scripts/benchmark.py --corpus synthetic --scales 1 10 50
+    python scripts/benchmark.py --compare old.json new.json
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import tempfile
+import statistics
+import subprocess
+from contextlib import redirect_stdout
+from datetime import datetime
+from pathlib import Path
+
+from anchor_index import AnchorIndex, load_aliases, read_part
+from convert_to_mkdocs import MkDocsConverter
+from generate_instruction import InstructionGenerator
+from synthetic_corpus import SyntheticCorpus
+
+
+STAGES = ["parse", "docx_render", "docx_save", "mkdocs_convert", "image_copy"]
+
+# Запуск в свежем интерпретаторе: python — нижняя граница для остальных
+STARTUP = {
+    "python": ["-c", "pass"],
+    "import_docx": ["-c", "import docx"],
+    "import_generate_instruction": ["-c", "import generate_instruction"],
+    "import_convert_to_mkdocs": ["-c", "import convert_to_mkdocs"],
+    "list": ["generate_instruction.py", "--list"],
+}
+
+
+class ScaledCorpus:
+    """Реальные части, повторённые scale раз, во временном каталоге"""
+
+    def __init__(self, base_path, scale, work_path):
+        self.base_path = Path(base_path)
+        self.scale = scale
+        self.parts_path = Path(work_path) / "Части_инструкции"
+        self.parts_path.mkdir(parents=True)
+
+        # Исходная раскладка берётся из генераторов
+        generator = InstructionGenerator(self.base_path, screenshot_mapping={}, parts={}, anchor_index=AnchorIndex())
+        converter = MkDocsConverter(self.base_path, screenshot_mapping={}, parts={}, anchor_index=AnchorIndex())
+
+        self.sections = {}
+        self.file_mapping = {}
+        for copy in range(scale):
+            suffix = f"__{copy}" if copy else ""
+            for key, info in generator.sections.items():
+                section = self.sections.setdefault(f"{key}{suffix}", {"title": f"{info['title']}{suffix}", "parts": []})
+                for part_name in info['parts']:
+                    content = read_part(generator.parts_path, part_name)
+                    if content is None:
+                        continue
+                    if copy:
+                        # Уникальные заголовки, чтобы якоря копий не совпадали
+                        content = "\n".join(
+                            f"{line} ({copy})" if line.startswith('#') else line
+                            for line in content.split('\n')
+                        )
+                    name = f"{part_name}{suffix}"
+                    (self.parts_path / f"{name}.md").write_text(content, encoding='utf-8')
+                    section["parts"].append(name)
+                    if part_name in converter.file_mapping:
+                        prefix = f"copy{copy}/" if copy else ""
+                        self.file_mapping[name] = prefix + converter.file_mapping[part_name]
+
+    @property
+    def part_names(self):
+        return [part for info in self.sections.values() for part in info['parts']]
+
+    def size(self):
+        return sum(path.stat().st_size for path in self.parts_path.glob('*.md'))
+
+
+def measure_command(args, repeat, cwd):
+    """Время запуска python с args (повторы, без вывода)"""
+    wall = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, *args], cwd=cwd, stdout=subprocess.DEVNULL, check=True)
+        wall.append(time.perf_counter() - started)
+    return {"wall_min": min(wall), "wall_median": statistics.median(wall), "runs": repeat}
+
+
+def measure(func, repeat):
+    """Запускает func repeat раз; возвращает статистику по времени"""
+    wall, cpu = [], []
+    result = None
+    for _ in range(repeat):
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        with redirect_stdout(io.StringIO()):
+            result = func()
+        wall.append(time.perf_counter() - wall_start)
+        cpu.append(time.process_time() - cpu_start)
+    return result, {
+        "wall_min": min(wall),
+        "wall_median": statistics.median(wall),
+        "cpu_median": statistics.median(cpu),
+        "runs": repeat,
+    }
+
+
+class Benchmark:
+    def __init__(self, base_path, repeat=3, corpus="scaled"):
+        self.base_path = Path(base_path)
+        self.repeat = repeat
+        self.corpus = corpus
+        self.aliases = load_aliases(self.base_path / "hyperlink_mapping.json")
+
+    def make_corpus(self, scale, work_path):
+        if self.corpus == "synthetic":
+            return SyntheticCorpus(work_path, scale=scale).generate()
+        return ScaledCorpus(self.base_path, scale, work_path)
+
+    def run_scale(self, scale):
+        """Все этапы для одного масштаба корпуса"""
+        with tempfile.TemporaryDirectory(prefix="rop-bench-") as tmp:
+            tmp = Path(tmp)
+            corpus = self.make_corpus(scale, tmp / "corpus")
+            repeat = self.repeat if scale == 1 else 1
+            results = {}
+
+            def parse():
+                parts = {name: read_part(corpus.parts_path, name) for name in corpus.part_names}
+                return parts, AnchorIndex.build(parts, corpus.file_mapping, self.aliases)
+
+            (parts, index), results["parse"] = measure(parse, repeat)
+
+            generator = InstructionGenerator(corpus.base_path, parts=parts, anchor_index=index)
+            generator.sections = corpus.sections
+
+            def docx_render():
+                generator.progress = {"completed_sections": [], "completed_parts": []}
+                doc = generator.create_document()
+                generator.add_table_of_contents(doc)
+                for key in generator.sections:
+                    generator.add_section_to_doc(doc, key, force_regenerate=True)
+                return doc
+
+            doc, results["docx_render"] = measure(docx_render, repeat)
+
+            docx_file = tmp / "bench.docx"
+            _, results["docx_save"] = measure(lambda: generator.save_document(doc, docx_file), repeat)
+            results["docx_save"]["bytes"] = docx_file.stat().st_size
+
+            converter = MkDocsConverter(corpus.base_path, parts=parts, anchor_index=index)
+            converter.file_mapping = corpus.file_mapping
+
+            def mkdocs_convert():
+                converter.docs_path = Path(tempfile.mkdtemp(dir=tmp))
+                return converter.convert_files()
+
+            _, results["mkdocs_convert"] = measure(mkdocs_convert, repeat)
+
+            def image_copy():
+                converter.images_path = Path(tempfile.mkdtemp(dir=tmp)) / "images"
+                converter._image_names = None
+                converter.copy_screenshots()
+
+            _, results["image_copy"] = measure(image_copy, repeat)
+
+            return {
+                "parts": len(corpus.part_names),
+                "markdown_bytes": corpus.size(),
+                "stages": results,
+            }
+
+    def run(self, scales):
+        report = {
+            "timestamp": datetime.now().isoformat(timespec='seconds'),
+            "commit": git_commit(self.base_path),
+            "corpus": self.corpus,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "startup": {},
+            "scales": {},
+        }
+
+        print("Запуск...")
+        scripts_path = Path(__file__).parent
+        for name, args in STARTUP.items():
+            report["startup"][name] = result = measure_command(args, max(self.repeat, 5), scripts_path)
+            print(f"  {name:<28} {result['wall_median'] * 1000:8.1f} мс")
+
+        for scale in scales:
+            print(f"Масштаб x{scale}...")
+            report["scales"][f"x{scale}"] = result = self.run_scale(scale)
+            for stage in STAGES:
+                print(f"  {stage:<16} {result['stages'][stage]['wall_median']:8.3f} с")
+        return report
+
+
+def git_commit(base_path):
+    """Текущий коммит или None вне git"""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=base_path, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(old_file, new_file):
+    """Печатает изменение медианного времени по этапам"""
+    with open(old_file, 'r', encoding='utf-8') as f:
+        old = json.load(f)
+    with open(new_file, 'r', encoding='utf-8') as f:
+        new = json.load(f)
+
+    print(f"{old.get('commit')} → {new.get('commit')}")
+    if old.get("startup") and new.get("startup"):
+        print("startup:")
+        for name, result in new["startup"].items():
+            if name in old["startup"]:
+                before, after = old["startup"][name]["wall_median"], result["wall_median"]
+                print(f"  {name:<28} {before * 1000:8.1f} → {after * 1000:8.1f} мс")
+    for scale, new_result in new["scales"].items():
+        old_result = old["scales"].get(scale)
+        if old_result is None:
+            continue
+        print(f"{scale}:")
+        for stage in STAGES:
+            before = old_result["stages"].get(stage, {}).get("wall_median")
+            after = new_result["stages"].get(stage, {}).get("wall_median")
+            if before is None or after is None:
+                continue
+            change = (after - before) / before * 100 if before else 0.0
+            print(f"  {stage:<16} {before:8.3f} → {after:8.3f} с  ({change:+.1f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Бенчмарк генераторов инструкции')
+    parser.add_argument('--scales', nargs='+', type=int, default=[1, 10, 100], help='Масштабы корпуса')
+    parser.add_argument('--corpus', choices=['scaled', 'synthetic'], default='scaled', help='Источник корпуса')
+    parser.add_argument('--repeat', type=int, default=3, help='Повторов для x1 (большие масштабы — 1 раз)')
+    parser.add_argument('--output', help='JSON с результатами (по умолчанию benchmarks/<коммит>.json)')
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'), help='Сравнить два JSON с результатами')
+
+    args = parser.parse_args()
+    base_path = Path(__file__).parent.parent
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    report = Benchmark(base_path, repeat=args.repeat, corpus=args.corpus).run(args.scales)
+
+    name = report['commit'] or 'local'
+    if args.corpus != 'scaled':
+        name += f"-{args.corpus}"
+    output = Path(args.output) if args.output else base_path / "benchmarks" / f"{name}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"Результаты: {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Сборка релиза: DOCX, дерево MkDocs и индекс справки одним графом задач
+
+Вместо последовательного запуска generate_instruction.py и
+convert_to_mkdocs.py (каждый сам читает маппинги, части и скриншоты)
+работает небольшой граф задач:
+
+    mappings ──┬── images ─────┬── docx
+               └──┐            └── site
+    parts ────── anchors ──────┘
+      └─────────────────────────── help (вместе с mappings)
+
+    mkdocs — сайт из тех же mappings, parts и images (mkdocs_hooks.build_site)
+
+Задачи выполняются на пуле процессов: docx, site, help и mkdocs — чистый
+Python, в потоках их сериализовал бы GIL. Независимые задачи идут
+параллельно (по ядру на задачу), результаты передаются между задачами
+через пул. Вывод задачи копится и печатается целиком, когда она закончилась.
+На одном ядре выигрыша нет: время как у последовательного запуска.
+
+Использование:
+    python scripts/build.py                 # DOCX + docs/
+    python scripts/build.py --only docx     # только DOCX
+    python scripts/build.py --only help     # только индекс справки help_index.db
+    python scripts/build.py --mkdocs        # плюс mkdocs build на тех же входах
+"""
+
+import io
+import sys
+import json
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from contextlib import redirect_stdout
+from functools import partial
+from pathlib import Path
+
+from anchor_index import AnchorIndex, load_aliases, read_part
+from convert_to_mkdocs import MkDocsConverter
+from generate_instruction import InstructionGenerator
+from help_index import DEFAULT_FILE as HELP_INDEX_FILE, HelpIndex
+
+
+def run_task(func, kwargs):
+    """Задача в процессе пула: (результат, ошибка, вывод, секунды)"""
+    started = time.perf_counter()
+    log = io.StringIO()
+    result = error = None
+    with redirect_stdout(log):
+        try:
+            result = func(**kwargs)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+    return result, error, log.getvalue(), time.perf_counter() - started
+
+
+class BuildGraph:
+    """Граф задач: задача запускается, когда готовы все её зависимости
+
+    Функции задач выполняются в других процессах, поэтому они должны
+    сериализоваться pickle: функции модуля или functools.partial от них.
+    """
+
+    def __init__(self, jobs=None):
+        self.jobs = jobs
+        self.tasks = {}
+        self.results = {}
+        self.timings = {}
+        self.errors = {}
+
+    def add(self, name, func, deps=()):
+        """Регистрирует задачу f(**результаты зависимостей)"""
+        self.tasks[name] = (func, tuple(deps))
+
+    def _required(self, targets):
+        """Задачи, нужные для targets, вместе с зависимостями"""
+        required = set()
+        stack = list(targets)
+        while stack:
+            name = stack.pop()
+            if name not in required:
+                required.add(name)
+                stack.extend(self.tasks[name][1])
+        return required
+
+    def run(self, targets=None):
+        """Выполняет граф; возвращает {задача: ошибка} для упавших задач"""
+        pending = self._required(targets or list(self.tasks))
+        running = {}
+
+        with ProcessPoolExecutor(max_workers=self.jobs) as executor:
+            while pending or running:
+                for name in sorted(pending):
+                    func, deps = self.tasks[name]
+                    if any(dep in self.errors for dep in deps):
+                        self.errors[name] = "пропущена: упала зависимость"
+                        pending.discard(name)
+                    elif all(dep in self.results for dep in deps):
+                        kwargs = {dep: self.results[dep] for dep in deps}
+                        running[executor.submit(run_task, func, kwargs)] = name
+                        pending.discard(name)
+
+                if not running:
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        result, error, log, seconds = future.result()
+                    except Exception as e:
+                        result, error, log, seconds = None, f"{type(e).__name__}: {e}", "", 0.0
+                    if log:
+                        print(f"--- {name} ---")
+                        print(log, end='' if log.endswith('\n') else '\n')
+                    self.timings[name] = seconds
+                    if error is None:
+                        self.results[name] = result
+                    else:
+                        self.errors[name] = error
+
+        return self.errors
+
+
+def task_mappings(base_path):
+    with open(base_path / "scripts" / "screenshot_mapping.json", 'r', encoding='utf-8') as f:
+        screenshot_mapping = json.load(f).get('screenshot_mapping', {})
+    aliases = load_aliases(base_path / "hyperlink_mapping.json")
+    return {"screenshots": screenshot_mapping, "aliases": aliases}
+
+
+def task_parts(base_path):
+    # Состав частей и страниц берётся из самих генераторов
+    converter = MkDocsConverter(base_path, screenshot_mapping={}, parts={}, anchor_index=AnchorIndex())
+    generator = InstructionGenerator(base_path, screenshot_mapping={}, parts={}, anchor_index=AnchorIndex())
+    names = list(converter.file_mapping)
+    for info in generator.sections.values():
+        names.extend(part for part in info['parts'] if part not in names)
+    return {
+        "file_mapping": converter.file_mapping,
+        "texts": {name: read_part(converter.source_path, name) for name in names},
+    }
+
+
+def task_images(base_path, mappings):
+    data = {}
+    for rel_path in mappings["screenshots"].values():
+        path = base_path / rel_path
+        if path.exists():
+            data[path] = path.read_bytes()
+    return data
+
+
+def task_anchors(base_path, mappings, parts):
+    return AnchorIndex.build(parts["texts"], parts["file_mapping"], mappings["aliases"])
+
+
+def task_docx(base_path, mappings, parts, anchors, images):
+    generator = InstructionGenerator(
+        base_path,
+        screenshot_mapping=mappings["screenshots"],
+        parts=parts["texts"],
+        anchor_index=anchors,
+        image_data=images,
+    )
+    generator.generate(force_regenerate=True)
+    return generator.output_path
+
+
+def task_site(base_path, mappings, parts, anchors, images):
+    converter = MkDocsConverter(
+        base_path,
+        screenshot_mapping=mappings["screenshots"],
+        parts=parts["texts"],
+        anchor_index=anchors,
+        image_data=images,
+    )
+    errors = converter.convert_all(jobs=1)
+    if errors:
+        raise RuntimeError(f"ошибок конвертации: {len(errors)}")
+    return converter.docs_path
+
+
+def task_help(base_path, mappings, parts):
+    index = HelpIndex(base_path / HELP_INDEX_FILE)
+    try:
+        index.update(base_path, parts=parts["texts"], screenshot_mapping=mappings["screenshots"])
+    finally:
+        index.close()
+    return index.db_path
+
+
+def task_mkdocs(base_path, mappings, parts, images):
+    from mkdocs_hooks import build_site
+
+    inputs = {"screenshot_mapping": mappings["screenshots"], "parts": parts["texts"], "image_data": images}
+    return build_site(base_path / "mkdocs.yml", inputs)
+
+
+class ReleaseBuild:
+    def __init__(self, base_path, jobs=None):
+        self.base_path = Path(base_path)
+        self.graph = BuildGraph(jobs)
+        self.define_tasks()
+
+    def define_tasks(self):
+        graph = self.graph
+        base_path = self.base_path
+
+        graph.add("mappings", partial(task_mappings, base_path))
+        graph.add("parts", partial(task_parts, base_path))
+        graph.add("images", partial(task_images, base_path), deps=["mappings"])
+        graph.add("anchors", partial(task_anchors, base_path), deps=["mappings", "parts"])
+        graph.add("docx", partial(task_docx, base_path), deps=["mappings", "parts", "anchors", "images"])
+        graph.add("site", partial(task_site, base_path), deps=["mappings", "parts", "anchors", "images"])
+        graph.add("help", partial(task_help, base_path), deps=["mappings", "parts"])
+        graph.add("mkdocs", partial(task_mkdocs, base_path), deps=["mappings", "parts", "images"])
+
+    def run(self, targets):
+        started = time.perf_counter()
+        errors = self.graph.run(targets)
+
+        print("=" * 60)
+        print("Время задач:")
+        for name, seconds in sorted(self.graph.timings.items(), key=lambda item: -item[1]):
+            print(f"  {name:<10} {seconds:7.2f} с")
+        print(f"Всего: {time.perf_counter() - started:.2f} с")
+
+        if errors:
+            print("ОШИБКИ:")
+            for name, error in errors.items():
+                print(f"  {name}: {error}")
+        print("=" * 60)
+        return errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Сборка DOCX, сайта и индекса справки одним графом задач')
+    parser.add_argument('--only', choices=['docx', 'site', 'help'], help='Собрать только одну цель')
+    parser.add_argument('--mkdocs', action='store_true', help='Дополнительно выполнить mkdocs build')
+    parser.add_argument('--jobs', '-j', type=int, default=None, help='Число процессов для задач (по умолчанию по числу ядер)')
+
+    args = parser.parse_args()
+
+    targets = [args.only] if args.only else ['docx', 'site', 'help']
+    if args.mkdocs:
+        targets.append('mkdocs')
+
+    base_path = Path(__file__).parent.parent
+    errors = ReleaseBuild(base_path, jobs=args.jobs).run(targets)
+    if errors:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,478 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Демон сборки с тёплыми кешами
+
+Каждый запуск generate_instruction.py платит за одно и то же: старт
+Python, импорт python-docx, чтение маппингов, сборку стилей и чтение
+СКРИНШОТЫ/. Демон держит всё это в памяти между сборками:
+- маппинг скриншотов, синонимы якорей, тексты частей и байты скриншотов
+  по корням редакций (тот же кеш, что у build_editions)
+- шаблоны стилей DOCX по наборам цветов
+- конвертеры MkDocs для предпросмотра страниц
+
+Исходники опрашиваются раз в --interval секунд (и перед каждой сборкой):
+изменённая часть или скриншот перечитываются, правка маппинга сбрасывает
+корень редакции, правка editions.json — весь кеш. Правка самих скриптов
+не подхватывается: /status покажет, что демон пора перезапустить.
+
+Запросы по HTTP на 127.0.0.1 или через Unix-сокет:
+    python scripts/build_daemon.py                       # http://127.0.0.1:8765
+    python scripts/build_daemon.py --socket /tmp/rop-build.sock
+
+    curl -X POST 'http://127.0.0.1:8765/build?target=docx'
+    curl -X POST 'http://127.0.0.1:8765/build?target=docx&edition=onprem&role=manager'
+    curl -X POST 'http://127.0.0.1:8765/build?target=docx&sections=tests,faq'
+    curl -X POST 'http://127.0.0.1:8765/build?target=site'
+    curl -G 'http://127.0.0.1:8765/page' --data-urlencode 'part=04_Тесты'   # страница MkDocs (markdown)
+    curl --unix-socket /tmp/rop-build.sock http://localhost/status
+
+    python scripts/build_daemon.py --check     # правка части X_NEW.md видна в следующей сборке
+
+Сборка отдельных разделов (sections) пишется рядом с документом в
+<документ>.<разделы>.docx, например Финальная_инструкция.tests+faq.docx,
+и не заменяет полный документ.
+
+Сборка без изменений с прошлого раза (тот же документ на диске, ни одного
+изменённого исходника) сразу отвечает "unchanged".
+"""
+
+import io
+import os
+import json
+import time
+import shutil
+import zipfile
+import tempfile
+import signal
+import sys
+import threading
+import argparse
+import traceback
+import socketserver
+from contextlib import redirect_stdout
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+from anchor_index import part_name_of
+from generate_instruction import DEFAULT_EDITION, EDITIONS_FILE, build_editions, import_docx, load_editions
+from roles import role_sections
+from stage_timer import StageTimer
+
+
+DEFAULT_PORT = 8765
+DEFAULT_INTERVAL = 1.0
+
+
+def file_signature(path):
+    """(mtime, размер) файла или None, если его нет"""
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class SourceWatcher:
+    """Опрос исходников по mtime: возвращает изменённые, новые и удалённые файлы"""
+
+    def __init__(self, base_path):
+        self.base_path = Path(base_path)
+        self.lock = threading.Lock()
+        self.snapshot = self.scan()
+
+    def watched_files(self):
+        scripts_path = self.base_path / "scripts"
+        files = [EDITIONS_FILE, *scripts_path.glob("*.py")]
+        for root in {self.base_path / profile['root'] for profile in load_editions().values()}:
+            files.append(root / "scripts" / "screenshot_mapping.json")
+            files.append(root / "hyperlink_mapping.json")
+            files.extend((root / "Части_инструкции").glob("*.md"))
+            for dir_path, _, names in os.walk(root / "СКРИНШОТЫ"):
+                files.extend(Path(dir_path) / name for name in names)
+        return files
+
+    def scan(self):
+        return {path: file_signature(path) for path in self.watched_files()}
+
+    def changes(self):
+        """Файлы, изменившиеся с прошлого вызова"""
+        with self.lock:
+            snapshot = self.scan()
+            changed = [
+                path for path in snapshot.keys() | self.snapshot.keys()
+                if snapshot.get(path) != self.snapshot.get(path)
+            ]
+            self.snapshot = snapshot
+        return sorted(changed)
+
+
+class WarmCache:
+    """Входы сборки в памяти и их сброс по изменённым файлам"""
+
+    def __init__(self, base_path):
+        self.base_path = Path(base_path)
+        self.shared = {}       # корень редакции → {screenshots, aliases, parts, images} (build_editions)
+        self.styles = {}       # цвета → шаблон со стилями (InstructionGenerator.style_cache)
+        self.converters = {}   # роль → MkDocsConverter для /page
+        self.generation = 0    # растёт при каждом сбросе
+        self.code_changed = set()  # изменённые скрипты: нужен перезапуск
+
+    def invalidate(self, paths):
+        """Сбрасывает то, что зависит от изменённых файлов"""
+        if not paths:
+            return
+        self.generation += 1
+        self.converters.clear()
+        for path in paths:
+            if path == EDITIONS_FILE:
+                self.shared.clear()
+                self.styles.clear()
+                continue
+            if path.suffix == '.py':
+                self.code_changed.add(path.name)
+                continue
+
+            for root, inputs in list(self.shared.items()):
+                if path in (root / "scripts" / "screenshot_mapping.json", root / "hyperlink_mapping.json"):
+                    del self.shared[root]
+                elif path.parent == root / "Части_инструкции":
+                    inputs["parts"].pop(part_name_of(path), None)
+                elif path in inputs["images"]:
+                    if path.exists():
+                        inputs["images"][path] = path.read_bytes()
+                    else:
+                        del inputs["images"][path]
+
+    def stats(self):
+        return {
+            "generation": self.generation,
+            "roots": {
+                str(root.relative_to(self.base_path)): {
+                    "parts": len(inputs["parts"]),
+                    "images": len(inputs["images"]),
+                    "image_bytes": sum(len(data) for data in inputs["images"].values()),
+                }
+                for root, inputs in self.shared.items()
+            },
+            "styles": len(self.styles),
+            "converters": sorted(str(role) for role in self.converters),
+            "restart_needed": sorted(self.code_changed),
+        }
+
+
+class BuildDaemon:
+    def __init__(self, base_path, interval=DEFAULT_INTERVAL):
+        self.base_path = Path(base_path)
+        self.interval = interval
+        self.cache = WarmCache(self.base_path)
+        self.watcher = SourceWatcher(self.base_path)
+        self.lock = threading.Lock()  # одна сборка за раз: общие документы и база состояния
+        self.last_builds = {}         # ключ сборки → {generation, output, signature}
+        self.started = time.time()
+        self.builds = 0
+        self.stopped = threading.Event()
+
+    # --- кеш ---
+
+    def refresh(self):
+        """Проверка исходников и сброс кеша (под блокировкой сборки)"""
+        changed = self.watcher.changes()
+        if changed:
+            print(f"Изменились файлы: {len(changed)}, сброс кеша")
+            self.cache.invalidate(changed)
+        return changed
+
+    def watch(self):
+        """Фоновый опрос исходников"""
+        while not self.stopped.wait(self.interval):
+            with self.lock:
+                self.refresh()
+
+    def warm_up(self):
+        """Импорт python-docx, входы и стили всех редакций до первого запроса"""
+        started = time.perf_counter()
+        import_docx()
+        with self.lock:
+            for edition in load_editions():
+                generator = self.generator(edition, None, StageTimer())
+                generator.styled_document()
+        print(f"Кеш прогрет за {time.perf_counter() - started:.2f} с")
+
+    def generator(self, edition, role, timer):
+        """Генератор редакции на входах из кеша (без сборки)"""
+        generator, = build_editions(self.base_path, [(edition, role)], jobs=1, timer=timer,
+                                    shared=self.cache.shared, style_cache=self.cache.styles, generate=False)
+        return generator
+
+    # --- сборки ---
+
+    def build(self, params):
+        """Сборка DOCX или сайта; params — target, edition, role, sections, force"""
+        target = params.get("target", "docx")
+        edition = params.get("edition", DEFAULT_EDITION)
+        role = params.get("role") or None
+        sections = params.get("sections") or None
+        if isinstance(sections, str):
+            sections = [key for key in sections.split(',') if key]
+        force = str(params.get("force", "")).lower() in ("1", "true", "yes")
+
+        editions = load_editions()
+        if edition not in editions:
+            raise ValueError(f"нет редакции {edition}")
+        profile = editions[edition]
+        if role is not None and role not in profile.get('roles', {}):
+            raise ValueError(f"нет роли {role} в редакции {edition}")
+        available = profile['sections'] if role is None else role_sections(profile['sections'], profile['roles'][role])
+        unknown = [key for key in sections or [] if key not in available]
+        if unknown:
+            raise ValueError(f"нет разделов в редакции {edition}: {', '.join(unknown)}")
+        if target not in ("docx", "site"):
+            raise ValueError(f"неизвестная цель {target}")
+        if target == "site" and edition != DEFAULT_EDITION:
+            raise ValueError("сайт есть только у облачной редакции")
+
+        key = json.dumps([target, edition, role, sections])
+        with self.lock:
+            started = time.perf_counter()
+            self.refresh()
+
+            last = self.last_builds.get(key)
+            if (not force and last is not None and last["generation"] == self.cache.generation
+                    and file_signature(last["output"]) == last["signature"]):
+                return {"status": "unchanged", "output": str(last["output"]),
+                        "seconds": round(time.perf_counter() - started, 3)}
+
+            timer = StageTimer()
+            log = io.StringIO()
+            with redirect_stdout(log):
+                if target == "docx":
+                    output = self.build_docx(edition, role, sections, timer)
+                else:
+                    output = self.build_site(role, timer)
+
+            self.builds += 1
+            if output.is_file():
+                self.last_builds[key] = {"generation": self.cache.generation, "output": output,
+                                         "signature": file_signature(output)}
+            return {
+                "status": "ok",
+                "output": str(output),
+                "seconds": round(time.perf_counter() - started, 3),
+                "stages": {name: round(stat["wall"], 3) for name, stat in timer.stages.items()},
+                "log": log.getvalue(),
+            }
+
+    def build_docx(self, edition, role, sections, timer):
+        """Полный документ или отдельные разделы в свой файл (без базы состояния)"""
+        from convert_to_mkdocs import write_if_changed
+
+        if not sections:
+            generator, = build_editions(self.base_path, [(edition, role)], force_regenerate=True, jobs=1,
+                                        timer=timer, shared=self.cache.shared, style_cache=self.cache.styles)
+            return generator.output_path
+
+        generator = self.generator(edition, role, timer)
+        output = generator.output_path.with_name(f"{generator.output_path.stem}.{'+'.join(sections)}.docx")
+        write_if_changed(output, generator.render(sections))
+        return output
+
+    def site_inputs(self, role, timer):
+        """Входы MkDocsConverter из кеша облачной редакции"""
+        generator = self.generator(DEFAULT_EDITION, role, timer)
+        return {
+            "screenshot_mapping": generator.screenshot_mapping,
+            "parts": generator.parts,
+            "image_data": generator.image_data,
+        }
+
+    def build_site(self, role, timer):
+        from mkdocs_hooks import build_site
+        from roles import ROLES_DIR
+
+        inputs = self.site_inputs(role, timer)
+        overrides = {}
+        if role is not None:
+            overrides["site_dir"] = str(self.base_path / ROLES_DIR / role / "site")
+        with timer.stage("site"):
+            return build_site(self.base_path / "mkdocs.yml", inputs, role=role, **overrides)
+
+    def page(self, params):
+        """Страница MkDocs для части: конвертированный markdown (предпросмотр)"""
+        from convert_to_mkdocs import MkDocsConverter
+
+        part = params.get("part")
+        role = params.get("role") or None
+        with self.lock:
+            self.refresh()
+            converter = self.cache.converters.get(role)
+            if converter is None:
+                with redirect_stdout(io.StringIO()):
+                    inputs = self.site_inputs(role, StageTimer())
+                converter = self.cache.converters[role] = MkDocsConverter(self.base_path, role=role, **inputs)
+            if part not in converter.file_mapping:
+                raise ValueError(f"нет страницы для части {part}")
+            dest_path = converter.file_mapping[part]
+            return converter.convert_content(
+                converter.read_source(part), converter.get_file_depth(dest_path), dest_path, part,
+            )
+
+    def status(self):
+        return {
+            "pid": os.getpid(),
+            "uptime": round(time.time() - self.started, 1),
+            "builds": self.builds,
+            "cache": self.cache.stats(),
+            "last_builds": {key: str(build["output"]) for key, build in self.last_builds.items()},
+        }
+
+
+class DaemonRequestHandler(BaseHTTPRequestHandler):
+    daemon = None  # BuildDaemon, задаётся в serve()
+
+    def address_string(self):
+        # У Unix-сокета адреса клиента нет
+        return self.client_address[0] if isinstance(self.client_address, tuple) else "unix"
+
+    def params(self):
+        url = urlparse(self.path)
+        params = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        length = int(self.headers.get('Content-Length') or 0)
+        if length:
+            params.update(json.loads(self.rfile.read(length).decode('utf-8')))
+        return url.path, params
+
+    def send(self, code, body, content_type="application/json; charset=utf-8"):
+        if not isinstance(body, str):
+            body = json.dumps(body, ensure_ascii=False, indent=2)
+        data = body.encode('utf-8')
+        self.send_response(code)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def handle_request(self, method):
+        try:
+            path, params = self.params()
+            if method == "GET" and path == "/status":
+                self.send(200, self.daemon.status())
+            elif method == "GET" and path == "/page":
+                self.send(200, self.daemon.page(params), "text/markdown; charset=utf-8")
+            elif method == "POST" and path == "/build":
+                self.send(200, self.daemon.build(params))
+            else:
+                self.send(404, {"error": f"{method} {path}: нет такого запроса"})
+        except ValueError as e:
+            self.send(400, {"error": str(e)})
+        except Exception as e:
+            traceback.print_exc()
+            self.send(500, {"error": f"{type(e).__name__}: {e}"})
+
+    def do_GET(self):
+        self.handle_request("GET")
+
+    def do_POST(self):
+        self.handle_request("POST")
+
+
+def stop(signum, frame):
+    # SIGTERM (systemd, kill) останавливает демон так же, как Ctrl+C
+    raise KeyboardInterrupt
+
+
+class UnixHTTPServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+
+def serve(daemon, port=DEFAULT_PORT, socket_path=None):
+    DaemonRequestHandler.daemon = daemon
+    if socket_path:
+        socket_path = Path(socket_path)
+        if socket_path.exists():
+            socket_path.unlink()
+        server = UnixHTTPServer(str(socket_path), DaemonRequestHandler)
+        address = f"unix:{socket_path}"
+    else:
+        server = ThreadingHTTPServer(("127.0.0.1", port), DaemonRequestHandler)
+        address = f"http://127.0.0.1:{port}"
+
+    signal.signal(signal.SIGTERM, stop)
+    watcher = threading.Thread(target=daemon.watch, daemon=True)
+    watcher.start()
+    print(f"Демон сборки: {address} (Ctrl+C — остановка)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nОстановка...")
+    finally:
+        daemon.stopped.set()
+        server.server_close()
+        if socket_path and socket_path.exists():
+            socket_path.unlink()
+
+
+def link_or_copy(source, dest):
+    try:
+        os.link(source, dest)
+    except OSError:
+        shutil.copy2(source, dest)
+
+
+def check_part_reload(base_path, edition="onprem"):
+    """Самопроверка кеша: правка части X_NEW.md попадает в следующую сборку
+
+    Идёт на копии дерева во временном каталоге (файлы — жёсткими ссылками,
+    правленая часть пишется новым файлом). Возвращает True, если правка
+    есть в документе.
+    """
+    profile = load_editions()[edition]
+    with tempfile.TemporaryDirectory(prefix="rop-daemon-check-") as tmp_dir:
+        tree = Path(tmp_dir) / "tree"
+        shutil.copytree(base_path, tree, copy_function=link_or_copy, ignore=shutil.ignore_patterns(
+            '.git', '__pycache__', 'site', 'roles', 'white_label', 'build_state.db*', 'Финальная_инструкция*'))
+
+        parts_path = tree / profile['root'] / "Части_инструкции"
+        part_file = next(
+            parts_path / f"{part}_NEW.md" for info in profile['sections'].values() for part in info['parts']
+            if (parts_path / f"{part}_NEW.md").exists()
+        )
+
+        daemon = BuildDaemon(tree)
+        daemon.build({"target": "docx", "edition": edition})
+
+        marker = f"Проверка перезагрузки части {time.time_ns()}"
+        text = part_file.read_text(encoding='utf-8')
+        part_file.unlink()  # жёсткая ссылка: исходное дерево не трогаем
+        part_file.write_text(f"{text}\n{marker}\n", encoding='utf-8')
+
+        result = daemon.build({"target": "docx", "edition": edition})
+        with zipfile.ZipFile(result["output"]) as archive:
+            found = marker in archive.read("word/document.xml").decode('utf-8')
+        print(f"{part_file.name}: правка {'есть' if found else 'НЕ попала'} в {Path(result['output']).name} "
+              f"({result['status']})")
+        return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Демон сборки инструкции с тёплыми кешами')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f'Порт HTTP на 127.0.0.1 (по умолчанию {DEFAULT_PORT})')
+    parser.add_argument('--socket', help='Unix-сокет вместо HTTP-порта')
+    parser.add_argument('--interval', type=float, default=DEFAULT_INTERVAL,
+                        help=f'Период опроса исходников, с (по умолчанию {DEFAULT_INTERVAL})')
+    parser.add_argument('--no-warm', action='store_true', help='Не прогревать кеш при старте')
+    parser.add_argument('--check', action='store_true',
+                        help='Проверить на копии дерева, что правка части X_NEW.md видна в следующей сборке')
+
+    args = parser.parse_args()
+    if args.check:
+        sys.exit(0 if check_part_reload(Path(__file__).parent.parent) else 1)
+    daemon = BuildDaemon(Path(__file__).parent.parent, interval=args.interval)
+    if not args.no_warm:
+        daemon.warm_up()
+    serve(daemon, port=args.port, socket_path=args.socket)
+
+
+if __name__ == "__main__":
+    main()
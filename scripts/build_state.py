@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+База состояния сборки (SQLite, WAL) вместо progress.json
+
+Для каждой части и каждого генератора (docx, site) хранится:
+- хеш исходного markdown и контекста (скриншоты, индекс якорей)
+- хеш результата (XML фрагмента DOCX / страницы MkDocs)
+- хеши использованных скриншотов
+- длительность сборки части и версия генератора (хеш его исходника)
+
+Таблица parts — текущее состояние, history — все сборки подряд, runs —
+запуски генераторов. WAL и busy timeout позволяют двум сборкам писать
+одновременно: части записываются одной короткой транзакцией после того,
+как результат сохранён на диск.
+
+Просмотр:
+    python scripts/build_state.py                  # текущее состояние
+    python scripts/build_state.py --runs           # последние запуски
+    python scripts/build_state.py --history 04_Тесты
+"""
+
+import json
+import sqlite3
+import hashlib
+import argparse
+from datetime import datetime
+from pathlib import Path
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    generator TEXT NOT NULL,
+    version TEXT NOT NULL,
+    started_at TEXT NOT NULL,
+    finished_at TEXT,
+    status TEXT NOT NULL DEFAULT 'running'
+);
+CREATE TABLE IF NOT EXISTS parts (
+    generator TEXT NOT NULL,
+    part TEXT NOT NULL,
+    run_id INTEGER NOT NULL,
+    version TEXT NOT NULL,
+    source_hash TEXT NOT NULL,
+    context_hash TEXT NOT NULL,
+    fragment_hash TEXT,
+    image_hashes TEXT NOT NULL,
+    duration REAL NOT NULL,
+    built_at TEXT NOT NULL,
+    PRIMARY KEY (generator, part)
+);
+CREATE TABLE IF NOT EXISTS history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    generator TEXT NOT NULL,
+    part TEXT NOT NULL,
+    run_id INTEGER NOT NULL,
+    version TEXT NOT NULL,
+    source_hash TEXT NOT NULL,
+    fragment_hash TEXT,
+    duration REAL NOT NULL,
+    built_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS history_part ON history (generator, part);
+"""
+
+DEFAULT_FILE = "build_state.db"
+
+
+def content_hash(data):
+    """sha256 строки или bytes"""
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    return hashlib.sha256(data).hexdigest()
+
+
+def source_version(*paths):
+    """Версия генератора: короткий хеш его исходников"""
+    return content_hash(b''.join(Path(path).read_bytes() for path in paths))[:12]
+
+
+def now():
+    return datetime.now().isoformat(timespec='seconds')
+
+
+class BuildState:
+    def __init__(self, db_path):
+        self.db_path = Path(db_path)
+        self.conn = sqlite3.connect(str(self.db_path), timeout=30)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        with self.conn:
+            self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    # --- запись ---
+
+    def start_run(self, generator, version):
+        with self.conn:
+            cursor = self.conn.execute(
+                "INSERT INTO runs (generator, version, started_at) VALUES (?, ?, ?)",
+                (generator, version, now()),
+            )
+        return cursor.lastrowid
+
+    def finish_run(self, run_id, status="ok"):
+        with self.conn:
+            self.conn.execute(
+                "UPDATE runs SET finished_at = ?, status = ? WHERE id = ?",
+                (now(), status, run_id),
+            )
+
+    def record_parts(self, run_id, generator, version, records):
+        """Текущее состояние частей + строки в историю (одна транзакция)
+
+        records — {часть: {source_hash, context_hash, fragment_hash,
+        image_hashes, duration}}.
+        """
+        built_at = now()
+        with self.conn:
+            for part, record in records.items():
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO parts VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (generator, part, run_id, version, record["source_hash"], record["context_hash"],
+                     record["fragment_hash"], json.dumps(record["image_hashes"], ensure_ascii=False, sort_keys=True),
+                     record["duration"], built_at),
+                )
+                self.conn.execute(
+                    "INSERT INTO history (generator, part, run_id, version, source_hash, fragment_hash, duration, built_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (generator, part, run_id, version, record["source_hash"], record["fragment_hash"],
+                     record["duration"], built_at),
+                )
+
+    def forget(self, generator):
+        """Сброс текущего состояния генератора (история остаётся)"""
+        with self.conn:
+            self.conn.execute("DELETE FROM parts WHERE generator = ?", (generator,))
+
+    # --- чтение ---
+
+    def part(self, generator, part):
+        row = self.conn.execute(
+            "SELECT * FROM parts WHERE generator = ? AND part = ?", (generator, part)
+        ).fetchone()
+        return dict(row) if row else None
+
+    def completed_parts(self, generator):
+        rows = self.conn.execute("SELECT part FROM parts WHERE generator = ?", (generator,))
+        return [row["part"] for row in rows]
+
+    def is_fresh(self, generator, part, version, source_hash, context_hash, base_path, fragment_hash=None):
+        """Часть собрана этой версией генератора из тех же исходников и скриншотов
+
+        fragment_hash — хеш текущего результата на диске, если он есть:
+        должен совпасть с записанным.
+        """
+        row = self.part(generator, part)
+        if row is None:
+            return False
+        if (row["version"], row["source_hash"], row["context_hash"]) != (version, source_hash, context_hash):
+            return False
+        if fragment_hash is not None and row["fragment_hash"] != fragment_hash:
+            return False
+
+        for rel_path, image_hash in json.loads(row["image_hashes"]).items():
+            path = Path(base_path) / rel_path
+            if not path.exists() or content_hash(path.read_bytes()) != image_hash:
+                return False
+        return True
+
+    def history(self, part=None, limit=20):
+        if part:
+            rows = self.conn.execute(
+                "SELECT * FROM history WHERE part = ? ORDER BY id DESC LIMIT ?", (part, limit)
+            )
+        else:
+            rows = self.conn.execute("SELECT * FROM history ORDER BY id DESC LIMIT ?", (limit,))
+        return [dict(row) for row in rows]
+
+    def runs(self, limit=20):
+        rows = self.conn.execute("SELECT * FROM runs ORDER BY id DESC LIMIT ?", (limit,))
+        return [dict(row) for row in rows]
+
+    def summary(self):
+        rows = self.conn.execute("SELECT * FROM parts ORDER BY generator, part")
+        return [dict(row) for row in rows]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Состояние сборки инструкции')
+    parser.add_argument('--db', help=f'Файл базы (по умолчанию {DEFAULT_FILE} в корне)')
+    parser.add_argument('--runs', action='store_true', help='Последние запуски генераторов')
+    parser.add_argument('--history', metavar='PART', help='История сборок части')
+
+    args = parser.parse_args()
+    db_path = Path(args.db) if args.db else Path(__file__).parent.parent / DEFAULT_FILE
+    if not db_path.exists():
+        print(f"База не найдена: {db_path}")
+        return
+
+    state = BuildState(db_path)
+    if args.runs:
+        for run in state.runs():
+            print(f"  #{run['id']:<5} {run['generator']:<6} {run['version']}  {run['started_at']} → "
+                  f"{run['finished_at'] or '...'}  {run['status']}")
+    elif args.history:
+        for row in state.history(args.history):
+            print(f"  {row['built_at']}  {row['generator']:<6} run #{row['run_id']:<5} "
+                  f"{row['source_hash'][:10]} → {(row['fragment_hash'] or '')[:10]}  {row['duration']:.3f} с")
+    else:
+        for row in state.summary():
+            images = len(json.loads(row["image_hashes"]))
+            print(f"  {row['generator']:<6} {row['part']:<40} {row['source_hash'][:10]}  "
+                  f"скриншотов {images:<3} {row['duration']:.3f} с  {row['built_at']}")
+    state.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -6,29 +6,104 @@
 Преобразует:
 - {INTERFACE} → !!! interface "Интерфейс"
 - {TECHNICAL} → !!! technical "Техническое"
-- Скриншоты **Name.png** → ![Name](../images/name.png)
+- Скриншоты **Name.png** → ![Name](../images/name.<хеш>.png)
 - Внутренние ссылки
+
+Имена картинок содержат короткий хеш содержимого, поэтому их можно
+отдавать с `Cache-Control: immutable` (см. docs/_headers): переснятый
+скриншот получает новое имя, а ссылки на страницах меняются вместе с ним.
+
+Страницы конвертируются параллельно (--jobs), вывод и ошибки
+собираются в порядке file_mapping. Файлы в docs/ перезаписываются
+только при изменении содержимого и атомарно (temp-файл + rename),
+поэтому повторный запуск не трогает mtime и не будит `mkdocs serve`.
+
+--timings/--profile — время по этапам и страницам (см. stage_timer.py).
+
+Состояние страниц хранится в build_state.db (см. build_state.py): страница,
+у которой не изменились исходник, индекс якорей, скриншоты и версия
+конвертера, а файл в docs/ совпадает с записанным, не конвертируется
+заново (--force — конвертировать всё).
 """
 
 import os
 import re
-import shutil
+import sys
+import hashlib
+import tempfile
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 import json
 
+from anchor_index import AnchorIndex, LINK_RE, load_aliases
+from build_state import BuildState, DEFAULT_FILE, content_hash, source_version
+from generate_instruction import DEFAULT_EDITION, load_editions
+from roles import filter_role_blocks, role_parts
+from stage_timer import StageTimer
+
+# Имя генератора и версия для базы состояния сборки
+STATE_NAME = "site"
+CONVERTER_VERSION = source_version(__file__, Path(__file__).with_name("anchor_index.py"))
+
+IMAGE_LINK_RE = re.compile(r'images/([^)\s]+)')
+
+
+def file_hash(path):
+    """SHA-256 содержимого файла или None, если файла нет"""
+    try:
+        with open(path, 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except FileNotFoundError:
+        return None
+
+
+def write_if_changed(path, data):
+    """Атомарно записывает bytes в path, если содержимое отличается
+
+    Возвращает True, если файл был записан.
+    """
+    path = Path(path)
+    if file_hash(path) == hashlib.sha256(data).hexdigest():
+        return False
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_name, path)
+    except BaseException:
+        if os.path.exists(tmp_name):
+            os.unlink(tmp_name)
+        raise
+    return True
+
 
 class MkDocsConverter:
-    def __init__(self, base_path):
+    def __init__(self, base_path, screenshot_mapping=None, parts=None, anchor_index=None, image_data=None, timer=None,
+                 role=None):
+        """Уже загруженные данные можно передать готовыми (см. build.py):
+        screenshot_mapping, parts — {часть: текст}, anchor_index,
+        image_data — {путь скриншота: bytes}.
+        timer — StageTimer для замеров по этапам (--timings/--profile).
+        role — роль облачной редакции (roles.py): только её страницы и блоки.
+        """
+        self.timer = timer or StageTimer()
         self.base_path = Path(base_path)
         self.source_path = self.base_path / "Части_инструкции"
         self.docs_path = self.base_path / "docs"
         self.images_path = self.docs_path / "images"
         self.screenshots_path = self.base_path / "СКРИНШОТЫ"
+        self.state_file = self.base_path / DEFAULT_FILE
 
         # Загружаем маппинг скриншотов
         mapping_file = self.base_path / "scripts" / "screenshot_mapping.json"
-        if mapping_file.exists():
-            with open(mapping_file, 'r', encoding='utf-8') as f:
+        if screenshot_mapping is not None:
+            self.screenshot_mapping = screenshot_mapping
+        elif mapping_file.exists():
+            with self.timer.stage("mappings"), open(mapping_file, 'r', encoding='utf-8') as f:
                 data = json.load(f)
                 self.screenshot_mapping = data.get('screenshot_mapping', {})
         else:
@@ -57,39 +132,64 @@ class MkDocsConverter:
             "07_Словарь_терминов": "glossary.md",
         }
 
-        # Маппинг якорей на пути
-        self.anchor_mapping = {
-            "#что-такое-цифровой-роп": "start/about.md",
-            "#регистрация-и-вход": "start/registration.md",
-            "#первые-шаги": "start/first-steps.md",
-            "#настройки-шаблоны-скриптов": "settings/scripts-templates.md",
-            "#настройки-скрипты-и-промты": "settings/scripts-prompts.md",
-            "#настройки-конверсия": "settings/conversion.md",
-            "#настройки-дополнительные-промты": "settings/additional-prompts.md",
-            "#настройки-таблицы": "settings/tables.md",
-            "#настройки-пользователи": "settings/users.md",
-            "#аналитика-коммуникации": "analytics/communications.md",
-            "#аналитика-история-сделок": "analytics/deals-history.md",
-            "#аналитика-менеджеры": "analytics/managers.md",
-            "#аналитика-таблицы": "analytics/tables.md",
-            "#графики-оценка": "charts/score.md",
-            "#графики-менеджеры": "charts/managers.md",
-            "#тесты": "tests/index.md",
-            "#биллинг": "billing/index.md",
-            "#faq": "faq.md",
-            "#словарь-терминов": "glossary.md",
-            "#шаблоны-скриптов": "settings/scripts-templates.md",
-            "#скрипты": "settings/scripts-prompts.md",
-            "#промты": "settings/additional-prompts.md",
-            "#чек-листы": "settings/scripts-templates.md",
-            "#таблицы": "settings/tables.md",
-            "#пользователи": "settings/users.md",
-            "#конверсия": "settings/conversion.md",
-            "#коммуникации": "analytics/communications.md",
-            "#звонки": "analytics/communications.md",
-            "#менеджеры": "analytics/managers.md",
-            "#история-сделок": "analytics/deals-history.md",
-        }
+        self.role = role
+        all_pages = self.file_mapping
+        if role is not None:
+            edition = load_editions()[DEFAULT_EDITION]
+            keep = set(role_parts(edition['sections'], edition['roles'][role]))
+            self.file_mapping = {name: path for name, path in self.file_mapping.items() if name in keep}
+
+        self.parts = parts
+        self.image_data = image_data or {}
+
+        # Якоря заголовков → страницы (синонимы — в hyperlink_mapping.json)
+        if anchor_index is None:
+            with self.timer.stage("index"):
+                full_parts = None
+                if role is not None:
+                    # Ссылки на вырезанные из роли заголовки станут простым текстом
+                    full_parts = {name: self.read_source(name, full=True) for name in all_pages}
+                anchor_index = AnchorIndex.build(
+                    {name: self.read_source(name) for name in self.file_mapping},
+                    self.file_mapping,
+                    load_aliases(self.base_path / "hyperlink_mapping.json"),
+                    full_parts=full_parts,
+                )
+        self.anchor_index = anchor_index
+
+        # Безопасное имя скриншота → (имя с хешем, исходный файл), см. image_names()
+        self._image_names = None
+        self._image_digests = {}  # исходный файл → sha256 содержимого
+
+    def __getstate__(self):
+        # Воркерам пула нужны только имена картинок, не их содержимое
+        state = self.__dict__.copy()
+        state['image_data'] = {}
+        # Свой таймер на задачу: замеры возвращаются через _convert_item_timed
+        state['timer'] = StageTimer()
+        return state
+
+    def read_image(self, source):
+        """Содержимое скриншота (из image_data, если передано)"""
+        data = self.image_data.get(source)
+        if data is None:
+            data = source.read_bytes()
+        return data
+
+    def read_source(self, source_name, full=False):
+        """Текст исходной части (блоки других ролей вырезаны) или None, если файла нет
+
+        full — блоки всех ролей, как в полной сборке.
+        """
+        role = None if full else self.role
+        if self.parts is not None and source_name in self.parts:
+            return filter_role_blocks(self.parts[source_name], role)
+
+        source_file = self.source_path / f"{source_name}.md"
+        if not source_file.exists():
+            return None
+        with open(source_file, 'r', encoding='utf-8') as f:
+            return filter_role_blocks(f.read(), role)
 
     def copy_screenshots(self):
         """Копирует все скриншоты в docs/images/"""
@@ -97,16 +197,52 @@ class MkDocsConverter:
         self.images_path.mkdir(parents=True, exist_ok=True)
 
         copied = 0
-        for name, rel_path in self.screenshot_mapping.items():
-            source = self.base_path / rel_path
-            if source.exists():
-                # Создаём безопасное имя файла
-                safe_name = self.make_safe_filename(name)
-                dest = self.images_path / safe_name
-                shutil.copy2(source, dest)
+        unchanged = 0
+        sources = self.image_sources()
+        for hashed_name, source in sources.items():
+            dest = self.images_path / hashed_name
+            if write_if_changed(dest, self.read_image(source)):
                 copied += 1
-
-        print(f"  Скопировано: {copied} файлов")
+            else:
+                unchanged += 1
+
+        # Старые версии переснятых скриншотов больше никем не используются
+        removed = 0
+        for path in self.images_path.iterdir():
+            if path.is_file() and path.name not in sources:
+                path.unlink()
+                removed += 1
+
+        print(f"  Скопировано: {copied} файлов, без изменений: {unchanged}, удалено устаревших: {removed}")
+
+    def image_names(self):
+        """Безопасное имя скриншота → (имя с хешем содержимого, исходный файл)"""
+        if self._image_names is None:
+            names = {}
+            for name, rel_path in self.screenshot_mapping.items():
+                source = self.base_path / rel_path
+                if source.exists():
+                    safe_name = self.make_safe_filename(name)
+                    names[safe_name] = (self.make_hashed_filename(safe_name, source), source)
+            self._image_names = names
+        return self._image_names
+
+    def image_sources(self):
+        """Имя картинки в images/ → исходный файл в СКРИНШОТЫ/"""
+        return {hashed_name: source for hashed_name, source in self.image_names().values()}
+
+    def asset_name(self, screenshot_name):
+        """Имя картинки в images/ для ссылки со страницы"""
+        safe_name = self.make_safe_filename(screenshot_name)
+        entry = self.image_names().get(safe_name)
+        return entry[0] if entry else safe_name
+
+    def make_hashed_filename(self, safe_name, source):
+        """name.png → name.<10 символов sha256>.png"""
+        stem, ext = os.path.splitext(safe_name)
+        digest = hashlib.sha256(self.read_image(source)).hexdigest()
+        self._image_digests[source] = digest
+        return f"{stem}.{digest[:10]}{ext}"
 
     def make_safe_filename(self, name):
         """Создаёт безопасное имя файла"""
@@ -117,8 +253,15 @@ class MkDocsConverter:
         safe = re.sub(r'[^\w\-.]', '', safe)
         return safe
 
-    def convert_content(self, content, current_file_depth=1):
-        """Конвертирует контент markdown файла"""
+    def convert_content(self, content, current_file_depth=1, current_page=None, part_name=None):
+        """Конвертирует контент markdown файла
+
+        current_page — путь страницы в docs/, нужен для ссылок на якоря
+        внутри той же страницы; part_name — для отчёта о битых ссылках.
+        """
+        if current_page is None:
+            # Без пути страницы ссылки строятся только по глубине
+            current_page = '/' * current_file_depth
         lines = content.split('\n')
         result = []
 
@@ -128,7 +271,7 @@ class MkDocsConverter:
 
             # Конвертируем {INTERFACE}
             if line.startswith('{INTERFACE}'):
-                text = line[11:].strip()
+                text = self._convert_links(line[11:].strip(), current_page, part_name)
                 result.append('')
                 result.append('!!! interface "Интерфейс"')
                 result.append(f'    {text}')
@@ -138,7 +281,7 @@ class MkDocsConverter:
 
             # Конвертируем {TECHNICAL}
             if line.startswith('{TECHNICAL}'):
-                text = line[11:].strip()
+                text = self._convert_links(line[11:].strip(), current_page, part_name)
                 result.append('')
                 result.append('!!! technical "Техническое"')
                 result.append(f'    {text}')
@@ -151,7 +294,7 @@ class MkDocsConverter:
                 match = re.search(r'\*\*([^*]+\.png)\*\*', line)
                 if match:
                     screenshot_name = match.group(1)
-                    safe_name = self.make_safe_filename(screenshot_name)
+                    safe_name = self.asset_name(screenshot_name)
 
                     # Определяем относительный путь к images
                     prefix = '../' * current_file_depth
@@ -164,63 +307,219 @@ class MkDocsConverter:
                     continue
 
             # Конвертируем внутренние ссылки [text](#anchor)
-            if '](#' in line:
-                for anchor, path in self.anchor_mapping.items():
-                    if anchor in line:
-                        prefix = '../' * current_file_depth
-                        line = line.replace(f'({anchor})', f'({prefix}{path})')
+            line = self._convert_links(line, current_page, part_name)
 
             result.append(line)
             i += 1
 
         return '\n'.join(result)
 
-    def get_file_depth(self, path):
-        """Возвращает глубину файла относительно docs/"""
-        return path.count('/')
-
-    def convert_file(self, source_name, dest_path):
-        """Конвертирует один файл"""
-        source_file = self.source_path / f"{source_name}.md"
+    def _convert_links(self, text, current_page, part_name):
+        """[text](#anchor) → ссылки на страницы; битые ссылки не трогаем,
+        ссылки на вырезанные из роли заголовки — простой текст"""
+        if '](#' not in text:
+            return text
 
-        if not source_file.exists():
-            print(f"  ПРОПУЩЕН: {source_name} (файл не найден)")
-            return
+        def convert(match):
+            link_text, anchor = match.groups()
+            target = self.anchor_index.page_link(anchor, current_page, part_name)
+            if target is None:
+                return link_text if anchor in self.anchor_index.removed else match.group(0)
+            return f'[{link_text}]({target})'
 
-        with open(source_file, 'r', encoding='utf-8') as f:
-            content = f.read()
+        return LINK_RE.sub(convert, text)
 
-        depth = self.get_file_depth(dest_path)
-        converted = self.convert_content(content, depth)
+    def get_file_depth(self, path):
+        """Возвращает глубину файла относительно docs/"""
+        return path.count('/')
 
-        dest_file = self.docs_path / dest_path
-        dest_file.parent.mkdir(parents=True, exist_ok=True)
+    def context_hash(self):
+        """Хеш общих для всех страниц входов: индекс якорей и имена картинок"""
+        anchors = {anchor: list(heading) for anchor, heading in self.anchor_index.anchors.items()}
+        images = {safe_name: hashed_name for safe_name, (hashed_name, _) in self.image_names().items()}
+        return content_hash(json.dumps([anchors, images], ensure_ascii=False, sort_keys=True))
+
+    def page_images(self, converted):
+        """Скриншоты страницы: исходный файл → sha256 содержимого"""
+        sources = self.image_sources()
+        images = {}
+        for hashed_name in IMAGE_LINK_RE.findall(converted):
+            source = sources.get(hashed_name)
+            if source is not None:
+                images[source.relative_to(self.base_path).as_posix()] = self._image_digests[source]
+        return images
 
-        with open(dest_file, 'w', encoding='utf-8') as f:
-            f.write(converted)
+    def convert_file(self, source_name, dest_path):
+        """Конвертирует один файл
+
+        Возвращает (статус, сообщение об ошибке, битые якоря, запись для
+        базы состояния) — печать и запись делает convert_all, чтобы вывод
+        не зависел от порядка завершения воркеров.
+        """
+        started = time.perf_counter()
+        with self.timer.stage("read", part=source_name):
+            content = self.read_source(source_name)
+        if content is None:
+            return "missing", None, [], None
+
+        dangling_before = len(self.anchor_index.dangling)
+
+        try:
+            depth = self.get_file_depth(dest_path)
+            with self.timer.stage("convert", part=source_name):
+                converted = self.convert_content(content, depth, dest_path, source_name)
+
+            dest_file = self.docs_path / dest_path
+            with self.timer.stage("write", part=source_name):
+                written = write_if_changed(dest_file, converted.encode('utf-8'))
+        except Exception as e:
+            return "error", f"{type(e).__name__}: {e}", [], None
+
+        dangling = [anchor for _, anchor in self.anchor_index.dangling[dangling_before:]]
+        record = {
+            "source_hash": content_hash(content),
+            "fragment_hash": content_hash(converted),
+            "image_hashes": self.page_images(converted),
+            "duration": time.perf_counter() - started,
+        }
+        return ("ok" if written else "unchanged"), None, dangling, record
+
+    def _convert_item(self, item):
+        """Обёртка для пула: (source_name, dest_path) → результат"""
+        source_name, dest_path = item
+        status, error, dangling, record = self.convert_file(source_name, dest_path)
+        return source_name, dest_path, status, error, dangling, record
+
+    def _convert_item_timed(self, item):
+        """Обёртка для пула: результат + замеры воркера"""
+        return self._convert_item(item), self.timer.report()
+
+    def convert_files(self, jobs=None, items=None):
+        """Конвертирует файлы (по умолчанию все из file_mapping) на пуле процессов
+
+        Результаты возвращаются в порядке items независимо от jobs.
+        При профилировании работает последовательно: cProfile видит
+        только текущий процесс.
+        """
+        if items is None:
+            items = list(self.file_mapping.items())
+        if self.timer.profile:
+            jobs = 1
+        if jobs == 1 or len(items) < 2:
+            return [self._convert_item(item) for item in items]
+
+        results = []
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            for result, timings in executor.map(self._convert_item_timed, items):
+                self.timer.merge(timings)
+                results.append(result)
+        return results
+
+    def fresh_pages(self, state, context):
+        """Страницы, которые не нужно конвертировать заново: {часть: текст}"""
+        fresh = {}
+        for source_name, dest_path in self.file_mapping.items():
+            content = self.read_source(source_name)
+            dest_file = self.docs_path / dest_path
+            if content is None or not dest_file.exists():
+                continue
+            if state.is_fresh(STATE_NAME, source_name, CONVERTER_VERSION, content_hash(content), context,
+                              self.base_path, fragment_hash=file_hash(dest_file)):
+                fresh[source_name] = content
+        return fresh
 
-        print(f"  {source_name} → {dest_path}")
+    def convert_all(self, jobs=None, force=False):
+        """Конвертирует все файлы
 
-    def convert_all(self):
-        """Конвертирует все файлы"""
+        Возвращает список ошибок вида (source_name, сообщение).
+        """
         print("=" * 60)
         print("Конвертация markdown для MkDocs")
         print("=" * 60)
 
         # Копируем скриншоты
-        self.copy_screenshots()
+        with self.timer.stage("images"):
+            self.copy_screenshots()
+
+        state = BuildState(self.state_file)
+        run_id = state.start_run(STATE_NAME, CONVERTER_VERSION)
+        context = self.context_hash()
+        fresh = {} if force else self.fresh_pages(state, context)
+        # Ссылки актуальных страниц тоже проверяются: иначе на повторном
+        # запуске их битые якоря пропали бы из отчёта
+        self.anchor_index.check_links(fresh)
 
         # Конвертируем файлы
         print("\nКонвертация файлов...")
+        items = [item for item in self.file_mapping.items() if item[0] not in fresh]
+        results = {result[0]: result for result in self.convert_files(jobs, items)}
+
+        errors = []
+        records = {}
         for source_name, dest_path in self.file_mapping.items():
-            self.convert_file(source_name, dest_path)
+            if source_name in fresh:
+                print(f"  {source_name} → {dest_path} (актуальна)")
+                continue
+
+            _, _, status, error, dangling, record = results[source_name]
+            for anchor in dangling:
+                self.anchor_index.dangling.append((source_name, anchor))
+            if record is not None:
+                records[source_name] = dict(record, context_hash=context)
+            if status == "ok":
+                print(f"  {source_name} → {dest_path}")
+            elif status == "unchanged":
+                print(f"  {source_name} → {dest_path} (без изменений)")
+            elif status == "missing":
+                print(f"  ПРОПУЩЕН: {source_name} (файл не найден)")
+            else:
+                print(f"  ОШИБКА: {source_name} → {dest_path}: {error}")
+                errors.append((source_name, error))
+
+        state.record_parts(run_id, STATE_NAME, CONVERTER_VERSION, records)
+        state.finish_run(run_id, "error" if errors else "ok")
+        state.close()
+
+        print()
+        self.anchor_index.report_dangling()
 
         print("\n" + "=" * 60)
-        print("ГОТОВО!")
+        if errors:
+            print(f"ЗАВЕРШЕНО С ОШИБКАМИ: {len(errors)}")
+            for source_name, error in errors:
+                print(f"  {source_name}: {error}")
+        else:
+            print("ГОТОВО!")
         print("=" * 60)
 
+        return errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Конвертер markdown для MkDocs')
+    parser.add_argument('--jobs', '-j', type=int, default=None,
+                        help='Число параллельных процессов (по умолчанию — по числу ядер, 1 — последовательно)')
+    parser.add_argument('--timings', nargs='?', const='timings/site.json', metavar='JSON',
+                        help='Время по этапам и страницам (JSON, по умолчанию timings/site.json)')
+    parser.add_argument('--profile', action='store_true',
+                        help='cProfile для каждого этапа (вместе с --timings, конвертация последовательная)')
+    parser.add_argument('--force', action='store_true', help='Конвертировать все страницы, не проверяя состояние сборки')
+
+    args = parser.parse_args()
 
-if __name__ == "__main__":
     base_path = Path(__file__).parent.parent
-    converter = MkDocsConverter(base_path)
-    converter.convert_all()
+    if args.profile and not args.timings:
+        args.timings = 'timings/site.json'
+    timer = StageTimer(profile=args.profile)
+    converter = MkDocsConverter(base_path, timer=timer)
+    errors = converter.convert_all(jobs=args.jobs, force=args.force)
+
+    if args.timings:
+        timer.print_summary()
+        timer.write_json(base_path / args.timings)
+    if errors:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,16 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 """
-Генератор инструкции "Цифровой РОП - Облачная версия"
+Генератор инструкции "Цифровой РОП"
 
-Для SaaS-версии платформы https://rop.bvmax.ru
-Разработчик: BVMax (https://bvmax.ru)
+Редакции (облачная BVMax, локальная Setl Group) описаны данными в
+editions.json: корень с частями и скриншотами, разделы, титульный лист,
+логотип и цвета. Движок один на все редакции:
+    python scripts/generate_instruction.py                    # облачная
+    python scripts/generate_instruction.py --edition onprem
+    python scripts/generate_instruction.py --edition all      # все за один запуск
+    python scripts/generate_instruction.py --role manager     # сокращённая для роли (roles.py)
+    python scripts/generate_instruction.py --split            # файл на раздел + оглавление
 
 Возможности:
 - Поэтапная генерация (по разделам)
@@ -12,106 +18,257 @@
 - Принудительная перезапись разделов
 - Профессиональное форматирование Word
 - Автоматическое оглавление
-- Корпоративные стили BVMax
+- Корпоративные стили редакции
+- Все редакции за один запуск: части, скриншоты и стили читаются один раз
+- Раздельная сборка (--split): по файлу на раздел параллельно и лёгкий
+  документ-оглавление со ссылками на закладки разделов
+- Замер времени и памяти по этапам и частям (--timings, --profile, --memprofile)
 """
 
+import io
 import os
-import sys
 import json
+import time
+import zipfile
 from pathlib import Path
-from docx import Document
-from docx.shared import Inches, Pt, RGBColor, Cm
-from docx.enum.text import WD_ALIGN_PARAGRAPH, WD_BREAK, WD_LINE_SPACING
-from docx.enum.style import WD_STYLE_TYPE
-from docx.enum.table import WD_TABLE_ALIGNMENT
-from docx.oxml.shared import OxmlElement, qn
-from docx.oxml.ns import nsdecls, qn
-from docx.oxml import parse_xml
 import argparse
-from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from datetime import datetime, timezone
 import re
 
+from anchor_index import AnchorIndex, bookmark_id, load_aliases, read_part
+from roles import ROLES_DIR, filter_role_blocks, role_sections
+from build_state import BuildState, DEFAULT_FILE, content_hash, source_version
+from stage_timer import StageTimer
+
+# Профили редакций и редакция по умолчанию
+EDITIONS_FILE = Path(__file__).with_name("editions.json")
+DEFAULT_EDITION = "cloud"
+
+# Вместо части, которой ещё нет: заглушка редакции (missing_part в editions.json)
+MISSING_PART = object()
+
+# "1. Аналитика - Менеджеры" — номер из заголовка части в оглавлении не нужен
+TOC_NUMBER_RE = re.compile(r'^\d+\.\s*')
+
+# Раздельная сборка (--split): каталог <имя документа>/ рядом с документом,
+# в нём оглавление и файлы разделов 01_intro.docx, 02_settings.docx, ...
+SPLIT_INDEX_NAME = "00_Оглавление.docx"
+
+# Имя генератора и версия для базы состояния сборки
+STATE_NAME = "docx"
+GENERATOR_VERSION = source_version(__file__, Path(__file__).with_name("anchor_index.py"), EDITIONS_FILE)
+
+# python-docx импортируется ~70 мс: имена заполняет import_docx() при
+# первой сборке документа, чтобы --list и --help отвечали сразу
+Document = Inches = Pt = RGBColor = Cm = None
+WD_ALIGN_PARAGRAPH = WD_BREAK = WD_LINE_SPACING = WD_STYLE_TYPE = WD_TABLE_ALIGNMENT = None
+OxmlElement = qn = nsdecls = parse_xml = RT = None
+
+
+def import_docx():
+    """Импорт python-docx в глобальные имена модуля (один раз)"""
+    global Document, Inches, Pt, RGBColor, Cm
+    global WD_ALIGN_PARAGRAPH, WD_BREAK, WD_LINE_SPACING, WD_STYLE_TYPE, WD_TABLE_ALIGNMENT
+    global OxmlElement, qn, nsdecls, parse_xml, RT
+    if Document is not None:
+        return
+
+    from docx import Document
+    from docx.shared import Inches, Pt, RGBColor, Cm
+    from docx.enum.text import WD_ALIGN_PARAGRAPH, WD_BREAK, WD_LINE_SPACING
+    from docx.enum.style import WD_STYLE_TYPE
+    from docx.enum.table import WD_TABLE_ALIGNMENT
+    from docx.oxml.shared import OxmlElement, qn
+    from docx.oxml.ns import nsdecls, qn
+    from docx.oxml import parse_xml
+    from docx.opc.constants import RELATIONSHIP_TYPE as RT
+
+
+def build_time():
+    """Время сборки (UTC, без tzinfo): SOURCE_DATE_EPOCH, по умолчанию время
+    последнего коммита; вне git — начало сегодняшнего дня
+
+    Идёт в дату на титуле, свойства документа и время записей ZIP, поэтому
+    одинаковые входы дают побайтно одинаковый DOCX.
+    """
+    epoch = os.environ.get("SOURCE_DATE_EPOCH", "")
+    if not epoch.isdigit():
+        # site_deploy импортирует этот модуль (через convert_to_mkdocs) — импорт здесь
+        from site_deploy import source_date_epoch
+
+        epoch = source_date_epoch(Path(__file__).parent.parent) or ""
+        if epoch:
+            # Как on_config в mkdocs_hooks.py: один запуск git на процесс, пул разделов наследует
+            os.environ["SOURCE_DATE_EPOCH"] = epoch
+    if epoch:
+        moment = datetime.fromtimestamp(int(epoch), tz=timezone.utc).replace(tzinfo=None)
+    else:
+        moment = datetime.now(timezone.utc).replace(tzinfo=None, hour=0, minute=0, second=0, microsecond=0)
+    # Время в ZIP не раньше 1980 года
+    return max(moment, datetime(1980, 1, 1))
+
+
+def _rel_order(rel):
+    number = re.sub(r'\D', '', rel.rId)
+    return (int(number) if number else 0, rel.rId)
+
+
+def _rels_xml(rels):
+    """.rels с отношениями по порядку номеров rId, а не по порядку добавления"""
+    from docx.opc.oxml import CT_Relationships
+
+    element = CT_Relationships.new()
+    for rel in sorted(rels.values(), key=_rel_order):
+        element.add_rel(rel.rId, rel.reltype, rel.target_ref, rel.is_external)
+    return element.xml
+
+
+def package_entries(doc):
+    """Записи архива документа {имя: bytes} — то же, что пишет doc.save()"""
+    from docx.opc.packuri import CONTENT_TYPES_URI, PACKAGE_URI
+    from docx.opc.pkgwriter import _ContentTypesItem
+
+    package = doc.part.package
+    parts = list(package.parts)
+    for part in parts:
+        part.before_marshal()
+
+    entries = {
+        CONTENT_TYPES_URI.membername: _ContentTypesItem.from_parts(parts).blob,
+        PACKAGE_URI.rels_uri.membername: _rels_xml(package.rels),
+    }
+    for part in parts:
+        entries[part.partname.membername] = part.blob
+        if len(part.rels):
+            entries[part.partname.rels_uri.membername] = _rels_xml(part.rels)
+    return entries
+
+
+def write_docx(target, entries, moment=None, store_media=False):
+    """Воспроизводимый архив DOCX в файл или поток target
+
+    Порядок записей постоянный ([Content_Types].xml, _rels/.rels, остальные
+    по имени), у всех записей одно время moment и одинаковые атрибуты.
+    store_media — картинки без deflate: запись быстрее, файл больше.
+    """
+    date_time = (moment or build_time()).timetuple()[:6]
+    first = ["[Content_Types].xml", "_rels/.rels"]
+    names = [name for name in first if name in entries]
+    names += sorted(name for name in entries if name not in first)
+
+    with zipfile.ZipFile(target, 'w') as archive:
+        for name in names:
+            info = zipfile.ZipInfo(name, date_time=date_time)
+            info.create_system = 0
+            info.external_attr = 0
+            stored = store_media and name.startswith("word/media/")
+            info.compress_type = zipfile.ZIP_STORED if stored else zipfile.ZIP_DEFLATED
+            archive.writestr(info, entries[name])
+
+
+def load_editions():
+    """Профили редакций из editions.json: {имя: профиль}"""
+    with open(EDITIONS_FILE, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
 
 class InstructionGenerator:
-    def __init__(self, base_path):
-        self.base_path = Path(base_path)
+    def __init__(self, base_path, screenshot_mapping=None, parts=None, anchor_index=None, image_data=None, timer=None,
+                 edition=DEFAULT_EDITION, style_cache=None, overrides=None, role=None):
+        """Уже загруженные данные можно передать готовыми (см. build.py):
+        screenshot_mapping, parts — {часть: текст}, anchor_index,
+        image_data — {путь скриншота: bytes}.
+        timer — StageTimer для замеров по этапам (--timings/--profile).
+        edition — имя редакции из editions.json; пути частей, скриншотов
+        и документа берутся относительно её корня.
+        style_cache — общий между генераторами {цвета: шаблон со стилями}.
+        overrides — поля поверх профиля редакции (colors дополняются, а не
+        заменяются), например логотип и цвета партнёра (white_label.py).
+        role — роль из профиля редакции: только её разделы, части и блоки
+        (roles.py), документ пишется в roles/<роль>/.
+        """
+        self.timer = timer or StageTimer()
+        self.edition_name = edition
+        self.edition = load_editions()[edition]
+        for key, value in (overrides or {}).items():
+            if isinstance(value, dict):
+                value = {**self.edition.get(key, {}), **value}
+            self.edition[key] = value
+        self.repo_path = Path(base_path)
+        self.base_path = self.repo_path / self.edition['root']
         self.parts_path = self.base_path / "Части_инструкции"
         self.screenshots_path = self.base_path / "СКРИНШОТЫ"
-        self.output_path = self.base_path / "Финальная_инструкция.docx"
-        self.progress_file = self.base_path / "scripts" / "progress.json"
+        self.role = role
+        self.output_path = self.base_path / self.edition['output']
+        if role is not None:
+            self.output_path = self.base_path / ROLES_DIR / role / self.edition['output']
+        # База состояния одна на репозиторий, части редакций и ролей различаются по имени генератора
+        self.state_file = self.repo_path / DEFAULT_FILE
+        self.state_name = STATE_NAME if edition == DEFAULT_EDITION else f"{STATE_NAME}:{edition}"
+        if role is not None:
+            self.state_name += f"@{role}"
+        self.style_cache = style_cache
+        self.state = None
+        self.run_id = None
+        self._context_hash = None
+        self.pending_records = {}  # часть → запись для базы, пишется после сохранения
         self.screenshot_mapping_file = self.base_path / "scripts" / "screenshot_mapping.json"
 
         # Загружаем маппинг скриншотов
-        self.screenshot_mapping = self.load_screenshot_mapping()
+        if screenshot_mapping is not None:
+            self.screenshot_mapping = screenshot_mapping
+        else:
+            with self.timer.stage("mappings"):
+                self.screenshot_mapping = self.load_screenshot_mapping()
+
+        self.parts = parts
+        self.image_data = image_data or {}
 
-        # Загружаем маппинг гиперссылок
+        # Синонимы якорей для индекса заголовков
         self.hyperlink_mapping_file = self.base_path / "hyperlink_mapping.json"
-        self.hyperlink_mapping = self.load_hyperlink_mapping()
-
-        # Структура финальной инструкции для ОБЛАЧНОЙ версии
-        self.sections = {
-            "intro": {
-                "title": "РАЗДЕЛ I: БЫСТРЫЙ СТАРТ",
-                "parts": [
-                    "00_Что_такое_Цифровой_РОП",
-                    "00_Регистрация_и_вход",
-                    "00_Первые_шаги"
-                ]
-            },
-            "settings": {
-                "title": "РАЗДЕЛ II: НАСТРОЙКИ",
-                "parts": [
-                    "01_Настройки_Шаблоны_скриптов",
-                    "01_Настройки_Скрипты_и_промты",
-                    "01_Настройки_Конверсия",
-                    "01_Настройки_Дополнительные_промты",
-                    "01_Настройки_Таблицы",
-                    "01_Настройки_Пользователи"
-                ]
-            },
-            "analytics": {
-                "title": "РАЗДЕЛ III: АНАЛИТИКА",
-                "parts": [
-                    "02_Аналитика_Коммуникации",
-                    "02_Аналитика_История_сделок",
-                    "02_Аналитика_Менеджеры",
-                    "02_Аналитика_Таблицы"
-                ]
-            },
-            "charts": {
-                "title": "РАЗДЕЛ IV: ГРАФИКИ",
-                "parts": [
-                    "03_Графики_Оценка",
-                    "03_Графики_Менеджеры"
-                ]
-            },
-            "tests": {
-                "title": "РАЗДЕЛ V: ТЕСТЫ",
-                "parts": [
-                    "04_Тесты"
-                ]
-            },
-            "billing": {
-                "title": "РАЗДЕЛ VI: БИЛЛИНГ",
-                "parts": [
-                    "05_Биллинг"
-                ]
-            },
-            "faq": {
-                "title": "РАЗДЕЛ VII: FAQ",
-                "parts": [
-                    "06_FAQ"
-                ]
-            },
-            "glossary": {
-                "title": "РАЗДЕЛ VIII: СЛОВАРЬ ТЕРМИНОВ",
-                "parts": [
-                    "07_Словарь_терминов"
-                ]
-            }
-        }
 
-        self.load_progress()
+        # Структура инструкции — из профиля редакции (и роли)
+        self.sections = self.edition['sections']
+        if role is not None:
+            self.sections = role_sections(self.sections, self.edition['roles'][role])
+
+        # Индекс заголовков: якоря ссылок → закладки Word, названия частей для оглавления
+        if anchor_index is None:
+            with self.timer.stage("index"):
+                full_parts = None
+                if role is not None:
+                    # Ссылки на вырезанные из роли заголовки станут простым текстом
+                    full_parts = {part: self.read_part_content(part, missing=None, full=True)
+                                  for info in self.edition['sections'].values() for part in info['parts']}
+                anchor_index = AnchorIndex.build(
+                    {part: self.read_part_content(part, missing=None)
+                     for info in self.sections.values() for part in info['parts']},
+                    aliases=load_aliases(self.hyperlink_mapping_file),
+                    full_parts=full_parts,
+                )
+        self.anchor_index = anchor_index
+        self.current_part = None
+        # Закладки документа, в который идёт запись (_bookmarks_of)
+        self._bookmark_root = None
+        self._bookmark_names = set()
+        self._bookmark_next_id = 0
+        self.part_images = []
+
+        # Раздельная сборка: часть → файл её раздела, файл собираемого раздела
+        self.section_files = None
+        self.current_file = None
+
+        # Прогресс читается из базы состояния при генерации (load_progress)
+        self.progress = {"completed_sections": [], "completed_parts": []}
+
+    def __getstate__(self):
+        # Воркеру пула (--edition all) — свой таймер, замеры вернутся в отчёте
+        state = self.__dict__.copy()
+        state['timer'] = StageTimer()
+        state['_bookmark_root'] = None
+        return state
 
     def load_screenshot_mapping(self):
         """Загружает маппинг скриншотов из JSON файла"""
@@ -121,27 +278,70 @@ class InstructionGenerator:
                 return data.get('screenshot_mapping', {})
         return {}
 
-    def load_hyperlink_mapping(self):
-        """Загружает маппинг гиперссылок из JSON файла"""
-        if self.hyperlink_mapping_file.exists():
-            with open(self.hyperlink_mapping_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                return data.get('hyperlink_mapping', {})
-        return {}
-
     def load_progress(self):
-        """Загружает прогресс генерации"""
-        if self.progress_file.exists():
-            with open(self.progress_file, 'r', encoding='utf-8') as f:
-                self.progress = json.load(f)
-        else:
-            self.progress = {"completed_sections": [], "completed_parts": []}
+        """Загружает прогресс генерации из базы состояния сборки"""
+        if self.state is None:
+            self.state = BuildState(self.state_file)
+        done = set(self.state.completed_parts(self.state_name))
+        self.progress = {
+            "completed_sections": [
+                key for key, info in self.sections.items()
+                if all(part in done for part in info['parts'])
+            ],
+            "completed_parts": [
+                part for info in self.sections.values() for part in info['parts'] if part in done
+            ],
+        }
+
+    def reset_progress(self):
+        """Сброс прогресса (история сборок в базе остаётся) и удаление документа"""
+        self.load_progress()
+        self.state.forget(self.state_name)
+        if self.output_path.exists():
+            self.output_path.unlink()
+        self.load_progress()
+
+    def context_hash(self):
+        """Хеш общих для всех частей входов: маппинг скриншотов и индекс якорей"""
+        anchors = {anchor: heading.bookmark for anchor, heading in self.anchor_index.anchors.items()}
+        return content_hash(json.dumps([self.screenshot_mapping, anchors], ensure_ascii=False, sort_keys=True))
+
+    def stale_parts(self):
+        """Уже собранные части, у которых изменились исходник, скриншоты или генератор"""
+        context = self.context_hash()
+        return [
+            part for part in self.progress['completed_parts']
+            if not self.state.is_fresh(
+                self.state_name, part, GENERATOR_VERSION,
+                content_hash(self.read_part_content(part)), context, self.base_path,
+            )
+        ]
+
+    def record_part(self, doc, part_name, content, body_start, started):
+        """Готовит запись о собранной части (в базу — после doc.save)"""
+        if self.state is None:
+            return
+
+        fragment = b''.join(
+            element.xml.encode('utf-8') for element in doc.element.body[body_start:]
+            if element.tag != qn('w:sectPr')
+        )
+        images = {}
+        for image_path in self.part_images:
+            data = self.image_data.get(image_path) or image_path.read_bytes()
+            images[image_path.relative_to(self.base_path).as_posix()] = content_hash(data)
+
+        self.pending_records[part_name] = {
+            "source_hash": content_hash(content),
+            "context_hash": self._context_hash or self.context_hash(),
+            "fragment_hash": content_hash(fragment),
+            "image_hashes": images,
+            "duration": time.perf_counter() - started,
+        }
 
-    def save_progress(self):
-        """Сохраняет прогресс генерации"""
-        self.progress_file.parent.mkdir(exist_ok=True)
-        with open(self.progress_file, 'w', encoding='utf-8') as f:
-            json.dump(self.progress, f, ensure_ascii=False, indent=2)
+    def color(self, name):
+        """Цвет редакции из профиля (hex без #) для шрифтов"""
+        return RGBColor.from_string(self.edition['colors'][name])
 
     def setup_document_styles(self, doc):
         """Настройка профессиональных стилей документа"""
@@ -155,14 +355,14 @@ class InstructionGenerator:
         normal_style.paragraph_format.line_spacing = 1.15
         normal_style.paragraph_format.widow_control = True
 
-        # Корпоративный заголовок документа (зелёный как в интерфейсе)
+        # Корпоративный заголовок документа (акцентный цвет редакции)
         if 'Corporate Title' not in [s.name for s in doc.styles]:
             title_style = doc.styles.add_style('Corporate Title', WD_STYLE_TYPE.PARAGRAPH)
             title_font = title_style.font
             title_font.name = 'Calibri'
             title_font.size = Pt(28)
             title_font.bold = True
-            title_font.color.rgb = RGBColor(46, 204, 113)  # Зелёный #2ECC71 (как в интерфейсе)
+            title_font.color.rgb = self.color('accent')
             title_style.paragraph_format.alignment = WD_ALIGN_PARAGRAPH.CENTER
             title_style.paragraph_format.space_after = Pt(30)
             title_style.paragraph_format.space_before = Pt(0)
@@ -184,7 +384,7 @@ class InstructionGenerator:
         heading1_font.name = 'Calibri'
         heading1_font.size = Pt(20)
         heading1_font.bold = True
-        heading1_font.color.rgb = RGBColor(46, 204, 113)  # Зелёный #2ECC71
+        heading1_font.color.rgb = self.color('accent')
         heading1_style.paragraph_format.space_before = Pt(24)
         heading1_style.paragraph_format.space_after = Pt(12)
         heading1_style.paragraph_format.keep_with_next = True
@@ -272,9 +472,30 @@ class InstructionGenerator:
         list_style.paragraph_format.left_indent = Inches(0.25)
         list_style.paragraph_format.space_after = Pt(3)
 
-    def create_document(self):
-        """Создание нового документа с корпоративным оформлением BVMax"""
-        doc = Document()
+    def styled_document(self):
+        """Пустой документ со стилями редакции
+
+        При общем style_cache стили собираются один раз на набор цветов,
+        остальные документы открываются из сохранённого шаблона.
+        """
+        if self.style_cache is None:
+            doc = Document()
+            self.setup_document_styles(doc)
+            return doc
+
+        key = json.dumps(self.edition['colors'], sort_keys=True)
+        if key not in self.style_cache:
+            doc = Document()
+            self.setup_document_styles(doc)
+            buffer = io.BytesIO()
+            doc.save(buffer)
+            self.style_cache[key] = buffer.getvalue()
+        return Document(io.BytesIO(self.style_cache[key]))
+
+    def new_document(self):
+        """Пустой документ A4 со стилями редакции"""
+        import_docx()
+        doc = self.styled_document()
 
         # Настройка полей страницы A4
         section = doc.sections[0]
@@ -284,17 +505,19 @@ class InstructionGenerator:
         section.right_margin = Cm(2.0)
         section.top_margin = Cm(2.0)
         section.bottom_margin = Cm(2.0)
+        return doc
 
-        # Настройка стилей документа
-        self.setup_document_styles(doc)
+    def create_document(self):
+        """Создание нового документа с корпоративным оформлением редакции"""
+        doc = self.new_document()
 
-        # Добавляем логотип BVMax
-        logo_path = self.base_path / "LOGO" / "bvmax_logo.png"
+        # Добавляем логотип редакции
+        logo_path = self.base_path / self.edition['logo']
         if logo_path.exists():
             logo_paragraph = doc.add_paragraph()
             logo_paragraph.alignment = WD_ALIGN_PARAGRAPH.CENTER
             run = logo_paragraph.add_run()
-            run.add_picture(str(logo_path), width=Inches(2.5))
+            run.add_picture(str(logo_path), width=Inches(self.edition['logo_width']))
             doc.add_paragraph()  # Отступ после лого
 
         # Корпоративная титульная страница
@@ -307,26 +530,15 @@ class InstructionGenerator:
         doc.add_paragraph()
 
         # Информационный блок
-        info_table = doc.add_table(rows=4, cols=2)
+        cover = self.edition['cover']
+        info_table = doc.add_table(rows=len(cover), cols=2)
         info_table.style = 'Table Grid'
         info_table.alignment = WD_TABLE_ALIGNMENT.CENTER
 
-        # Заполняем информационную таблицу
-        cells = info_table.rows[0].cells
-        cells[0].text = "Система:"
-        cells[1].text = "Цифровой РОП (облачная версия)"
-
-        cells = info_table.rows[1].cells
-        cells[0].text = "Разработчик:"
-        cells[1].text = "BVMax (https://bvmax.ru)"
-
-        cells = info_table.rows[2].cells
-        cells[0].text = "Дата создания:"
-        cells[1].text = datetime.now().strftime('%d.%m.%Y')
-
-        cells = info_table.rows[3].cells
-        cells[0].text = "URL системы:"
-        cells[1].text = "https://rop.bvmax.ru/login"
+        # Заполняем информационную таблицу ({date} — дата сборки, {url} — адрес продукта)
+        for row, (label, value) in zip(info_table.rows, cover.items()):
+            row.cells[0].text = label
+            row.cells[1].text = value.format(date=build_time().strftime('%d.%m.%Y'), url=self.edition['url'])
 
         # Форматирование таблицы
         for row in info_table.rows:
@@ -339,26 +551,30 @@ class InstructionGenerator:
         doc.add_paragraph()
         doc.add_paragraph()
 
-        description = doc.add_paragraph(
-            "Данная инструкция содержит подробное описание всех функций облачной системы "
-            "анализа телефонных переговоров с использованием искусственного интеллекта. "
-            "Документ предназначен для менеджеров, руководителей отделов продаж и "
-            "администраторов компаний-клиентов платформы Цифровой РОП."
-        )
+        description = doc.add_paragraph(self.edition['description'])
         description.alignment = WD_ALIGN_PARAGRAPH.JUSTIFY
 
         # Контакты поддержки
-        doc.add_paragraph()
-        support = doc.add_paragraph("Контакты поддержки:")
-        support.runs[0].font.bold = True
-        doc.add_paragraph("Telegram: @tchashchin")
-        doc.add_paragraph("Телефон: +79670047879")
+        if self.edition['support']:
+            doc.add_paragraph()
+            support = doc.add_paragraph("Контакты поддержки:")
+            support.runs[0].font.bold = True
+            for contact in self.edition['support']:
+                doc.add_paragraph(contact)
 
         # Разрыв страницы
         doc.add_page_break()
 
         return doc
 
+    def toc_title(self, part_name):
+        """Название части в оглавлении: заголовок без номера, для ненаписанной
+        части — part_titles профиля редакции, иначе None (в оглавление не идёт)"""
+        title = self.anchor_index.part_titles.get(part_name)
+        if title is not None:
+            return TOC_NUMBER_RE.sub('', title)
+        return self.edition.get('part_titles', {}).get(part_name)
+
     def add_table_of_contents(self, doc):
         """Добавление оглавления"""
         toc_header = doc.add_paragraph("ОГЛАВЛЕНИЕ", style='Heading 1')
@@ -379,42 +595,19 @@ class InstructionGenerator:
         # Ручное оглавление
         doc.add_paragraph()
 
-        toc_content = [
-            ("РАЗДЕЛ I: БЫСТРЫЙ СТАРТ", "Heading 2"),
-            ("    1. Что такое Цифровой РОП", None),
-            ("    2. Регистрация и вход в систему", None),
-            ("    3. Первые шаги", None),
-            ("", None),
-            ("РАЗДЕЛ II: НАСТРОЙКИ", "Heading 2"),
-            ("    4. Шаблоны скриптов (чек-листы)", None),
-            ("    5. Скрипты и промты", None),
-            ("    6. Настройка конверсии", None),
-            ("    7. Дополнительные промты", None),
-            ("    8. Таблицы (кастомная аналитика)", None),
-            ("    9. Пользователи", None),
-            ("", None),
-            ("РАЗДЕЛ III: АНАЛИТИКА", "Heading 2"),
-            ("    10. Коммуникации (все звонки)", None),
-            ("    11. История сделок", None),
-            ("    12. Менеджеры (рейтинги)", None),
-            ("    13. Таблицы (результаты)", None),
-            ("", None),
-            ("РАЗДЕЛ IV: ГРАФИКИ", "Heading 2"),
-            ("    14. Оценка качества", None),
-            ("    15. Динамика менеджеров", None),
-            ("", None),
-            ("РАЗДЕЛ V: ТЕСТЫ", "Heading 2"),
-            ("    16. Автоматическое тестирование", None),
-            ("", None),
-            ("РАЗДЕЛ VI: БИЛЛИНГ", "Heading 2"),
-            ("    17. Статистика использования", None),
-            ("", None),
-            ("РАЗДЕЛ VII: FAQ", "Heading 2"),
-            ("    18. Часто задаваемые вопросы", None),
-            ("", None),
-            ("РАЗДЕЛ VIII: СЛОВАРЬ ТЕРМИНОВ", "Heading 2"),
-            ("    19. Глоссарий", None),
-        ]
+        # Оглавление строится по разделам и заголовкам частей из индекса
+        toc_content = []
+        number = 0
+        for section_info in self.sections.values():
+            if toc_content:
+                toc_content.append(("", None))
+            toc_content.append((section_info['title'], "Heading 2"))
+            for part_name in section_info['parts']:
+                part_title = self.toc_title(part_name)
+                if part_title is None:
+                    continue
+                number += 1
+                toc_content.append((f"    {number}. {part_title}", None))
 
         for item_text, style in toc_content:
             if not item_text:
@@ -468,6 +661,20 @@ class InstructionGenerator:
                     return Path(root) / file
         return None
 
+    def picture_source(self, image_path):
+        """Файл для add_picture: bytes из image_data или путь на диске"""
+        data = self.image_data.get(image_path)
+        if data is not None:
+            return io.BytesIO(data)
+        return str(image_path)
+
+    def add_picture(self, run, image_path, width):
+        """Скриншот в run; имя картинки в документе — имя файла, откуда бы ни читались bytes"""
+        shape = run.add_picture(self.picture_source(image_path), width=width)
+        # Из BytesIO python-docx называет каждую картинку image.png
+        shape._inline.graphic.graphicData.pic.nvPicPr.cNvPr.name = image_path.name
+        return shape
+
     def process_text_formatting(self, text):
         """Очищает markdown символы"""
         text = re.sub(r'[#`]', '', text).strip()
@@ -510,10 +717,16 @@ class InstructionGenerator:
                 link_text = part
             elif i % 3 == 2:
                 anchor = "#" + part
-                target_heading = self.hyperlink_mapping.get(anchor, None)
-
-                if target_heading:
-                    self._create_internal_hyperlink(paragraph, link_text, target_heading)
+                heading = self.anchor_index.resolve(anchor, self.current_part)
+
+                target = self.link_target(heading) if heading else None
+                if target:
+                    self._create_document_hyperlink(paragraph, link_text, target)
+                elif heading:
+                    self._create_internal_hyperlink(paragraph, link_text, heading.bookmark)
+                elif anchor in self.anchor_index.removed:
+                    # Заголовок вырезан из сборки роли: ссылка — простой текст
+                    self._add_bold_formatting(paragraph, link_text)
                 else:
                     hyperlink = paragraph.add_run(link_text)
                     hyperlink.font.color.rgb = RGBColor(255, 0, 0)
@@ -646,7 +859,7 @@ class InstructionGenerator:
             title_run = title_p.add_run(title)
             title_run.font.bold = True
             title_run.font.size = Pt(10)
-            title_run.font.color.rgb = RGBColor(46, 204, 113)  # Зелёный #2ECC71
+            title_run.font.color.rgb = self.color('accent')
             cell.add_paragraph()
 
         code_p = cell.add_paragraph()
@@ -657,19 +870,37 @@ class InstructionGenerator:
 
         return table
 
-    def _create_internal_hyperlink(self, paragraph, link_text, target_heading):
-        """Создает внутреннюю гиперссылку Word"""
-        bookmark_id = target_heading.replace(" ", "_").replace(".", "_").replace("-", "_").replace("(", "").replace(")", "")
+    def link_target(self, heading):
+        """Файл и закладка заголовка из другого раздела (--split) или None"""
+        if self.section_files is None:
+            return None
+        file_name = self.section_files.get(heading.part)
+        if file_name is None or file_name == self.current_file:
+            return None
+        return f"{file_name}#{heading.bookmark}"
+
+    def _create_document_hyperlink(self, paragraph, link_text, target):
+        """Гиперссылка на закладку в соседнем файле раздела (file.docx#закладка)"""
+        hyperlink = OxmlElement('w:hyperlink')
+        hyperlink.set(qn('r:id'), paragraph.part.relate_to(target, RT.HYPERLINK, is_external=True))
+        hyperlink.append(self._hyperlink_run(link_text))
+        paragraph._p.append(hyperlink)
 
+    def _create_internal_hyperlink(self, paragraph, link_text, bookmark):
+        """Создает внутреннюю гиперссылку Word на закладку"""
         hyperlink = OxmlElement('w:hyperlink')
-        hyperlink.set(qn('w:anchor'), bookmark_id)
+        hyperlink.set(qn('w:anchor'), bookmark)
+        hyperlink.append(self._hyperlink_run(link_text))
+        paragraph._p.append(hyperlink)
 
+    def _hyperlink_run(self, link_text):
+        """Текст ссылки цветом редакции с подчёркиванием"""
         new_run = OxmlElement('w:r')
 
         rPr = OxmlElement('w:rPr')
 
         c = OxmlElement('w:color')
-        c.set(qn('w:val'), '2A6099')
+        c.set(qn('w:val'), self.edition['colors']['link'])
         rPr.append(c)
 
         u = OxmlElement('w:u')
@@ -681,40 +912,69 @@ class InstructionGenerator:
         t = OxmlElement('w:t')
         t.text = link_text
         new_run.append(t)
+        return new_run
 
-        hyperlink.append(new_run)
-        paragraph._p.append(hyperlink)
+    def _bookmarks_of(self, paragraph):
+        """Занятые имена и следующий w:id закладок документа параграфа
+
+        Считаются один раз на документ: новый, открытый с диска или файл раздела.
+        """
+        root = paragraph._p.getroottree().getroot()
+        if self._bookmark_root is not root:
+            starts = list(root.iter(qn('w:bookmarkStart')))
+            self._bookmark_root = root
+            self._bookmark_names = {start.get(qn('w:name')) for start in starts}
+            self._bookmark_next_id = max((int(start.get(qn('w:id'), 0)) for start in starts), default=-1) + 1
+        return self._bookmark_names
 
     def _add_bookmark(self, paragraph, bookmark_name):
-        """Добавляет закладку к параграфу"""
+        """Добавляет закладку к параграфу; возвращает имя (с суффиксом _1, _2, если занято)"""
+        names = self._bookmarks_of(paragraph)
+        name = bookmark_name
+        counter = 0
+        while name in names:
+            counter += 1
+            name = f"{bookmark_name}_{counter}"
+        names.add(name)
+        number = str(self._bookmark_next_id)
+        self._bookmark_next_id += 1
+
         run = paragraph.runs[0] if paragraph.runs else paragraph.add_run()
         r = run._r
 
         start = OxmlElement('w:bookmarkStart')
-        start.set(qn('w:id'), '0')
-        start.set(qn('w:name'), bookmark_name)
+        start.set(qn('w:id'), number)
+        start.set(qn('w:name'), name)
         r.insert(0, start)
 
         end = OxmlElement('w:bookmarkEnd')
-        end.set(qn('w:id'), '0')
-        end.set(qn('w:name'), bookmark_name)
+        end.set(qn('w:id'), number)
+        end.set(qn('w:name'), name)
         r.append(end)
-
-    def read_part_content(self, part_name):
-        """Чтение содержимого части инструкции"""
-        # Сначала проверяем версию _NEW если существует
-        new_file = self.parts_path / f"{part_name}_NEW.md"
-        if new_file.exists():
-            with open(new_file, 'r', encoding='utf-8') as f:
-                return f.read()
-
-        # Иначе используем обычный файл
-        part_file = self.parts_path / f"{part_name}.md"
-        if part_file.exists():
-            with open(part_file, 'r', encoding='utf-8') as f:
-                return f.read()
-        else:
-            return f"Данный раздел находится в разработке и будет добавлен в следующих версиях."
+        return name
+
+    def heading_bookmark(self, title, seen):
+        """Закладка заголовка текущей части из индекса (её и ждут ссылки)
+
+        seen — {заголовок: сколько раз уже встретился в части}.
+        """
+        occurrence = seen[title] = seen.get(title, -1) + 1
+        names = self.anchor_index.bookmarks.get((self.current_part, title), [])
+        return names[occurrence] if occurrence < len(names) else bookmark_id(title)
+
+    def read_part_content(self, part_name, missing=MISSING_PART, full=False):
+        """Чтение содержимого части инструкции (версия _NEW в приоритете)
+
+        Блоки других ролей вырезаются, метки {ROLE: ...} убираются.
+        missing — что вернуть, если части нет на диске (по умолчанию заглушка редакции).
+        full — блоки всех ролей, как в полной сборке.
+        """
+        content = self.parts.get(part_name) if self.parts is not None else None
+        if content is None:
+            content = read_part(self.parts_path, part_name)
+        if content is None:
+            return self.edition['missing_part'] if missing is MISSING_PART else missing
+        return filter_role_blocks(content, None if full else self.role)
 
     def add_markdown_table(self, doc, table_lines):
         """Добавляет таблицу Markdown в документ Word"""
@@ -758,7 +1018,8 @@ class InstructionGenerator:
             run.font.size = Pt(10)
             run.font.color.rgb = RGBColor(255, 255, 255)
 
-            shading_elm = parse_xml(r'<w:shd {} w:fill="2ECC71"/>'.format('xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'))  # BVMax зелёный
+            shading_elm = parse_xml(r'<w:shd {} w:fill="{}"/>'.format(
+                'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"', self.edition['colors']['table_header']))
             cell._tc.get_or_add_tcPr().append(shading_elm)
 
         for row_idx, row_data in enumerate(data_lines, 1):
@@ -772,6 +1033,165 @@ class InstructionGenerator:
                 run.font.size = Pt(9)
                 run.font.color.rgb = RGBColor(60, 60, 60)
 
+    def render_part(self, doc, content):
+        """Разбор markdown части и добавление блоков в документ"""
+        lines = content.split('\n')
+        current_list_level = 0
+        seen_titles = {}
+
+        in_code_block = False
+        code_block_content = []
+
+        for line_num, line in enumerate(lines, 1):
+            line = line.rstrip()
+
+            # Специальные блоки
+            if line.startswith('{INTERFACE}'):
+                text = line[11:].strip()
+                self.add_interface_block(doc, text)
+                current_list_level = 0
+                continue
+            elif line.startswith('{TECHNICAL}'):
+                text = line[11:].strip()
+                self.add_technical_block(doc, text)
+                current_list_level = 0
+                continue
+
+            # Блоки кода
+            if line.strip() == '```':
+                if in_code_block:
+                    if code_block_content:
+                        self.add_code_block(doc, '\n'.join(code_block_content))
+                    code_block_content = []
+                    in_code_block = False
+                else:
+                    in_code_block = True
+                continue
+
+            if in_code_block:
+                code_block_content.append(line)
+                continue
+
+            if not line:
+                doc.add_paragraph()
+                current_list_level = 0
+                continue
+
+            if line.startswith('# '):
+                clean_title = line[2:].strip()
+                heading_para = doc.add_paragraph(clean_title, style='Heading 2')
+                self._add_bookmark(heading_para, self.heading_bookmark(clean_title, seen_titles))
+                current_list_level = 0
+
+            elif line.startswith('## '):
+                clean_title = line[3:].strip()
+                heading_para = doc.add_paragraph(clean_title, style='Heading 3')
+                self._add_bookmark(heading_para, self.heading_bookmark(clean_title, seen_titles))
+                current_list_level = 0
+
+            elif line.startswith('### '):
+                clean_title = line[4:].strip()
+                p = doc.add_paragraph(clean_title)
+                p.runs[0].font.bold = True
+                p.runs[0].font.size = Pt(12)
+                p.runs[0].font.color.rgb = RGBColor(122, 122, 122)
+                self._add_bookmark(p, self.heading_bookmark(clean_title, seen_titles))
+                current_list_level = 0
+
+            elif line.startswith('|') and '|' in line.strip():
+                table_lines = [line]
+                for next_line_idx in range(line_num, len(lines)):
+                    next_line = lines[next_line_idx].strip()
+                    if next_line.startswith('#') or (next_line and not next_line.startswith('|')):
+                        break
+                    if next_line.startswith('|') and '|' in next_line:
+                        table_lines.append(next_line)
+
+                if len(table_lines) >= 2:
+                    self.add_markdown_table(doc, table_lines)
+                current_list_level = 0
+
+            elif '.png' in line or 'скриншот' in line.lower() or '[СКРИНШОТ:' in line:
+                if '[СКРИНШОТ:' in line:
+                    match = re.search(r'\[СКРИНШОТ:\s*([^\]]+)\]', line)
+                    if match:
+                        image_filename = match.group(1).strip()
+                        screenshot_text = image_filename
+                    else:
+                        continue
+                else:
+                    clean_line = line.replace('*', '').strip()
+
+                    if ' - ' in clean_line:
+                        parts = clean_line.split(' - ', 1)
+                        image_filename = parts[0].strip()
+                        description = parts[1].strip()
+                        screenshot_text = f"{image_filename} - {description}"
+                    else:
+                        image_filename = clean_line.strip()
+                        screenshot_text = image_filename
+
+                with self.timer.stage("screenshots", part=self.current_part):
+                    image_path = self.find_screenshot(image_filename)
+                if image_path and image_path.exists():
+                    self.part_images.append(image_path)
+                    paragraph = doc.add_paragraph()
+                    run = paragraph.add_run()
+                    with self.timer.stage("images", part=self.current_part):
+                        self.add_picture(run, image_path, Inches(6))
+                    paragraph.alignment = WD_ALIGN_PARAGRAPH.CENTER
+
+                    caption = doc.add_paragraph(screenshot_text, style='Screenshot Reference')
+                    caption.alignment = WD_ALIGN_PARAGRAPH.CENTER
+                current_list_level = 0
+
+            elif line.startswith('- ') or line.startswith('* '):
+                list_text = line[2:].strip()
+                if list_text:
+                    p = self.add_formatted_paragraph(doc, list_text, 'List Bullet')
+                current_list_level = 1
+
+            elif re.match(r'^\d+\.\s', line):
+                list_text = re.sub(r'^\d+\.\s', '', line)
+                list_text = re.sub(r'[*#`]', '', list_text).strip()
+                if list_text:
+                    p = doc.add_paragraph(list_text, style='List Number')
+                current_list_level = 1
+
+            elif line.startswith('  - ') or line.startswith('    - '):
+                indent_level = (len(line) - len(line.lstrip())) // 2
+                list_text = line.strip()[2:]
+                p = doc.add_paragraph(list_text, style='List Bullet')
+                p.paragraph_format.left_indent = Inches(0.25 * (indent_level // 2 + 1))
+                current_list_level = 2
+
+            elif line.startswith('http://') or line.startswith('https://'):
+                self.add_code_block(doc, line, "URL:")
+                current_list_level = 0
+
+            elif '`' in line:
+                clean_line = line.replace('*', '')
+                p = doc.add_paragraph()
+                parts = clean_line.split('`')
+                for i, part in enumerate(parts):
+                    if i % 2 == 0:
+                        if part:
+                            p.add_run(part)
+                    else:
+                        run = p.add_run(part)
+                        run.style = 'Code Text'
+                current_list_level = 0
+
+            elif line.strip():
+                clean_line = self.process_text_formatting(line.strip())
+                if clean_line:
+                    if any(keyword in clean_line.lower() for keyword in ['важно', 'внимание', 'примечание', 'note']):
+                        p = self.add_formatted_paragraph(doc, line, 'Important Note')
+                    else:
+                        p = self.add_formatted_paragraph(doc, line)
+                        p.alignment = WD_ALIGN_PARAGRAPH.JUSTIFY
+                current_list_level = 0
+
     def add_section_to_doc(self, doc, section_key, force_regenerate=False):
         """Добавление раздела в документ"""
         section_info = self.sections[section_key]
@@ -784,8 +1204,7 @@ class InstructionGenerator:
 
         section_heading = doc.add_paragraph(section_info['title'], style='Heading 1')
 
-        section_bookmark_id = section_info['title'].replace(" ", "_").replace(".", "_").replace("-", "_").replace("(", "").replace(")", "")
-        self._add_bookmark(section_heading, section_bookmark_id)
+        self._add_bookmark(section_heading, bookmark_id(section_info['title']))
 
         for part_name in section_info['parts']:
             if not force_regenerate and part_name in self.progress['completed_parts']:
@@ -793,160 +1212,21 @@ class InstructionGenerator:
                 continue
 
             print(f"  Добавляем часть: {part_name}")
+            self.current_part = part_name
+            self.part_images = []
+            started = time.perf_counter()
 
-            content = self.read_part_content(part_name)
-
-            lines = content.split('\n')
-            current_list_level = 0
-
-            in_code_block = False
-            code_block_content = []
+            # Новые элементы встают перед завершающим w:sectPr
+            body = doc.element.body
+            body_start = len(body) - 1 if len(body) and body[-1].tag == qn('w:sectPr') else len(body)
 
-            for line_num, line in enumerate(lines, 1):
-                line = line.rstrip()
+            with self.timer.stage("read", part=part_name):
+                content = self.read_part_content(part_name)
 
-                # Специальные блоки
-                if line.startswith('{INTERFACE}'):
-                    text = line[11:].strip()
-                    self.add_interface_block(doc, text)
-                    current_list_level = 0
-                    continue
-                elif line.startswith('{TECHNICAL}'):
-                    text = line[11:].strip()
-                    self.add_technical_block(doc, text)
-                    current_list_level = 0
-                    continue
+            with self.timer.stage("render", part=part_name):
+                self.render_part(doc, content)
 
-                # Блоки кода
-                if line.strip() == '```':
-                    if in_code_block:
-                        if code_block_content:
-                            self.add_code_block(doc, '\n'.join(code_block_content))
-                        code_block_content = []
-                        in_code_block = False
-                    else:
-                        in_code_block = True
-                    continue
-
-                if in_code_block:
-                    code_block_content.append(line)
-                    continue
-
-                if not line:
-                    doc.add_paragraph()
-                    current_list_level = 0
-                    continue
-
-                if line.startswith('# '):
-                    clean_title = line[2:].strip()
-                    heading_para = doc.add_paragraph(clean_title, style='Heading 2')
-                    bookmark_id = clean_title.replace(" ", "_").replace(".", "_").replace("-", "_").replace("(", "").replace(")", "")
-                    self._add_bookmark(heading_para, bookmark_id)
-                    current_list_level = 0
-
-                elif line.startswith('## '):
-                    clean_title = line[3:].strip()
-                    doc.add_paragraph(clean_title, style='Heading 3')
-                    current_list_level = 0
-
-                elif line.startswith('### '):
-                    clean_title = line[4:].strip()
-                    p = doc.add_paragraph(clean_title)
-                    p.runs[0].font.bold = True
-                    p.runs[0].font.size = Pt(12)
-                    p.runs[0].font.color.rgb = RGBColor(122, 122, 122)
-                    current_list_level = 0
-
-                elif line.startswith('|') and '|' in line.strip():
-                    table_lines = [line]
-                    for next_line_idx in range(line_num, len(lines)):
-                        next_line = lines[next_line_idx].strip()
-                        if next_line.startswith('#') or (next_line and not next_line.startswith('|')):
-                            break
-                        if next_line.startswith('|') and '|' in next_line:
-                            table_lines.append(next_line)
-
-                    if len(table_lines) >= 2:
-                        self.add_markdown_table(doc, table_lines)
-                    current_list_level = 0
-
-                elif '.png' in line or 'скриншот' in line.lower() or '[СКРИНШОТ:' in line:
-                    if '[СКРИНШОТ:' in line:
-                        match = re.search(r'\[СКРИНШОТ:\s*([^\]]+)\]', line)
-                        if match:
-                            image_filename = match.group(1).strip()
-                            screenshot_text = image_filename
-                        else:
-                            continue
-                    else:
-                        clean_line = line.replace('*', '').strip()
-
-                        if ' - ' in clean_line:
-                            parts = clean_line.split(' - ', 1)
-                            image_filename = parts[0].strip()
-                            description = parts[1].strip()
-                            screenshot_text = f"{image_filename} - {description}"
-                        else:
-                            image_filename = clean_line.strip()
-                            screenshot_text = image_filename
-
-                    image_path = self.find_screenshot(image_filename)
-                    if image_path and image_path.exists():
-                        paragraph = doc.add_paragraph()
-                        run = paragraph.add_run()
-                        run.add_picture(str(image_path), width=Inches(6))
-                        paragraph.alignment = WD_ALIGN_PARAGRAPH.CENTER
-
-                        caption = doc.add_paragraph(screenshot_text, style='Screenshot Reference')
-                        caption.alignment = WD_ALIGN_PARAGRAPH.CENTER
-                    current_list_level = 0
-
-                elif line.startswith('- ') or line.startswith('* '):
-                    list_text = line[2:].strip()
-                    if list_text:
-                        p = self.add_formatted_paragraph(doc, list_text, 'List Bullet')
-                    current_list_level = 1
-
-                elif re.match(r'^\d+\.\s', line):
-                    list_text = re.sub(r'^\d+\.\s', '', line)
-                    list_text = re.sub(r'[*#`]', '', list_text).strip()
-                    if list_text:
-                        p = doc.add_paragraph(list_text, style='List Number')
-                    current_list_level = 1
-
-                elif line.startswith('  - ') or line.startswith('    - '):
-                    indent_level = (len(line) - len(line.lstrip())) // 2
-                    list_text = line.strip()[2:]
-                    p = doc.add_paragraph(list_text, style='List Bullet')
-                    p.paragraph_format.left_indent = Inches(0.25 * (indent_level // 2 + 1))
-                    current_list_level = 2
-
-                elif line.startswith('http://') or line.startswith('https://'):
-                    self.add_code_block(doc, line, "URL:")
-                    current_list_level = 0
-
-                elif '`' in line:
-                    clean_line = line.replace('*', '')
-                    p = doc.add_paragraph()
-                    parts = clean_line.split('`')
-                    for i, part in enumerate(parts):
-                        if i % 2 == 0:
-                            if part:
-                                p.add_run(part)
-                        else:
-                            run = p.add_run(part)
-                            run.style = 'Code Text'
-                    current_list_level = 0
-
-                elif line.strip():
-                    clean_line = self.process_text_formatting(line.strip())
-                    if clean_line:
-                        if any(keyword in clean_line.lower() for keyword in ['важно', 'внимание', 'примечание', 'note']):
-                            p = self.add_formatted_paragraph(doc, line, 'Important Note')
-                        else:
-                            p = self.add_formatted_paragraph(doc, line)
-                            p.alignment = WD_ALIGN_PARAGRAPH.JUSTIFY
-                    current_list_level = 0
+            self.record_part(doc, part_name, content, body_start, started)
 
             if part_name not in self.progress['completed_parts']:
                 self.progress['completed_parts'].append(part_name)
@@ -956,21 +1236,74 @@ class InstructionGenerator:
 
         doc.add_page_break()
 
+    def normalize_properties(self, doc, moment):
+        """Свойства документа (docProps/core.xml) без следов шаблона python-docx"""
+        props = doc.core_properties
+        props.title = self.edition['title']
+        props.subject = "Полное руководство пользователя"
+        props.author = props.last_modified_by = ""
+        props.comments = ""
+        props.revision = 1
+        props.created = props.modified = moment
+
+    def save_document(self, doc, target):
+        """Сохраняет документ воспроизводимо (write_docx) в путь или поток"""
+        moment = build_time()
+        self.normalize_properties(doc, moment)
+        write_docx(str(target) if isinstance(target, Path) else target, package_entries(doc), moment)
+
+    def render(self, sections_to_generate=None):
+        """Документ целиком в памяти: bytes DOCX
+
+        Без записи на диск и в базу состояния (instruction_api.py).
+        """
+        with self.timer.stage("document"):
+            doc = self.create_document()
+            self.add_table_of_contents(doc)
+        self.progress = {"completed_sections": [], "completed_parts": []}
+
+        for section_key in sections_to_generate or list(self.sections):
+            self.add_section_to_doc(doc, section_key, force_regenerate=True)
+        self.anchor_index.report_dangling()
+
+        buffer = io.BytesIO()
+        with self.timer.stage("save"):
+            self.save_document(doc, buffer)
+        return buffer.getvalue()
+
     def generate(self, sections_to_generate=None, force_regenerate=False):
         """Основная функция генерации"""
         print("=" * 60)
-        print("Генератор инструкции Цифровой РОП (облачная версия)")
+        print(f"Генератор инструкции {self.edition['title']}")
+        if self.role is not None:
+            print(f"Роль: {self.edition['roles'][self.role]['title']}")
         print("=" * 60)
 
-        if self.output_path.exists() and not force_regenerate:
-            print("Открываем существующий документ...")
-            doc = Document(str(self.output_path))
-        else:
-            print("Создаём новый документ...")
-            doc = self.create_document()
-            self.add_table_of_contents(doc)
-            if force_regenerate:
-                self.progress = {"completed_sections": [], "completed_parts": []}
+        self.load_progress()
+        self.run_id = self.state.start_run(self.state_name, GENERATOR_VERSION)
+        self._context_hash = self.context_hash()
+
+        if not self.output_path.exists():
+            # Нет документа — нет и собранных частей
+            self.progress = {"completed_sections": [], "completed_parts": []}
+        elif not force_regenerate:
+            stale = self.stale_parts()
+            if stale:
+                print(f"Изменились части: {', '.join(stale)}")
+                print("Документ пересобирается целиком...")
+                force_regenerate = True
+
+        with self.timer.stage("document"):
+            import_docx()
+            if self.output_path.exists() and not force_regenerate:
+                print("Открываем существующий документ...")
+                doc = Document(str(self.output_path))
+            else:
+                print("Создаём новый документ...")
+                doc = self.create_document()
+                self.add_table_of_contents(doc)
+                if force_regenerate:
+                    self.progress = {"completed_sections": [], "completed_parts": []}
 
         if sections_to_generate:
             target_sections = sections_to_generate
@@ -983,48 +1316,336 @@ class InstructionGenerator:
             else:
                 print(f"ОШИБКА: Неизвестный раздел: {section_key}")
 
+        self.anchor_index.report_dangling()
+
         print("Сохраняем документ...")
-        doc.save(str(self.output_path))
-        self.save_progress()
+        with self.timer.stage("save"):
+            self.output_path.parent.mkdir(parents=True, exist_ok=True)
+            self.save_document(doc, self.output_path)
+        self.state.record_parts(self.run_id, self.state_name, GENERATOR_VERSION, self.pending_records)
+        self.pending_records = {}
+        self.state.finish_run(self.run_id)
 
         print("=" * 60)
         print(f"ГОТОВО: {self.output_path}")
         print(f"Прогресс: {len(self.progress['completed_parts'])} частей создано")
         print("=" * 60)
 
+    @property
+    def split_path(self):
+        """Каталог раздельной сборки: рядом с документом, под его именем"""
+        return self.output_path.with_suffix('')
+
+    def split_file_names(self):
+        """Раздел → имя его файла в раздельной сборке"""
+        return {key: f"{number:02d}_{key}.docx" for number, key in enumerate(self.sections, 1)}
+
+    def render_section(self, section_key):
+        """Файл одного раздела (--split): без титула и оглавления"""
+        self.current_file = self.split_file_names()[section_key]
+        with self.timer.stage("document"):
+            doc = self.new_document()
+        self.add_section_to_doc(doc, section_key, force_regenerate=True)
+
+        path = self.split_path / self.current_file
+        with self.timer.stage("save"):
+            self.save_document(doc, path)
+        return path
+
+    def create_index_document(self):
+        """Оглавление раздельной сборки: титул и ссылки на закладки разделов и частей"""
+        files = self.split_file_names()
+        doc = self.create_document()
+
+        header = doc.add_paragraph("ОГЛАВЛЕНИЕ", style='Heading 1')
+        header.alignment = WD_ALIGN_PARAGRAPH.CENTER
+        note = doc.add_paragraph(
+            "Каждый раздел инструкции — отдельный файл в этой папке. "
+            "Ссылки открывают нужный раздел, поэтому файлы разделов должны лежать рядом с оглавлением."
+        )
+        note.style = 'Important Note'
+        doc.add_paragraph()
+
+        number = 0
+        for key, info in self.sections.items():
+            p = doc.add_paragraph(style='Heading 2')
+            section_bookmark = self._add_bookmark(p, bookmark_id(info['title']))
+            self._create_document_hyperlink(p, info['title'], f"{files[key]}#{section_bookmark}")
+            for part_name in info['parts']:
+                toc_title = self.toc_title(part_name)
+                if toc_title is None:
+                    continue
+                number += 1
+                p = doc.add_paragraph()
+                p.paragraph_format.left_indent = Inches(0.25)
+                part_title = self.anchor_index.part_titles.get(part_name)
+                target = files[key]
+                if part_title is not None:
+                    target += f"#{self.anchor_index.bookmarks[(part_name, part_title)][0]}"
+                self._create_document_hyperlink(p, f"{number}. {toc_title}", target)
+        return doc
+
+    def generate_split(self, sections_to_generate=None, jobs=None):
+        """Раздельная сборка: файл на раздел (на пуле процессов) и оглавление
+
+        sections_to_generate — пересобрать только эти разделы, файлы
+        остальных остаются как есть. База состояния не используется.
+        """
+        print("=" * 60)
+        print(f"Генератор инструкции {self.edition['title']}: по разделам")
+        if self.role is not None:
+            print(f"Роль: {self.edition['roles'][self.role]['title']}")
+        print("=" * 60)
+
+        files = self.split_file_names()
+        self.section_files = {part: files[key] for key, info in self.sections.items() for part in info['parts']}
+        targets = []
+        for section_key in sections_to_generate or list(self.sections):
+            if section_key in self.sections:
+                targets.append(section_key)
+            else:
+                print(f"ОШИБКА: Неизвестный раздел: {section_key}")
+        self.split_path.mkdir(parents=True, exist_ok=True)
+
+        if jobs is None:
+            jobs = min(len(targets), os.cpu_count() or 1)
+        if self.timer.profile or self.timer.memory:
+            jobs = 1
+        if jobs <= 1 or len(targets) < 2:
+            for section_key in targets:
+                self.render_section(section_key)
+        else:
+            # Шаблон стилей собирается до пула и уходит воркерам готовым
+            if self.style_cache is None:
+                self.style_cache = {}
+            with self.timer.stage("styles"):
+                import_docx()
+                self.styled_document()
+            with ProcessPoolExecutor(max_workers=jobs, initializer=_init_split_worker, initargs=(self,)) as executor:
+                for log, timings, dangling in executor.map(_render_split_section, targets):
+                    print(log, end='')
+                    self.timer.merge(timings)
+                    self.anchor_index.dangling.extend(dangling)
+
+        # Файлы разделов, которых больше нет в редакции
+        for path in self.split_path.glob("*.docx"):
+            if path.name not in files.values() and path.name != SPLIT_INDEX_NAME:
+                path.unlink()
+
+        print("Создаём оглавление...")
+        self.current_file = SPLIT_INDEX_NAME
+        with self.timer.stage("index_document"):
+            self.save_document(self.create_index_document(), self.split_path / SPLIT_INDEX_NAME)
+        self.anchor_index.report_dangling()
+
+        print("=" * 60)
+        print(f"ГОТОВО: {self.split_path}")
+        for name in [SPLIT_INDEX_NAME, *files.values()]:
+            path = self.split_path / name
+            if path.exists():
+                print(f"  {name:<30} {path.stat().st_size / 1024 / 1024:6.1f} МБ")
+        print("=" * 60)
+
+
+# Генератор раздельной сборки в воркере пула (передаётся один раз на процесс)
+_split_generator = None
+
+
+def _init_split_worker(generator):
+    global _split_generator
+    _split_generator = generator
+
+
+def _render_split_section(section_key):
+    """Один раздел в воркере пула: вывод, замеры и неразрешённые ссылки возвращаются целиком"""
+    generator = _split_generator
+    generator.timer = StageTimer()
+    generator.anchor_index.dangling = []
+    log = io.StringIO()
+    with redirect_stdout(log):
+        generator.render_section(section_key)
+    return log.getvalue(), generator.timer.report(), generator.anchor_index.dangling
+
+
+def _generate_edition(generator, sections_to_generate, force_regenerate):
+    """Сборка одной редакции в воркере пула: вывод и замеры возвращаются целиком"""
+    log = io.StringIO()
+    with redirect_stdout(log):
+        generator.generate(sections_to_generate=sections_to_generate, force_regenerate=force_regenerate)
+    return log.getvalue(), generator.timer.report()
+
+
+def build_editions(base_path, targets, sections_to_generate=None, force_regenerate=False, jobs=None, timer=None,
+                   shared=None, style_cache=None, generate=True):
+    """Сборка нескольких редакций и ролей за один запуск
+
+    targets — [(редакция, роль или None)]. Маппинг скриншотов, части
+    и скриншоты читаются один раз на корень редакции, стили собираются
+    один раз на набор цветов. Сами документы собираются на пуле процессов
+    (jobs=1 — последовательно). Возвращает генераторы в порядке targets.
+    shared — {корень: {screenshots, aliases, parts, images}} и style_cache
+    можно передать снаружи, чтобы они жили между запусками (build_daemon.py).
+    generate=False — только подготовить генераторы, без сборки.
+    """
+    timer = timer or StageTimer()
+    base_path = Path(base_path)
+    editions = load_editions()
+    shared = {} if shared is None else shared
+    style_cache = {} if style_cache is None else style_cache
+    generators = []
+
+    for name, role in targets:
+        root = base_path / editions[name]['root']
+        sections = editions[name]['sections']
+        if role is not None:
+            sections = role_sections(sections, editions[name]['roles'][role])
+        part_names = [part for info in sections.values() for part in info['parts']]
+        all_names = [part for info in editions[name]['sections'].values() for part in info['parts']]
+
+        if root not in shared:
+            with timer.stage("mappings"):
+                mapping_file = root / "scripts" / "screenshot_mapping.json"
+                screenshots = {}
+                if mapping_file.exists():
+                    with open(mapping_file, 'r', encoding='utf-8') as f:
+                        screenshots = json.load(f).get('screenshot_mapping', {})
+                aliases = load_aliases(root / "hyperlink_mapping.json")
+            with timer.stage("screenshot_files"):
+                images = {}
+                for rel_path in screenshots.values():
+                    path = root / rel_path
+                    if path.exists() and path not in images:
+                        images[path] = path.read_bytes()
+            shared[root] = {"screenshots": screenshots, "aliases": aliases, "parts": {}, "images": images}
+
+        inputs = shared[root]
+        with timer.stage("parts"):
+            for part in all_names if role is not None else part_names:
+                if part not in inputs["parts"]:
+                    inputs["parts"][part] = read_part(root / "Части_инструкции", part)
+        with timer.stage("index"):
+            index = AnchorIndex.build(
+                {part: filter_role_blocks(inputs["parts"][part], role) for part in part_names},
+                aliases=inputs["aliases"],
+                full_parts={part: filter_role_blocks(inputs["parts"][part]) for part in all_names}
+                if role is not None else None,
+            )
+
+        generators.append(InstructionGenerator(
+            base_path,
+            screenshot_mapping=inputs["screenshots"],
+            parts=inputs["parts"],
+            anchor_index=index,
+            image_data=inputs["images"],
+            timer=timer,
+            edition=name,
+            style_cache=style_cache,
+            role=role,
+        ))
 
-def main():
-    parser = argparse.ArgumentParser(description='Генератор инструкции Цифровой РОП (облачная версия)')
+    if not generate:
+        return generators
+
+    if jobs is None:
+        jobs = min(len(generators), os.cpu_count() or 1)
+    if timer.profile or timer.memory:
+        jobs = 1
+    if jobs == 1 or len(generators) < 2:
+        for generator in generators:
+            generator.generate(sections_to_generate=sections_to_generate, force_regenerate=force_regenerate)
+        return generators
+
+    # Шаблоны стилей собираются до пула и уходят воркерам готовыми
+    with timer.stage("styles"):
+        import_docx()
+        for generator in generators:
+            generator.styled_document()
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        results = executor.map(
+            _generate_edition, generators,
+            [sections_to_generate] * len(generators), [force_regenerate] * len(generators),
+        )
+        for log, timings in results:
+            print(log, end='')
+            timer.merge(timings)
+    return generators
+
+
+def main(argv=None):
+    editions = load_editions()
+    parser = argparse.ArgumentParser(description='Генератор инструкции Цифровой РОП')
+    parser.add_argument('--edition', choices=[*editions, 'all'], default=DEFAULT_EDITION,
+                        help=f'Редакция из editions.json или all (по умолчанию {DEFAULT_EDITION})')
+    parser.add_argument('--role', help='Роль из профиля редакции (roles.py) или all — все роли')
+    parser.add_argument('--jobs', type=int,
+                        help='Процессов для --edition all и --split (по умолчанию по числу редакций / разделов)')
     parser.add_argument('--sections', nargs='+', help='Конкретные разделы для генерации')
     parser.add_argument('--force', action='store_true', help='Принудительная перезапись всех разделов')
     parser.add_argument('--reset', action='store_true', help='Сброс прогресса и создание нового документа')
     parser.add_argument('--list', action='store_true', help='Показать доступные разделы')
+    parser.add_argument('--split', action='store_true',
+                        help='Файл на каждый раздел и документ-оглавление (каталог рядом с документом)')
+    parser.add_argument('--timings', nargs='?', const='timings/docx.json', metavar='JSON',
+                        help='Время по этапам и частям (JSON, по умолчанию timings/docx.json)')
+    parser.add_argument('--profile', action='store_true', help='cProfile для каждого этапа (вместе с --timings)')
+    parser.add_argument('--memprofile', action='store_true',
+                        help='tracemalloc по частям и сохранению: пик, остаток, места аллокаций (замедляет сборку)')
 
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     base_path = Path(__file__).parent.parent
-    generator = InstructionGenerator(base_path)
+    names = list(editions) if args.edition == 'all' else [args.edition]
+    if args.role == 'all':
+        targets = [(name, role) for name in names for role in editions[name].get('roles', {})]
+    elif args.role:
+        targets = [(name, args.role) for name in names if args.role in editions[name].get('roles', {})]
+        if not targets:
+            parser.error(f"роль {args.role} не описана в editions.json")
+    else:
+        targets = [(name, None) for name in names]
 
     if args.list:
-        print("Доступные разделы:")
-        for key, info in generator.sections.items():
-            print(f"  {key}: {info['title']}")
-            for part in info['parts']:
-                print(f"      - {part}")
+        for name, role in targets:
+            sections = editions[name]['sections']
+            title = editions[name]['title']
+            if role is not None:
+                sections = role_sections(sections, editions[name]['roles'][role])
+                title += f", роль: {editions[name]['roles'][role]['title']}"
+            print(f"Доступные разделы ({name}: {title}):")
+            for key, info in sections.items():
+                print(f"  {key}: {info['title']}")
+                for part in info['parts']:
+                    print(f"      - {part}")
         return
 
+    if (args.profile or args.memprofile) and not args.timings:
+        args.timings = 'timings/docx.json'
+    timer = StageTimer(profile=args.profile, memory=args.memprofile)
+
     if args.reset:
         print("Сброс прогресса...")
-        if generator.progress_file.exists():
-            generator.progress_file.unlink()
-        if generator.output_path.exists():
-            generator.output_path.unlink()
-        generator.load_progress()
-
-    generator.generate(
-        sections_to_generate=args.sections,
-        force_regenerate=args.force or args.reset
-    )
+        for name, role in targets:
+            InstructionGenerator(base_path, screenshot_mapping={}, parts={}, anchor_index=AnchorIndex(),
+                                 edition=name, role=role).reset_progress()
+
+    if args.split:
+        generators = build_editions(base_path, targets, timer=timer, generate=False)
+        for generator in generators:
+            generator.generate_split(args.sections, jobs=args.jobs)
+    elif len(targets) > 1:
+        build_editions(base_path, targets, args.sections, args.force or args.reset, jobs=args.jobs, timer=timer)
+    else:
+        name, role = targets[0]
+        generator = InstructionGenerator(base_path, timer=timer, edition=name, role=role)
+        generator.generate(
+            sections_to_generate=args.sections,
+            force_regenerate=args.force or args.reset
+        )
+
+    if args.timings:
+        timer.print_summary()
+        timer.write_json(base_path / args.timings)
 
 
 if __name__ == "__main__":
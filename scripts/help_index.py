@@ -0,0 +1,444 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Полнотекстовый индекс инструкции для контекстной справки (SQLite FTS5)
+
+Интерфейс продукта по названию экрана ("Коммуникации", "Шаблоны скриптов")
+показывает подходящие места инструкции. Индекс — один файл SQLite без
+поискового сервера, запрос занимает доли миллисекунды.
+
+Что индексируется (все части всех редакций):
+- заголовок — вместе со всем текстом до следующего заголовка и списком
+  скриншотов под ним (kind = heading)
+- абзац — отдельной записью с ближайшим заголовком (kind = paragraph)
+Для каждой записи хранятся якорь сайта (url, anchor как у MkDocs),
+закладка Word, скриншоты (имя и путь в СКРИНШОТЫ/) и роли блока
+{ROLE: ...} — справка для менеджера не покажет блоки администратора.
+
+Русский поиск: unicode61 в FTS5 не знает морфологии, поэтому рядом
+с текстом индексируются основы слов (Snowball из nltk), запрос проходит
+через тот же стеммер. Без nltk индексируются словоформы, поиск ищет
+по началу слова.
+
+Обновление инкрементальное: у каждой части хранится хеш текста, страницы
+и маппинга скриншотов, перестраиваются только изменившиеся части.
+Смена версии разбора или стеммера пересобирает индекс целиком.
+
+    python scripts/help_index.py                          # обновить help_index.db
+    python scripts/help_index.py --query "Коммуникации"
+    python scripts/help_index.py --query "шаблоны скриптов" --role manager
+"""
+
+import re
+import json
+import sqlite3
+import argparse
+import time
+from datetime import datetime
+from pathlib import Path
+
+from anchor_index import AnchorIndex, bookmark_id, iter_headings, read_part
+from build_state import content_hash
+from roles import ROLE_END, block_roles, role_parts
+
+
+DEFAULT_FILE = "help_index.db"
+
+# Версия разбора частей: при изменении индекс пересобирается целиком
+INDEX_VERSION = "1"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS parts (
+    edition TEXT NOT NULL,
+    part TEXT NOT NULL,
+    hash TEXT NOT NULL,
+    passages INTEGER NOT NULL,
+    built_at TEXT NOT NULL,
+    PRIMARY KEY (edition, part)
+);
+CREATE TABLE IF NOT EXISTS passages (
+    id INTEGER PRIMARY KEY,
+    edition TEXT NOT NULL,
+    part TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    level INTEGER NOT NULL,
+    roles TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    heading TEXT NOT NULL,
+    url TEXT,
+    anchor TEXT,
+    bookmark TEXT,
+    screenshots TEXT NOT NULL,
+    text TEXT NOT NULL,
+    heading_stems TEXT NOT NULL,
+    text_stems TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS passages_part ON passages (edition, part);
+CREATE VIRTUAL TABLE IF NOT EXISTS passages_fts USING fts5(
+    heading_stems, text_stems,
+    content = 'passages', content_rowid = 'id',
+    tokenize = 'unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS passages_insert AFTER INSERT ON passages BEGIN
+    INSERT INTO passages_fts (rowid, heading_stems, text_stems) VALUES (new.id, new.heading_stems, new.text_stems);
+END;
+CREATE TRIGGER IF NOT EXISTS passages_delete AFTER DELETE ON passages BEGIN
+    INSERT INTO passages_fts (passages_fts, rowid, heading_stems, text_stems)
+    VALUES ('delete', old.id, old.heading_stems, old.text_stems);
+END;
+"""
+
+# Поля результата поиска
+RESULT_COLUMNS = "heading, text, part, kind, level, roles, url, anchor, bookmark, screenshots"
+
+# Вес совпадения в заголовке против совпадения в тексте (bm25) и прибавка
+# заголовкам страниц и разделов: экран ищут по названию его страницы
+HEADING_WEIGHT = 10.0
+LEVEL_BOOST = "CASE level WHEN 1 THEN 2.0 WHEN 2 THEN 1.5 ELSE 1.0 END"
+
+WORD_RE = re.compile(r'[0-9a-zа-яё]+')
+LINK_RE = re.compile(r'\[([^\]]+)\]\([^)]*\)')
+SCREENSHOT_RE = re.compile(r'\[СКРИНШОТ:\s*([^\]]+)\]|\*\*([^*]+\.png)\*\*')
+LIST_MARKER_RE = re.compile(r'^\s*(?:[-*+]|\d+\.)\s+')
+TABLE_SEPARATOR_RE = re.compile(r'^\|?[\s:|-]+\|?$')
+BLOCK_PREFIXES = ('{INTERFACE}', '{TECHNICAL}')
+
+
+def load_stemmer():
+    """Snowball-стеммер для русского из nltk или None"""
+    try:
+        from nltk.stem.snowball import RussianStemmer
+    except ImportError:
+        return None
+    return RussianStemmer()
+
+
+def page_url(page, slug=None):
+    """Адрес страницы MkDocs (use_directory_urls) с якорем"""
+    if page is None:
+        return None
+    url = page[:-len('.md')]
+    if url == 'index' or url.endswith('/index'):
+        url = url[:-len('index')]
+    else:
+        url += '/'
+    return f"{url}#{slug}" if slug else url
+
+
+def plain_text(line):
+    """Строка части без разметки: ссылки, выделение, маркеры списков и таблиц"""
+    for prefix in BLOCK_PREFIXES:
+        if line.startswith(prefix):
+            line = line[len(prefix):]
+    line = LINK_RE.sub(r'\1', line)
+    line = LIST_MARKER_RE.sub('', line)
+    if line.lstrip().startswith('|'):
+        line = ' '.join(cell.strip() for cell in line.strip().strip('|').split('|'))
+    return line.replace('**', '').replace('__', '').replace('`', '').strip()
+
+
+class HelpIndex:
+    def __init__(self, db_path, stemmer=None):
+        self.db_path = Path(db_path)
+        self.stemmer = stemmer if stemmer is not None else load_stemmer()
+        self.stemmer_name = "snowball-ru" if self.stemmer is not None else "none"
+        self.conn = sqlite3.connect(str(self.db_path))
+        self.conn.row_factory = sqlite3.Row
+        self._role_parts = {}  # (редакция, роль) → части роли
+        with self.conn:
+            self.conn.executescript(SCHEMA)
+            self.check_version()
+
+    def close(self):
+        self.conn.close()
+
+    def check_version(self):
+        """Другая версия разбора или стеммер — индекс очищается"""
+        meta = dict(self.conn.execute("SELECT key, value FROM meta").fetchall())
+        expected = {"version": INDEX_VERSION, "stemmer": self.stemmer_name}
+        if all(meta.get(key) == value for key, value in expected.items()):
+            return
+        self.conn.execute("DELETE FROM passages")
+        self.conn.execute("DELETE FROM parts")
+        self.conn.execute("INSERT INTO passages_fts (passages_fts) VALUES ('rebuild')")
+        self.conn.executemany("INSERT OR REPLACE INTO meta VALUES (?, ?)", expected.items())
+
+    # --- разбор ---
+
+    def stems(self, text):
+        words = WORD_RE.findall(text.lower().replace('ё', 'е'))
+        if self.stemmer is not None:
+            words = [self.stemmer.stem(word) for word in words]
+        return ' '.join(words)
+
+    def passages(self, content, page, screenshot_mapping):
+        """Записи индекса одной части: заголовки и абзацы по порядку"""
+        headings = {line_number: (level, title, slug) for line_number, level, title, slug in iter_headings(content)}
+        passages = []
+        section = None      # запись текущего заголовка
+        paragraph = []      # строки текущего абзаца
+        roles = ""          # роли текущего блока {ROLE: ...}
+        in_code_block = False
+
+        def add(kind, level, title, slug, text, block_roles=""):
+            record = {
+                "kind": kind, "level": level, "heading": title or "", "slug": slug, "text": text,
+                "roles": block_roles, "url": page_url(page, slug), "anchor": f"#{slug}" if slug else None,
+                "bookmark": bookmark_id(title) if title else None, "screenshots": [],
+            }
+            passages.append(record)
+            return record
+
+        def flush():
+            if paragraph:
+                text = ' '.join(paragraph)
+                if section is not None:
+                    section["text"] = f"{section['text']} {text}".strip()
+                    add("paragraph", section["level"], section["heading"], section["slug"], text, roles)
+                else:
+                    add("paragraph", 0, None, None, text, roles)
+                paragraph.clear()
+
+        for line_number, line in enumerate(content.split('\n')):
+            stripped = line.strip()
+            if stripped.startswith('```'):
+                in_code_block = not in_code_block
+                flush()
+                continue
+            if not in_code_block:
+                start = block_roles(stripped)
+                if start is not None or stripped == ROLE_END:
+                    flush()
+                    roles = ' '.join(sorted(start)) if start else ""
+                    continue
+                if line_number in headings:
+                    flush()
+                    level, title, slug = headings[line_number]
+                    section = add("heading", level, title, slug, "", roles)
+                    continue
+                screenshot = SCREENSHOT_RE.search(stripped)
+                if screenshot:
+                    flush()
+                    name = (screenshot.group(1) or screenshot.group(2)).strip()
+                    if section is not None:
+                        section["screenshots"].append({"name": name, "path": screenshot_mapping.get(name)})
+                    continue
+                if not stripped or TABLE_SEPARATOR_RE.match(stripped):
+                    flush()
+                    continue
+            text = plain_text(line) if not in_code_block else stripped
+            if text:
+                paragraph.append(text)
+        flush()
+        return passages
+
+    # --- обновление ---
+
+    def update_part(self, edition, part, content, page, screenshot_mapping, mapping_hash):
+        """Перестраивает записи части, если изменился её хеш; True — перестроена"""
+        part_hash = content_hash(json.dumps(
+            [content, page, mapping_hash], ensure_ascii=False,
+        ))
+        row = self.conn.execute(
+            "SELECT hash FROM parts WHERE edition = ? AND part = ?", (edition, part)
+        ).fetchone()
+        if row is not None and row["hash"] == part_hash:
+            return False
+
+        self.conn.execute("DELETE FROM passages WHERE edition = ? AND part = ?", (edition, part))
+        passages = self.passages(content, page, screenshot_mapping) if content is not None else []
+        self.conn.executemany(
+            "INSERT INTO passages (heading, text, heading_stems, text_stems, edition, part, kind, level, roles, "
+            "url, anchor, bookmark, screenshots, position) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [
+                # Заголовок ищется только у записи заголовка, абзацы — по своему тексту
+                (record["heading"], record["text"],
+                 self.stems(record["heading"]) if record["kind"] == "heading" else "", self.stems(record["text"]),
+                 edition, part, record["kind"], record["level"], record["roles"], record["url"], record["anchor"],
+                 record["bookmark"], json.dumps(record["screenshots"], ensure_ascii=False), position)
+                for position, record in enumerate(passages)
+            ],
+        )
+        self.conn.execute(
+            "INSERT OR REPLACE INTO parts VALUES (?, ?, ?, ?, ?)",
+            (edition, part, part_hash, len(passages), datetime.now().isoformat(timespec='seconds')),
+        )
+        return True
+
+    def update(self, base_path, editions=None, parts=None, screenshot_mapping=None):
+        """Обновляет индекс по частям редакций; возвращает {редакция: перестроенные части}
+
+        parts, screenshot_mapping — уже прочитанные входы облачной
+        редакции (build.py), остальные читаются с диска.
+        """
+        from convert_to_mkdocs import MkDocsConverter
+        from generate_instruction import DEFAULT_EDITION, load_editions
+
+        base_path = Path(base_path)
+        profiles = load_editions()
+        file_mapping = MkDocsConverter(base_path, screenshot_mapping={}, parts={}, anchor_index=AnchorIndex()).file_mapping
+        updated = {}
+
+        for edition in editions or list(profiles):
+            profile = profiles[edition]
+            root = base_path / profile['root']
+            is_default = edition == DEFAULT_EDITION
+            mapping = screenshot_mapping if is_default and screenshot_mapping is not None else None
+            if mapping is None:
+                mapping_file = root / "scripts" / "screenshot_mapping.json"
+                mapping = {}
+                if mapping_file.exists():
+                    with open(mapping_file, 'r', encoding='utf-8') as f:
+                        mapping = json.load(f).get('screenshot_mapping', {})
+            mapping_hash = content_hash(json.dumps(mapping, ensure_ascii=False, sort_keys=True))
+
+            names = [part for info in profile['sections'].values() for part in info['parts']]
+            updated[edition] = []
+            with self.conn:
+                for part in names:
+                    if is_default and parts is not None and part in parts:
+                        content = parts[part]
+                    else:
+                        content = read_part(root / "Части_инструкции", part)
+                    # Сайт есть только у облачной редакции
+                    page = file_mapping.get(part) if is_default else None
+                    if self.update_part(edition, part, content, page, mapping, mapping_hash):
+                        updated[edition].append(part)
+
+                # Части, которых больше нет в редакции
+                placeholders = ', '.join('?' * len(names))
+                self.conn.execute(f"DELETE FROM passages WHERE edition = ? AND part NOT IN ({placeholders})",
+                                  (edition, *names))
+                self.conn.execute(f"DELETE FROM parts WHERE edition = ? AND part NOT IN ({placeholders})",
+                                  (edition, *names))
+        if any(updated.values()):
+            # Слияние сегментов FTS5 после записи: запросы быстрее в разы
+            with self.conn:
+                self.conn.execute("INSERT INTO passages_fts (passages_fts) VALUES ('optimize')")
+        self._role_parts.clear()
+        return updated
+
+    # --- поиск ---
+
+    def role_parts(self, edition, role):
+        """Части, которые видит роль; ValueError для неизвестной редакции или роли"""
+        key = (edition, role)
+        if key not in self._role_parts:
+            from generate_instruction import load_editions
+            editions = load_editions()
+            if edition not in editions:
+                raise ValueError(f"нет редакции {edition}")
+            profile = editions[edition]
+            if role not in profile.get('roles', {}):
+                raise ValueError(f"нет роли {role} в редакции {edition}")
+            self._role_parts[key] = role_parts(profile['sections'], profile['roles'][role])
+        return self._role_parts[key]
+
+    def match_query(self, query):
+        """Запрос FTS5 по основам слов: все слова, каждое — по началу основы"""
+        terms = self.stems(query).split()
+        if not terms:
+            return None
+        return "{heading_stems text_stems} : " + ' '.join(f'"{term}"*' for term in terms)
+
+    def lookup(self, query, edition="cloud", role=None, kind=None, limit=5):
+        """Подходящие места инструкции, лучшие первыми"""
+        match = self.match_query(query)
+        if match is None:
+            return []
+
+        # Сначала лучшие id по коротким полям, потом полные записи только для них:
+        # длинные тексты всех совпадений не читаются
+        sql = (
+            f"SELECT passages.id, bm25(passages_fts, {HEADING_WEIGHT}, 1) * {LEVEL_BOOST} AS score "
+            "FROM passages_fts JOIN passages ON passages.id = passages_fts.rowid "
+            "WHERE passages_fts MATCH ? AND edition = ?"
+        )
+        params = [match, edition]
+        if kind is not None:
+            sql += " AND kind = ?"
+            params.append(kind)
+        if role is not None:
+            names = self.role_parts(edition, role)
+            sql += f" AND part IN ({', '.join('?' * len(names))})"
+            sql += " AND (roles = '' OR (' ' || roles || ' ') LIKE ?)"
+            params.extend(names)
+            params.append(f"% {role} %")
+        # bm25 отрицательный: умножение на прибавку поднимает запись выше
+        sql += " ORDER BY score LIMIT ?"
+        params.append(limit)
+        ids = [row["id"] for row in self.conn.execute(sql, params)]
+        if not ids:
+            return []
+
+        rows = {
+            row["id"]: row for row in self.conn.execute(
+                f"SELECT id, {RESULT_COLUMNS} FROM passages WHERE id IN ({', '.join('?' * len(ids))})", ids,
+            )
+        }
+        results = []
+        for passage_id in ids:
+            result = dict(rows[passage_id])
+            del result["id"]
+            result["screenshots"] = json.loads(result["screenshots"])
+            results.append(result)
+        return results
+
+    def stats(self):
+        rows = self.conn.execute(
+            "SELECT edition, COUNT(*) AS parts, SUM(passages) AS passages FROM parts GROUP BY edition"
+        )
+        return {row["edition"]: {"parts": row["parts"], "passages": row["passages"]} for row in rows}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Полнотекстовый индекс инструкции для контекстной справки')
+    parser.add_argument('--db', help=f'Файл индекса (по умолчанию {DEFAULT_FILE} в корне)')
+    parser.add_argument('--edition', nargs='+', help='Редакции для обновления (по умолчанию все)')
+    parser.add_argument('--rebuild', action='store_true', help='Пересобрать индекс целиком')
+    parser.add_argument('--query', help='Найти места инструкции (индекс не обновляется)')
+    parser.add_argument('--role', help='Только то, что видит роль (вместе с --query)')
+    parser.add_argument('--limit', type=int, default=5, help='Сколько результатов показать')
+
+    args = parser.parse_args()
+    base_path = Path(__file__).parent.parent
+    db_path = Path(args.db) if args.db else base_path / DEFAULT_FILE
+
+    if args.rebuild and db_path.exists():
+        db_path.unlink()
+    index = HelpIndex(db_path)
+
+    if args.query:
+        edition = args.edition[0] if args.edition else "cloud"
+        started = time.perf_counter()
+        try:
+            results = index.lookup(args.query, edition=edition, role=args.role, limit=args.limit)
+        except ValueError as e:
+            index.close()
+            parser.error(str(e))
+        elapsed = time.perf_counter() - started
+        print(f"Запрос «{args.query}» ({index.stemmer_name}): {len(results)} за {elapsed * 1000:.2f} мс")
+        for result in results:
+            where = result["url"] or result["bookmark"] or result["part"]
+            print(f"  [{result['kind']}] {result['heading'] or result['part']}  →  {where}")
+            print(f"      {result['text'][:160]}")
+            for screenshot in result["screenshots"]:
+                print(f"      скриншот: {screenshot['name']}")
+        index.close()
+        return
+
+    started = time.perf_counter()
+    updated = index.update(base_path, editions=args.edition)
+    print(f"Индекс справки: {db_path} ({index.stemmer_name}), {time.perf_counter() - started:.2f} с")
+    for edition, stat in index.stats().items():
+        changed = updated.get(edition, [])
+        print(f"  {edition:<8} частей {stat['parts']:<4} записей {stat['passages']:<6} перестроено {len(changed)}")
+    index.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Сборка инструкции в память для портала: DOCX как BytesIO
+
+Документ собирается тем же InstructionGenerator, но без побочных эффектов
+на диске: не пишется ни Финальная_инструкция.docx, ни база состояния.
+    from instruction_api import InstructionRenderer
+
+    renderer = InstructionRenderer(base_path)          # один на процесс
+    docx = renderer.render("cloud", sections=["tests", "faq"])
+    docx = renderer.render("onprem", role="manager")   # BytesIO
+
+Готовые документы лежат в LRU-кеше (max_entries, max_bytes) по отпечатку
+входов: версия генератора, профиль редакции, роль, разделы, время сборки
+(build_time: дата на титуле и в свойствах) и (mtime, размер) всех
+исходников корня редакции — частей, маппингов, логотипа и скриншотов. Правка любого исходника даёт новый
+отпечаток, старая запись вытесняется по LRU.
+
+Одновременные запросы одного варианта ждут одну сборку. Сборки разных
+вариантов идут по очереди: рендер упирается в GIL, а входы и стили
+редакций у них общие. Вывод генератора на время сборки подавляется.
+
+Проверка из командной строки:
+    python scripts/instruction_api.py --edition onprem --role manager --output /tmp/manager.docx
+"""
+
+import io
+import os
+import json
+import time
+import argparse
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from contextlib import redirect_stdout
+from pathlib import Path
+
+from build_state import content_hash
+from generate_instruction import (
+    DEFAULT_EDITION, EDITIONS_FILE, GENERATOR_VERSION, build_editions, build_time, load_editions,
+)
+from roles import role_sections
+from stage_timer import StageTimer
+
+
+DEFAULT_MAX_ENTRIES = 8
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+def stat_signature(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+class InstructionRenderer:
+    def __init__(self, base_path, max_entries=DEFAULT_MAX_ENTRIES, max_bytes=DEFAULT_MAX_BYTES):
+        self.base_path = Path(base_path)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.results = OrderedDict()  # отпечаток → bytes DOCX, последний — самый свежий
+        self.pending = {}             # отпечаток → Future идущей сборки
+        self.lock = threading.Lock()          # results и pending
+        self.render_lock = threading.Lock()   # одна сборка за раз
+        self.shared = {}        # корень редакции → входы build_editions
+        self.sources = {}       # корень редакции → подпись исходников, из которых собран shared
+        self.style_cache = {}
+        self.stats = {"hits": 0, "misses": 0, "coalesced": 0, "evicted": 0}
+
+    # --- отпечаток ---
+
+    def source_signature(self, root, logo):
+        """Подпись исходников корня редакции: (mtime, размер) файлов"""
+        files = [
+            EDITIONS_FILE,
+            root / "scripts" / "screenshot_mapping.json",
+            root / "hyperlink_mapping.json",
+            root / logo,
+        ]
+        files.extend(sorted((root / "Части_инструкции").glob("*.md")))
+        for dir_path, _, names in sorted(os.walk(root / "СКРИНШОТЫ")):
+            files.extend(Path(dir_path) / name for name in sorted(names))
+        return content_hash(json.dumps(
+            [[str(path), stat_signature(path)] for path in files], ensure_ascii=False,
+        ))
+
+    def fingerprint(self, edition, role=None, sections=None):
+        """Отпечаток входов варианта документа и подпись его исходников"""
+        editions = load_editions()
+        if edition not in editions:
+            raise ValueError(f"нет редакции {edition}")
+        profile = editions[edition]
+        if role is not None and role not in profile.get('roles', {}):
+            raise ValueError(f"нет роли {role} в редакции {edition}")
+        available = profile['sections'] if role is None else role_sections(profile['sections'], profile['roles'][role])
+        unknown = [key for key in sections or [] if key not in available]
+        if unknown:
+            raise ValueError(f"нет разделов в редакции {edition}: {', '.join(unknown)}")
+
+        root = self.base_path / profile['root']
+        signature = self.source_signature(root, profile['logo'])
+        key = content_hash(json.dumps(
+            [GENERATOR_VERSION, edition, profile, role, sections, build_time().isoformat(), signature],
+            ensure_ascii=False, sort_keys=True,
+        ))
+        return key, root, signature
+
+    # --- сборка ---
+
+    def render(self, edition=DEFAULT_EDITION, role=None, sections=None):
+        """BytesIO с DOCX варианта: из кеша, из идущей сборки или новой сборкой"""
+        key, root, signature = self.fingerprint(edition, role, sections)
+
+        with self.lock:
+            if key in self.results:
+                self.results.move_to_end(key)
+                self.stats["hits"] += 1
+                return io.BytesIO(self.results[key])
+            future = self.pending.get(key)
+            owner = future is None
+            if owner:
+                future = self.pending[key] = Future()
+                self.stats["misses"] += 1
+            else:
+                self.stats["coalesced"] += 1
+
+        if not owner:
+            return io.BytesIO(future.result())
+
+        try:
+            data = self._render(edition, role, sections, root, signature)
+        except BaseException as e:
+            with self.lock:
+                del self.pending[key]
+            future.set_exception(e)
+            raise
+
+        with self.lock:
+            del self.pending[key]
+            self.results[key] = data
+            self.evict()
+        future.set_result(data)
+        return io.BytesIO(data)
+
+    def _render(self, edition, role, sections, root, signature):
+        with self.render_lock:
+            # Исходники корня изменились — входы перечитываются
+            if self.sources.get(root) != signature:
+                self.shared.pop(root, None)
+                self.sources[root] = signature
+
+            timer = StageTimer()
+            with redirect_stdout(io.StringIO()):
+                generator, = build_editions(self.base_path, [(edition, role)], jobs=1, timer=timer,
+                                            shared=self.shared, style_cache=self.style_cache, generate=False)
+                return generator.render(sections)
+
+    def evict(self):
+        """Вытесняет самые давние документы сверх max_entries / max_bytes (под self.lock)"""
+        while self.results and (
+            len(self.results) > self.max_entries
+            or sum(len(data) for data in self.results.values()) > self.max_bytes
+        ):
+            self.results.popitem(last=False)
+            self.stats["evicted"] += 1
+
+    def cache_info(self):
+        with self.lock:
+            return {
+                **self.stats,
+                "entries": len(self.results),
+                "bytes": sum(len(data) for data in self.results.values()),
+                "pending": len(self.pending),
+            }
+
+
+def main():
+    editions = load_editions()
+    parser = argparse.ArgumentParser(description='Сборка инструкции в память (API портала)')
+    parser.add_argument('--edition', choices=list(editions), default=DEFAULT_EDITION,
+                        help=f'Редакция (по умолчанию {DEFAULT_EDITION})')
+    parser.add_argument('--role', help='Роль из профиля редакции')
+    parser.add_argument('--sections', nargs='+', help='Разделы (по умолчанию все)')
+    parser.add_argument('--output', help='Куда записать DOCX (по умолчанию только размер и время)')
+    parser.add_argument('--repeat', type=int, default=2, help='Сколько раз запросить документ (2 — видно кеш)')
+
+    args = parser.parse_args()
+    renderer = InstructionRenderer(Path(__file__).parent.parent)
+    for attempt in range(args.repeat):
+        started = time.perf_counter()
+        try:
+            docx = renderer.render(args.edition, role=args.role, sections=args.sections)
+        except ValueError as e:
+            parser.error(str(e))
+        size = len(docx.getbuffer())
+        print(f"  Запрос {attempt + 1}: {size / 1024 / 1024:.1f} МБ за {time.perf_counter() - started:.3f} с")
+    print(f"  Кеш: {renderer.cache_info()}")
+
+    if args.output:
+        Path(args.output).write_bytes(docx.getvalue())
+        print(f"  Записан: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
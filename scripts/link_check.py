@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Проверка внутренних ссылок, скриншотов и страниц сайта до сборки
+
+Битая ссылка [...](#якорь) в DOCX рисуется красным текстом, а на сайте
+остаётся как есть — заметить её можно только глазами. Проверка находит
+такие места сразу, по всем редакциям и ролям:
+- ссылки [...](#якорь) — якорь есть среди заголовков редакции или
+  синонимов hyperlink_mapping.json (ссылки на вырезанные из сборки роли
+  заголовки рисуются простым текстом и ошибкой не считаются)
+- ссылки облачной редакции — у части с заголовком есть страница сайта
+- скриншоты **Имя.png** и [СКРИНШОТ: Имя] — есть в screenshot_mapping.json,
+  файл лежит в СКРИНШОТЫ/; в редакциях без сайта достаточно файла
+  с таким именем в СКРИНШОТЫ/ (так его найдёт генератор DOCX)
+- синонимы hyperlink_mapping.json — указывают на существующий заголовок
+- file_mapping конвертера — у страницы есть исходная часть, страница
+  есть в nav mkdocs.yml, а страницы nav — в file_mapping или в docs/
+
+Разбор части (заголовки, ссылки, скриншоты с номерами строк и ролями
+блоков) хранится в build_state.db по хешу текста. Заново разбираются
+только изменившиеся части, на пуле процессов по числу ядер; сама
+проверка — поиск по множествам, на неизменном дереве она занимает
+миллисекунды.
+
+    python scripts/link_check.py                  # все редакции и роли
+    python scripts/link_check.py --edition cloud
+    python scripts/link_check.py --force          # разобрать все части заново
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import argparse
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from anchor_index import AnchorIndex, LINK_RE, iter_headings, load_aliases, read_part
+from build_state import BuildState, DEFAULT_FILE, content_hash, source_version
+from help_index import SCREENSHOT_RE
+from roles import ROLE_END, block_roles, role_parts
+
+
+# Версия разбора: при изменении кеш разборов не используется
+CHECKER_VERSION = source_version(__file__, Path(__file__).with_name("anchor_index.py"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS link_scans (
+    hash TEXT NOT NULL,
+    version TEXT NOT NULL,
+    scan TEXT NOT NULL,
+    PRIMARY KEY (hash, version)
+);
+"""
+
+# Страница в nav mkdocs.yml: "    - Заголовок: path/page.md"
+NAV_PAGE_RE = re.compile(r'^\s*-\s*(?:[^:]+:\s*)?(\S+\.md)\s*$')
+
+# Меньше изменившихся частей разбираются без пула: запуск процессов дороже
+MIN_POOL_PARTS = 4
+
+Problem = namedtuple('Problem', 'edition role part line kind target message')
+
+
+def scan_part(content):
+    """Разбор части: заголовки, ссылки и скриншоты с номерами строк и ролями блоков
+
+    Роли блока — отсортированный список, пустой вне {ROLE: ...}.
+    """
+    headings = {line_number: (level, title, slug) for line_number, level, title, slug in iter_headings(content)}
+    scan = {"headings": [], "links": [], "screenshots": []}
+    roles = []
+    in_code_block = False
+
+    for line_number, line in enumerate(content.split('\n')):
+        stripped = line.strip()
+        if stripped.startswith('```'):
+            in_code_block = not in_code_block
+            continue
+        if in_code_block:
+            continue
+
+        start = block_roles(stripped)
+        if start is not None:
+            roles = sorted(start)
+            continue
+        if stripped == ROLE_END:
+            roles = []
+            continue
+
+        if line_number in headings:
+            level, title, slug = headings[line_number]
+            scan["headings"].append([line_number + 1, level, title, slug, roles])
+            continue
+        for _, anchor in LINK_RE.findall(line):
+            scan["links"].append([line_number + 1, anchor, roles])
+        screenshot = SCREENSHOT_RE.search(stripped)
+        if screenshot:
+            name = (screenshot.group(1) or screenshot.group(2)).replace('*', '').strip()
+            scan["screenshots"].append([line_number + 1, name, roles])
+    return scan
+
+
+def visible(roles, role):
+    """Виден ли блок с ролями roles в сборке роли role (None — полная сборка)"""
+    return role is None or not roles or role in roles
+
+
+def nav_pages(config_file):
+    """Страницы из nav mkdocs.yml (без загрузки конфигурации MkDocs)"""
+    pages = []
+    in_nav = False
+    with open(config_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            if not line.strip() or line.lstrip().startswith('#'):
+                continue
+            if not line[0].isspace():
+                in_nav = line.startswith('nav:')
+                continue
+            match = NAV_PAGE_RE.match(line) if in_nav else None
+            if match:
+                pages.append(match.group(1))
+    return pages
+
+
+class LinkChecker:
+    def __init__(self, base_path, jobs=None, force=False):
+        self.base_path = Path(base_path)
+        self.jobs = jobs
+        self.force = force
+        self.state = BuildState(self.base_path / DEFAULT_FILE)
+        with self.state.conn:
+            self.state.conn.executescript(SCHEMA)
+        self.stats = {"parts": 0, "scanned": 0}
+
+    def close(self):
+        self.state.close()
+
+    # --- разбор ---
+
+    def scans(self, contents):
+        """{часть: разбор} для {часть: текст}; изменившиеся части разбираются заново"""
+        hashes = {part: content_hash(content) for part, content in contents.items()}
+        cached = {}
+        if not self.force and hashes:
+            unique = sorted(set(hashes.values()))
+            rows = self.state.conn.execute(
+                f"SELECT hash, scan FROM link_scans WHERE version = ? AND hash IN ({', '.join('?' * len(unique))})",
+                (CHECKER_VERSION, *unique),
+            )
+            cached = {row["hash"]: json.loads(row["scan"]) for row in rows}
+
+        missing = {}
+        for part, part_hash in hashes.items():
+            if part_hash not in cached:
+                missing.setdefault(part_hash, contents[part])
+        if missing:
+            items = list(missing.items())
+            jobs = self.jobs or os.cpu_count() or 1
+            if jobs == 1 or len(items) < MIN_POOL_PARTS:
+                results = [scan_part(content) for _, content in items]
+            else:
+                with ProcessPoolExecutor(max_workers=min(jobs, len(items))) as executor:
+                    results = list(executor.map(scan_part, [content for _, content in items],
+                                                chunksize=max(1, len(items) // (jobs * 4))))
+            with self.state.conn:
+                self.state.conn.executemany(
+                    "INSERT OR REPLACE INTO link_scans VALUES (?, ?, ?)",
+                    [(part_hash, CHECKER_VERSION, json.dumps(scan, ensure_ascii=False))
+                     for (part_hash, _), scan in zip(items, results)],
+                )
+            cached.update((part_hash, scan) for (part_hash, _), scan in zip(items, results))
+
+        self.stats["parts"] += len(contents)
+        self.stats["scanned"] += len(missing)
+        return {part: cached[part_hash] for part, part_hash in hashes.items()}
+
+    def prune(self, keep):
+        """Удаляет разборы текстов, которых больше нет ни в одной редакции"""
+        with self.state.conn:
+            self.state.conn.execute("DELETE FROM link_scans WHERE version != ?", (CHECKER_VERSION,))
+            known = [row["hash"] for row in self.state.conn.execute("SELECT hash FROM link_scans")]
+            self.state.conn.executemany("DELETE FROM link_scans WHERE hash = ?",
+                                        [(part_hash,) for part_hash in known if part_hash not in keep])
+
+    # --- проверка ---
+
+    def check_edition(self, edition, profile, file_mapping=None):
+        """Проблемы одной редакции: полная сборка и сборки всех её ролей
+
+        file_mapping — {часть: страница} сайта (только облачная редакция).
+        """
+        root = self.base_path / profile['root']
+        names = [part for info in profile['sections'].values() for part in info['parts']]
+        for part in file_mapping or {}:
+            if part not in names:
+                names.append(part)
+
+        contents = {}
+        problems = []
+        for part in names:
+            content = read_part(root / "Части_инструкции", part)
+            if content is None:
+                problems.append(Problem(edition, None, part, None, "part", part, "нет файла части"))
+            else:
+                contents[part] = content
+        scans = self.scans(contents)
+        self.hashes.update(content_hash(content) for content in contents.values())
+
+        mapping_file = root / "scripts" / "screenshot_mapping.json"
+        screenshot_mapping = {}
+        if mapping_file.exists():
+            with open(mapping_file, 'r', encoding='utf-8') as f:
+                screenshot_mapping = json.load(f).get('screenshot_mapping', {})
+        aliases = load_aliases(root / "hyperlink_mapping.json")
+
+        problems.extend(self.check_screenshots(edition, scans, root, screenshot_mapping, file_mapping is None))
+
+        # Заголовок → (часть, роли блока); якорь → заголовок, как в AnchorIndex
+        titles = {}
+        anchors = {}
+        for part in names:
+            for _, _, title, slug, roles in scans.get(part, {}).get("headings", []):
+                titles.setdefault(title, (part, roles))
+                anchors.setdefault(f"#{slug}", title)
+        for anchor, title in aliases.items():
+            if title in titles:
+                anchors[anchor] = title
+            else:
+                problems.append(Problem(edition, None, "hyperlink_mapping.json", None, "alias", anchor,
+                                        f"синоним указывает на несуществующий заголовок «{title}»"))
+
+        sections = profile['sections']
+        builds = [(None, names)]
+        builds.extend((role, role_parts(sections, role_profile))
+                      for role, role_profile in profile.get('roles', {}).items())
+        for role, parts in builds:
+            problems.extend(self.check_anchors(edition, role, parts, scans, titles, anchors, file_mapping))
+        return problems
+
+    def check_anchors(self, edition, role, parts, scans, titles, anchors, file_mapping):
+        """Ссылки [...](#якорь) одной сборки: полной (role=None) или роли"""
+        problems = []
+        included = set(parts)
+        for part in parts:
+            for line, anchor, roles in scans.get(part, {}).get("links", []):
+                if not visible(roles, role):
+                    continue
+                title = anchors.get(anchor)
+                if title is None:
+                    # Битая ссылка битая во всех сборках: сообщается один раз
+                    if role is None:
+                        problems.append(Problem(edition, role, part, line, "anchor", anchor, "нет такого заголовка"))
+                    continue
+                target_part, target_roles = titles[title]
+                if target_part not in included or not visible(target_roles, role):
+                    # Вырезан из сборки роли: в DOCX и на сайте ссылка станет простым текстом
+                    continue
+                if file_mapping is not None and target_part not in file_mapping and part in file_mapping:
+                    problems.append(Problem(edition, role, part, line, "anchor", anchor,
+                                            f"у части {target_part} нет страницы сайта"))
+        return problems
+
+    def check_screenshots(self, edition, scans, root, screenshot_mapping, allow_files=False):
+        """Скриншоты частей: есть в маппинге, файл на месте
+
+        allow_files — скриншот вне маппинга допустим, если в СКРИНШОТЫ/
+        есть файл с таким именем (редакции без сайта).
+        """
+        problems = []
+        exists = {}
+        files = None  # имена файлов в СКРИНШОТЫ/ в нижнем регистре, читаются при первом промахе
+        for part, scan in scans.items():
+            for line, name, _ in scan["screenshots"]:
+                filename = name if name.endswith('.png') else f"{name}.png"
+                rel_path = screenshot_mapping.get(filename)
+                if rel_path is None:
+                    if allow_files:
+                        if files is None:
+                            files = {file.lower() for _, _, names in os.walk(root / "СКРИНШОТЫ") for file in names}
+                        if filename.lower() in files:
+                            continue
+                    problems.append(Problem(edition, None, part, line, "screenshot", filename,
+                                            "нет в screenshot_mapping.json"))
+                    continue
+                if rel_path not in exists:
+                    exists[rel_path] = (root / rel_path).is_file()
+                if not exists[rel_path]:
+                    problems.append(Problem(edition, None, part, line, "screenshot", filename,
+                                            f"нет файла {rel_path}"))
+        return problems
+
+    def check_pages(self, edition, file_mapping):
+        """file_mapping конвертера против nav mkdocs.yml и docs/"""
+        problems = []
+        config_file = self.base_path / "mkdocs.yml"
+        if not config_file.exists():
+            return problems
+        nav = nav_pages(config_file)
+        targets = {}
+        for part, page in file_mapping.items():
+            if page in targets:
+                problems.append(Problem(edition, None, part, None, "page", page,
+                                        f"та же страница, что у части {targets[page]}"))
+            targets.setdefault(page, part)
+            if page not in nav:
+                problems.append(Problem(edition, None, part, None, "page", page, "страницы нет в nav mkdocs.yml"))
+        docs_path = self.base_path / "docs"
+        for page in nav:
+            if page not in targets and not (docs_path / page).exists():
+                problems.append(Problem(edition, None, "mkdocs.yml", None, "page", page,
+                                        "страница nav не собирается из частей и не лежит в docs/"))
+        return problems
+
+    def check(self, editions=None):
+        """Все проблемы выбранных редакций (по умолчанию всех)"""
+        from convert_to_mkdocs import MkDocsConverter
+        from generate_instruction import DEFAULT_EDITION, load_editions
+
+        profiles = load_editions()
+        self.hashes = set()
+        problems = []
+        for edition in editions or list(profiles):
+            file_mapping = None
+            if edition == DEFAULT_EDITION:
+                # Сайт есть только у облачной редакции
+                file_mapping = MkDocsConverter(self.base_path, screenshot_mapping={}, parts={},
+                                               anchor_index=AnchorIndex()).file_mapping
+                problems.extend(self.check_pages(edition, file_mapping))
+            problems.extend(self.check_edition(edition, profiles[edition], file_mapping))
+        if editions is None:
+            self.prune(self.hashes)
+        return problems
+
+
+def report(problems):
+    """Печатает проблемы по редакциям и частям"""
+    for problem in sorted(problems, key=lambda p: (p.edition, p.part, p.line or 0, p.role or '')):
+        where = f"{problem.part}:{problem.line}" if problem.line else problem.part
+        role = f" [{problem.role}]" if problem.role else ""
+        print(f"  {problem.edition}{role} {where}: {problem.kind} {problem.target} — {problem.message}")
+
+
+def main():
+    from generate_instruction import load_editions
+
+    parser = argparse.ArgumentParser(description='Проверка внутренних ссылок, скриншотов и страниц сайта')
+    parser.add_argument('--edition', nargs='+', choices=list(load_editions()), help='Редакции (по умолчанию все)')
+    parser.add_argument('--jobs', type=int, help='Процессов для разбора частей (по умолчанию по числу ядер)')
+    parser.add_argument('--force', action='store_true', help='Разобрать все части заново, без кеша')
+
+    args = parser.parse_args()
+    base_path = Path(__file__).parent.parent
+
+    started = time.perf_counter()
+    checker = LinkChecker(base_path, jobs=args.jobs, force=args.force)
+    try:
+        problems = checker.check(args.edition)
+    finally:
+        checker.close()
+    elapsed = time.perf_counter() - started
+
+    print(f"Проверка ссылок: частей {checker.stats['parts']}, разобрано заново {checker.stats['scanned']}, "
+          f"{elapsed * 1000:.0f} мс")
+    if problems:
+        print(f"Проблем: {len(problems)}")
+        report(problems)
+        sys.exit(1)
+    print("Проблем нет")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Хуки MkDocs: сборка сайта напрямую из Части_инструкции/
+
+Подключаются в mkdocs.yml через `hooks:` и заменяют запуск
+convert_to_mkdocs.py перед `mkdocs build` / `mkdocs serve`:
+- on_files: страницы из file_mapping и скриншоты из screenshot_mapping
+  берутся из исходного дерева, без копии в docs/
+- on_page_markdown: {INTERFACE}/{TECHNICAL}, скриншоты и якоря
+  конвертируются в памяти тем же MkDocsConverter.convert_content
+- on_serve: `mkdocs serve` следит за исходными частями и маппингом
+- on_post_build: чистка поискового индекса (search_index.py), затем отчёт
+  о весе страниц (page_weight.py) — сборка падает при превышении бюджета;
+  манифест офлайн-кеша и sw.js (precache.py); манифест файлов сайта
+  для выкладки только изменений (site_deploy.py)
+- дата сборки в sitemap.xml — из SOURCE_DATE_EPOCH, по умолчанию время
+  последнего коммита: одинаковые исходники дают одинаковый сайт
+
+Сайт для роли (roles.py): ROP_ROLE=manager mkdocs build — в навигации
+и на сайте только страницы роли, блоки других ролей вырезаны,
+копируются только скриншоты со страниц роли; ссылки на вырезанные
+страницы и заголовки остаются простым текстом.
+
+Сборка из другого скрипта с уже прочитанными входами — build_site().
+"""
+
+import os
+from pathlib import Path
+
+from mkdocs.exceptions import PluginError
+from mkdocs.structure.files import File
+
+from convert_to_mkdocs import IMAGE_LINK_RE, MkDocsConverter
+from search_index import SearchIndexBuilder
+from page_weight import PageWeightReport
+from precache import PrecacheBuilder
+from roles import ROLE_ENV, filter_role_blocks, prune_nav, unlink_pages
+from site_deploy import SiteManifest, source_date_epoch
+
+
+converter = None
+
+# src_uri страницы → имя исходной части
+source_pages = {}
+
+# src_uri страницы → сконвертированный текст (сайт роли конвертирует страницы в on_files)
+converted_pages = {}
+
+# Уже прочитанные маппинг, части и скриншоты (roles.py собирает сайты ролей подряд)
+shared_inputs = None
+
+
+def build_site(config_file, inputs=None, role=None, **overrides):
+    """mkdocs build в этом процессе с уже прочитанными входами
+
+    inputs — {screenshot_mapping, parts, image_data} для MkDocsConverter.
+    MkDocs загружает хуки отдельным модулем по пути из mkdocs.yml, поэтому
+    inputs передаются модулям из config['hooks'], а не этому модулю.
+    """
+    from mkdocs.commands.build import build
+    from mkdocs.config import load_config
+
+    config = load_config(str(config_file), **overrides)
+    hooks = [module for module in config['hooks'].values() if hasattr(module, 'shared_inputs')]
+    for module in hooks:
+        module.shared_inputs = inputs
+    if role is not None:
+        os.environ[ROLE_ENV] = role
+    try:
+        build(config)
+    finally:
+        os.environ.pop(ROLE_ENV, None)
+        for module in hooks:
+            module.shared_inputs = None
+    return Path(config.site_dir)
+
+
+def on_config(config):
+    """Создаёт конвертер относительно корня репозитория (и роли из ROP_ROLE)"""
+    global converter
+    base_path = Path(config.config_file_path).parent
+    role = os.environ.get(ROLE_ENV) or None
+    if "SOURCE_DATE_EPOCH" not in os.environ:
+        epoch = source_date_epoch(base_path)
+        if epoch is not None:
+            os.environ["SOURCE_DATE_EPOCH"] = epoch
+    converter = MkDocsConverter(base_path, role=role, **(shared_inputs or {}))
+
+    if role is not None:
+        keep = {"index.md", *converter.file_mapping.values()}
+        config.nav = prune_nav(config.nav, keep)
+    return config
+
+
+def on_files(files, config):
+    """Подменяет страницы и картинки файлами из исходного дерева"""
+    source_pages.clear()
+
+    for source_name, dest_path in converter.file_mapping.items():
+        source_file = converter.source_path / f"{source_name}.md"
+        if not source_file.exists():
+            continue
+
+        existing = files.get_file_from_path(dest_path)
+        if existing is not None:
+            files.remove(existing)
+
+        files.append(File.generated(config, dest_path, abs_src_path=str(source_file)))
+        source_pages[dest_path] = source_name
+
+    image_sources = converter.image_sources()
+    converted_pages.clear()
+    if converter.role is not None:
+        # Сайт роли: только скриншоты, на которые ссылаются её страницы
+        used = set()
+        for dest_path, source_name in source_pages.items():
+            content = converter.read_source(source_name)
+            depth = converter.get_file_depth(dest_path)
+            converted_pages[dest_path] = converted = converter.convert_content(content, depth, dest_path, source_name)
+            used.update(IMAGE_LINK_RE.findall(converted))
+        image_sources = {name: source for name, source in image_sources.items() if name in used}
+
+    for hashed_name, source in image_sources.items():
+        dest_uri = f"images/{hashed_name}"
+        existing = files.get_file_from_path(dest_uri)
+        if existing is not None:
+            files.remove(existing)
+
+        files.append(File.generated(config, dest_uri, abs_src_path=str(source)))
+
+    return files
+
+
+def on_page_markdown(markdown, page, config, files):
+    """Конвертирует разметку исходной части в формат MkDocs"""
+    dest_path = page.file.src_uri
+    if dest_path not in source_pages:
+        if converter.role is not None:
+            # Статические страницы (index.md): ссылки на вырезанные из роли страницы — текстом
+            return unlink_pages(markdown, dest_path, {file.src_uri for file in files.documentation_pages()})
+        return markdown
+    if dest_path in converted_pages:
+        return converted_pages[dest_path]
+
+    depth = converter.get_file_depth(dest_path)
+    return converter.convert_content(filter_role_blocks(markdown), depth, dest_path, source_pages[dest_path])
+
+
+def on_serve(server, config, builder):
+    """Перезапуск сборки при правке исходных частей или маппинга"""
+    server.watch(str(converter.source_path))
+    server.watch(str(converter.screenshots_path))
+    server.watch(str(converter.base_path / "scripts" / "screenshot_mapping.json"))
+    return server
+
+
+def on_post_build(config):
+    """Постобработка поискового индекса (после плагина search), офлайн-кеш, отчёт о весе и манифест сайта"""
+    SearchIndexBuilder(config.site_dir).build()
+    PrecacheBuilder(converter.base_path, config.site_dir, converter).build()
+
+    report = PageWeightReport(converter.base_path, site_path=config.site_dir, converter=converter)
+    # Отчёт в page_weight.json — только для полного сайта
+    json_path = converter.base_path / "page_weight.json" if converter.role is None else None
+    over_budget = report.run(json_path=json_path)
+    if over_budget:
+        pages = ", ".join(page["page"] for page in over_budget)
+        raise PluginError(f"Превышен бюджет веса страниц: {pages}")
+    SiteManifest(config.site_dir).build()
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Отчёт о весе страниц документации
+
+Для каждой страницы из file_mapping считает:
+- markdown — размер сконвертированного текста (convert_content)
+- images — суммарный размер скриншотов, на которые ссылается страница
+- search — доля страницы в search/search_index.json (если сайт собран)
+
+Печатает таблицу, отсортированную по весу, пишет JSON и проверяет
+бюджеты из scripts/page_budgets.json. При превышении бюджета
+скрипт завершается с кодом 1, а on_post_build останавливает сборку.
+
+Использование:
+    python scripts/page_weight.py
+    python scripts/page_weight.py --site site --json page_weight.json
+"""
+
+import re
+import sys
+import json
+import argparse
+from pathlib import Path
+
+from convert_to_mkdocs import MkDocsConverter
+
+
+IMAGE_REF_RE = re.compile(r'!\[[^\]]*\]\((?:\.\./)*images/([^)]+)\)')
+
+SIZE_UNITS = {"B": 1, "KB": 1024, "MB": 1024 ** 2, "GB": 1024 ** 3}
+
+METRICS = ["markdown", "images", "search", "total"]
+
+
+def parse_size(value):
+    """'6MB' / '500KB' / 1024 → байты"""
+    if isinstance(value, (int, float)):
+        return int(value)
+    match = re.fullmatch(r'\s*([\d.]+)\s*([KMG]?B)\s*', value.upper())
+    if not match:
+        raise ValueError(f"Некорректный размер: {value}")
+    return int(float(match.group(1)) * SIZE_UNITS[match.group(2)])
+
+
+def format_size(size):
+    """Байты → строка для таблицы"""
+    for unit in ["GB", "MB", "KB"]:
+        if size >= SIZE_UNITS[unit]:
+            return f"{size / SIZE_UNITS[unit]:.1f} {unit}"
+    return f"{size} B"
+
+
+def page_url(dest_path):
+    """Путь страницы в docs/ → location в поисковом индексе"""
+    url = dest_path[:-len('.md')]
+    if url == 'index':
+        return ''
+    if url.endswith('/index'):
+        url = url[:-len('index')]
+    else:
+        url += '/'
+    return url
+
+
+class PageWeightReport:
+    def __init__(self, base_path, site_path=None, budgets_file=None, converter=None):
+        self.base_path = Path(base_path)
+        self.site_path = Path(site_path) if site_path else self.base_path / "site"
+        self.budgets_file = Path(budgets_file) if budgets_file else self.base_path / "scripts" / "page_budgets.json"
+        self.converter = converter or MkDocsConverter(self.base_path)
+        self.budgets = self.load_budgets()
+
+    def load_budgets(self):
+        """Загружает бюджеты: default + переопределения по страницам"""
+        if not self.budgets_file.exists():
+            return {"default": {}, "pages": {}}
+        with open(self.budgets_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return {"default": data.get("default", {}), "pages": data.get("pages", {})}
+
+    def page_budget(self, dest_path):
+        """Бюджет страницы в байтах по метрикам"""
+        budget = dict(self.budgets["default"])
+        budget.update(self.budgets["pages"].get(dest_path, {}))
+        return {metric: parse_size(value) for metric, value in budget.items()}
+
+    def load_search_shares(self):
+        """location страницы → байты её записей в поисковом индексе"""
+        index_file = self.site_path / "search" / "search_index.json"
+        if not index_file.exists():
+            return None
+
+        with open(index_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+
+        shares = {}
+        for doc in data.get('docs', []):
+            url = doc['location'].split('#')[0]
+            size = len(json.dumps(doc, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+            shares[url] = shares.get(url, 0) + size
+        return shares
+
+    def collect(self):
+        """Считает вес всех страниц, самые тяжёлые первыми"""
+        image_sources = self.converter.image_sources()
+        search_shares = self.load_search_shares()
+
+        pages = []
+        for source_name, dest_path in self.converter.file_mapping.items():
+            content = self.converter.read_source(source_name)
+            if content is None:
+                continue
+
+            depth = self.converter.get_file_depth(dest_path)
+            converted = self.converter.convert_content(content, depth, dest_path, source_name)
+
+            images = {}
+            for image_name in IMAGE_REF_RE.findall(converted):
+                source = image_sources.get(image_name)
+                if source is not None:
+                    images[image_name] = source.stat().st_size
+
+            weights = {
+                "markdown": len(converted.encode('utf-8')),
+                "images": sum(images.values()),
+                "search": search_shares.get(page_url(dest_path), 0) if search_shares else 0,
+            }
+            weights["total"] = sum(weights.values())
+
+            budget = self.page_budget(dest_path)
+            over = [metric for metric in METRICS if metric in budget and weights[metric] > budget[metric]]
+
+            pages.append({
+                "page": dest_path,
+                "source": source_name,
+                **weights,
+                "image_count": len(images),
+                "image_files": dict(sorted(images.items(), key=lambda item: -item[1])),
+                "budget": budget,
+                "over_budget": over,
+            })
+
+        pages.sort(key=lambda page: (-page["total"], page["page"]))
+        return {
+            "search_index_available": search_shares is not None,
+            "pages": pages,
+            "totals": {metric: sum(page[metric] for page in pages) for metric in METRICS},
+        }
+
+    def print_table(self, report):
+        """Печатает таблицу страниц, отсортированную по весу"""
+        print(f"{'Страница':<32} {'Markdown':>10} {'Картинки':>10} {'Поиск':>10} {'Всего':>10}  Бюджет")
+        print("-" * 84)
+        for page in report["pages"]:
+            status = "ПРЕВЫШЕН: " + ", ".join(page["over_budget"]) if page["over_budget"] else "ок"
+            print(f"{page['page']:<32} "
+                  f"{format_size(page['markdown']):>10} "
+                  f"{format_size(page['images']):>10} "
+                  f"{format_size(page['search']):>10} "
+                  f"{format_size(page['total']):>10}  {status}")
+        print("-" * 84)
+        totals = report["totals"]
+        print(f"{'ИТОГО':<32} "
+              f"{format_size(totals['markdown']):>10} "
+              f"{format_size(totals['images']):>10} "
+              f"{format_size(totals['search']):>10} "
+              f"{format_size(totals['total']):>10}")
+        if not report["search_index_available"]:
+            print("  (поисковый индекс не найден — доля поиска не учтена)")
+
+    def write_json(self, report, json_path):
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+    def run(self, json_path=None):
+        """Строит отчёт; возвращает список страниц с превышением бюджета"""
+        report = self.collect()
+        self.print_table(report)
+        if json_path:
+            self.write_json(report, json_path)
+            print(f"  JSON: {json_path}")
+        return [page for page in report["pages"] if page["over_budget"]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Отчёт о весе страниц документации')
+    parser.add_argument('--site', help='Каталог собранного сайта (для доли поискового индекса)')
+    parser.add_argument('--budgets', help='JSON с бюджетами (по умолчанию scripts/page_budgets.json)')
+    parser.add_argument('--json', help='Куда записать JSON-отчёт')
+
+    args = parser.parse_args()
+
+    base_path = Path(__file__).parent.parent
+    report = PageWeightReport(base_path, site_path=args.site, budgets_file=args.budgets)
+    over_budget = report.run(json_path=args.json)
+    if over_budget:
+        print(f"ОШИБКА: бюджет превышен на {len(over_budget)} страницах")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Манифест офлайн-кеша и service worker для сайта документации
+
+Запускается из on_post_build (mkdocs_hooks.py) или вручную:
+    python scripts/precache.py site/
+
+Состав манифеста берётся из MkDocsConverter:
+- страницы — file_mapping (плюс главная)
+- скриншоты — image_sources(), имена с хешем содержимого
+- поисковый индекс — search/search_index.json
+- ресурсы темы и docs/ (css/js/шрифты), без карт исходников и
+  языков lunr, которые не используются поиском
+
+Пишет в каталог сайта:
+- precache-manifest.json — {version, immutable, entries: [{url, revision}]}
+- sw.js — scripts/sw_template.js со встроенным манифестом
+"""
+
+import sys
+import json
+import hashlib
+from pathlib import Path
+
+from convert_to_mkdocs import MkDocsConverter, file_hash, write_if_changed
+from page_weight import page_url
+
+
+ASSET_DIRS = ["assets", "stylesheets", "javascripts"]
+
+# Поиск работает с lang: ru — остальные языки lunr не нужны
+LUNR_FILES = {"lunr.stemmer.support.min.js", "lunr.ru.min.js"}
+
+TEMPLATE_FILE = Path(__file__).parent / "sw_template.js"
+
+
+class PrecacheBuilder:
+    def __init__(self, base_path, site_path=None, converter=None):
+        self.base_path = Path(base_path)
+        self.site_path = Path(site_path) if site_path else self.base_path / "site"
+        self.converter = converter or MkDocsConverter(self.base_path)
+
+    def page_entries(self):
+        """Страницы из file_mapping → собранные index.html"""
+        entries = []
+        dest_paths = ["index.md"] + list(self.converter.file_mapping.values())
+        for dest_path in dest_paths:
+            url = page_url(dest_path)
+            built = self.site_path / url / "index.html"
+            if built.exists():
+                entries.append({"url": url or "./", "revision": file_hash(built)[:10]})
+        return entries
+
+    def image_entries(self):
+        """Скриншоты: хеш уже в имени, ревизия не нужна"""
+        entries = []
+        for hashed_name in sorted(self.converter.image_sources()):
+            if (self.site_path / "images" / hashed_name).exists():
+                entries.append({"url": f"images/{hashed_name}", "revision": None})
+        return entries
+
+    def skip_asset(self, url):
+        """Карты исходников и неиспользуемые языки lunr не кешируем"""
+        if url.endswith('.map'):
+            return True
+        return '/lunr/' in url and url.rsplit('/', 1)[-1] not in LUNR_FILES
+
+    def asset_entries(self):
+        """Ресурсы темы и docs/, нужные для отрисовки страниц офлайн"""
+        entries = []
+        for directory in ASSET_DIRS:
+            root = self.site_path / directory
+            if not root.exists():
+                continue
+            for path in sorted(root.rglob('*')):
+                url = path.relative_to(self.site_path).as_posix()
+                if path.is_file() and not self.skip_asset(url):
+                    entries.append({"url": url, "revision": file_hash(path)[:10]})
+        return entries
+
+    def search_entries(self):
+        index_file = self.site_path / "search" / "search_index.json"
+        if not index_file.exists():
+            return []
+        return [{"url": "search/search_index.json", "revision": file_hash(index_file)[:10]}]
+
+    def manifest(self):
+        """Манифест с версией, зависящей только от содержимого записей"""
+        entries = self.page_entries() + self.image_entries() + self.search_entries() + self.asset_entries()
+        digest = hashlib.sha256(json.dumps(entries, sort_keys=True).encode('utf-8')).hexdigest()
+        return {
+            "version": digest[:10],
+            "immutable": ["images/"],
+            "entries": entries,
+        }
+
+    def build(self):
+        """Пишет precache-manifest.json и sw.js в каталог сайта"""
+        manifest = self.manifest()
+        manifest_json = json.dumps(manifest, ensure_ascii=False, separators=(',', ':'))
+
+        write_if_changed(self.site_path / "precache-manifest.json", manifest_json.encode('utf-8'))
+
+        template = TEMPLATE_FILE.read_text(encoding='utf-8')
+        service_worker = template.replace("__PRECACHE_MANIFEST__", manifest_json)
+        write_if_changed(self.site_path / "sw.js", service_worker.encode('utf-8'))
+
+        print(f"  Офлайн-кеш: {len(manifest['entries'])} файлов, версия {manifest['version']}")
+        return manifest
+
+
+if __name__ == "__main__":
+    base_path = Path(__file__).parent.parent
+    site_path = sys.argv[1] if len(sys.argv) > 1 else None
+    PrecacheBuilder(base_path, site_path).build()
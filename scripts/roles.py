@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Сборки инструкции по ролям (менеджер, руководитель, администратор)
+
+Роли описаны в профиле редакции (editions.json, "roles"):
+    "manager": {
+      "title": "Менеджер",
+      "sections": ["intro", "analytics", ...],  # разделы редакции, нужные роли
+      "skip_parts": ["00_Регистрация_и_вход"]   # части этих разделов, не нужные роли
+    }
+
+Блоки внутри частей помечаются ролями, которым они нужны:
+    {ROLE: head admin}
+    ...
+    {/ROLE}
+В полной сборке метки просто убираются, в сборке роли блоки других
+ролей вырезаются (filter_role_blocks).
+
+Все роли за один запуск: части, скриншоты и стили читаются один раз
+(build_editions), сайты ролей собираются MkDocs в том же процессе
+с общими маппингом, частями и скриншотами:
+    python scripts/roles.py                          # DOCX и сайты всех ролей
+    python scripts/roles.py --roles manager --no-site
+    python scripts/generate_instruction.py --role manager
+    ROP_ROLE=manager mkdocs build -d roles/manager/site
+
+Результат: roles/<роль>/<документ>.docx и roles/<роль>/site/ в корне редакции
+"""
+
+import re
+import argparse
+import posixpath
+from pathlib import Path
+
+
+ROLE_START_RE = re.compile(r'^\{ROLE:\s*([^}]*)\}$')
+ROLE_END = '{/ROLE}'
+
+# "РАЗДЕЛ III: АНАЛИТИКА" — номер раздела перенумеровывается в сборке роли
+SECTION_NUMBER_RE = re.compile(r'^(РАЗДЕЛ )[IVXLC]+(:)')
+ROMAN = [(10, "X"), (9, "IX"), (5, "V"), (4, "IV"), (1, "I")]
+
+# Роль сайта для mkdocs_hooks.py
+ROLE_ENV = "ROP_ROLE"
+
+# Каталог сборок по ролям относительно корня редакции
+ROLES_DIR = "roles"
+
+# [текст](путь.md#якорь){ .атрибуты } на страницах сайта
+PAGE_LINK_RE = re.compile(r'\[([^\]]+)\]\(([^)#\s]+\.md)(#[^)\s]*)?\)(\{[^}]*\})?')
+
+
+def block_roles(line):
+    """Роли из строки {ROLE: ...} или None, если это не метка"""
+    match = ROLE_START_RE.match(line.strip())
+    if match is None:
+        return None
+    return set(match.group(1).replace(',', ' ').split())
+
+
+def filter_role_blocks(content, role=None):
+    """Текст части для роли: блоки других ролей вырезаются, метки убираются
+
+    role=None — полная сборка: остаются все блоки.
+    """
+    if content is None or ('{ROLE' not in content and ROLE_END not in content):
+        return content
+
+    lines = []
+    roles = None  # роли текущего блока, None — вне блока
+    for line in content.split('\n'):
+        start = block_roles(line)
+        if start is not None:
+            roles = start
+            continue
+        if line.strip() == ROLE_END:
+            roles = None
+            continue
+        if roles is None or role is None or role in roles:
+            lines.append(line)
+    return '\n'.join(lines)
+
+
+def roman(number):
+    result = ""
+    for value, digits in ROMAN:
+        while number >= value:
+            result += digits
+            number -= value
+    return result
+
+
+def role_sections(sections, profile):
+    """Разделы редакции, нужные роли, без пропущенных частей
+
+    Порядок — как в редакции, разделы нумеруются заново подряд.
+    """
+    skip = set(profile.get('skip_parts', []))
+    selected = {}
+    for key, info in sections.items():
+        if key not in profile['sections']:
+            continue
+        title = SECTION_NUMBER_RE.sub(lambda match: f"{match.group(1)}{roman(len(selected) + 1)}{match.group(2)}",
+                                      info['title'])
+        selected[key] = {**info, 'title': title, 'parts': [part for part in info['parts'] if part not in skip]}
+    return selected
+
+
+def role_parts(sections, profile):
+    """Имена частей роли в порядке документа"""
+    return [part for info in role_sections(sections, profile).values() for part in info['parts']]
+
+
+def prune_nav(nav, keep):
+    """Навигация MkDocs только со страницами из keep (пустые разделы убираются)"""
+    pruned = []
+    for item in nav:
+        if isinstance(item, str):
+            if item in keep:
+                pruned.append(item)
+            continue
+        for title, value in item.items():
+            if isinstance(value, list):
+                children = prune_nav(value, keep)
+                if children:
+                    pruned.append({title: children})
+            elif value in keep:
+                pruned.append({title: value})
+    return pruned
+
+
+def unlink_pages(markdown, current_page, keep):
+    """Ссылки на страницы не из keep (вырезанные из сборки роли) → простой текст
+
+    current_page и keep — пути страниц относительно docs/.
+    """
+    base_dir = posixpath.dirname(current_page)
+
+    def unlink(match):
+        link_text, path = match.group(1), match.group(2)
+        if '://' in path:
+            return match.group(0)
+        target = posixpath.normpath(posixpath.join(base_dir, path))
+        return match.group(0) if target in keep else link_text
+
+    return PAGE_LINK_RE.sub(unlink, markdown)
+
+
+def build_sites(base_path, roles, inputs):
+    """Сайты ролей одной сборкой MkDocs на роль, в одном процессе
+
+    inputs — {screenshot_mapping, parts, image_data}, прочитанные один раз.
+    """
+    from mkdocs_hooks import build_site
+
+    base_path = Path(base_path)
+    sites = {}
+    for role in roles:
+        site_dir = base_path / ROLES_DIR / role / "site"
+        print(f"Сайт роли {role}: {site_dir}")
+        sites[role] = build_site(base_path / "mkdocs.yml", inputs, role=role, site_dir=str(site_dir))
+    return sites
+
+
+def main():
+    from generate_instruction import DEFAULT_EDITION, build_editions, load_editions
+    from stage_timer import StageTimer
+
+    editions = load_editions()
+    parser = argparse.ArgumentParser(description='Сборки инструкции по ролям: DOCX и сайт на каждую роль')
+    parser.add_argument('--edition', choices=list(editions), default=DEFAULT_EDITION,
+                        help=f'Редакция (по умолчанию {DEFAULT_EDITION})')
+    parser.add_argument('--roles', nargs='+', help='Роли (по умолчанию все роли редакции)')
+    parser.add_argument('--no-site', action='store_true', help='Только DOCX, без сайтов')
+    parser.add_argument('--jobs', type=int, help='Процессов для DOCX (по умолчанию по числу ролей)')
+    parser.add_argument('--timings', nargs='?', const='timings/roles.json', metavar='JSON',
+                        help='Время по этапам и частям (JSON, по умолчанию timings/roles.json)')
+
+    args = parser.parse_args()
+    base_path = Path(__file__).parent.parent
+    profile = editions[args.edition]
+    roles = args.roles or list(profile.get('roles', {}))
+    unknown = [role for role in roles if role not in profile.get('roles', {})]
+    if unknown:
+        parser.error(f"нет ролей в редакции {args.edition}: {', '.join(unknown)}")
+
+    timer = StageTimer()
+    generators = build_editions(base_path, [(args.edition, role) for role in roles], jobs=args.jobs, timer=timer,
+                                force_regenerate=True)
+
+    # Сайт есть только у облачной редакции
+    if not args.no_site and args.edition == DEFAULT_EDITION:
+        generator = generators[0]
+        inputs = {
+            "screenshot_mapping": generator.screenshot_mapping,
+            "parts": generator.parts,
+            "image_data": generator.image_data,
+        }
+        with timer.stage("sites"):
+            build_sites(base_path, roles, inputs)
+
+    print("=" * 60)
+    for generator in generators:
+        size = generator.output_path.stat().st_size if generator.output_path.exists() else 0
+        print(f"  {generator.role:<10} {generator.output_path.relative_to(base_path)}  {size / 1024 / 1024:.1f} МБ")
+    print("=" * 60)
+
+    if args.timings:
+        timer.print_summary()
+        timer.write_json(base_path / args.timings)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Постобработка поискового индекса собранного сайта
+
+Запускается из on_post_build (mkdocs_hooks.py) или вручную:
+    python scripts/search_index.py site/
+
+Что делает:
+- Убирает из search/search_index.json шум интерфейса: подписи
+  скриншотов (<figcaption>), alt-тексты картинок, заголовки блоков
+  "Интерфейс"/"Техническое" — меньше текста для индексации в браузере
+"""
+
+import re
+import sys
+import json
+from pathlib import Path
+
+
+# Шум интерфейса, который не должен попадать в поиск
+NOISE_PATTERNS = [
+    re.compile(r'<figcaption>.*?</figcaption>', re.S),
+    re.compile(r'<p class="admonition-title">.*?</p>', re.S),
+    re.compile(r'<img[^>]*>'),
+    re.compile(r'\S+\.png\b'),
+]
+
+
+class SearchIndexBuilder:
+    def __init__(self, site_path):
+        self.site_path = Path(site_path)
+        self.index_file = self.site_path / "search" / "search_index.json"
+
+    def strip_noise(self, text):
+        """Удаляет подписи скриншотов и служебные заголовки из текста"""
+        for pattern in NOISE_PATTERNS:
+            text = pattern.sub('', text)
+        return re.sub(r'\s{2,}', ' ', text).strip()
+
+    def clean_docs(self, docs):
+        """Чистит документы индекса, сохраняя их порядок и location"""
+        cleaned = []
+        for doc in docs:
+            doc = dict(doc)
+            doc['text'] = self.strip_noise(doc.get('text', ''))
+            cleaned.append(doc)
+        return cleaned
+
+    def build(self):
+        """Обрабатывает индекс собранного сайта"""
+        if not self.index_file.exists():
+            print(f"  ПРОПУЩЕН поиск: {self.index_file} не найден")
+            return
+
+        with open(self.index_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+
+        size_before = self.index_file.stat().st_size
+        data['docs'] = self.clean_docs(data['docs'])
+
+        with open(self.index_file, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+
+        print(f"  Поисковый индекс: {size_before} → {self.index_file.stat().st_size} байт")
+
+
+if __name__ == "__main__":
+    site_path = sys.argv[1] if len(sys.argv) > 1 else Path(__file__).parent.parent / "site"
+    SearchIndexBuilder(site_path).build()
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Манифест собранного сайта и выкладка только изменившихся файлов
+
+on_post_build (mkdocs_hooks.py) пишет в каталог сайта site-manifest.json:
+    {"version": "...", "files": {"путь": [sha256, размер], ...}}
+Манифест детерминирован: пути отсортированы, времени сборки в нём нет,
+а дата в sitemap.xml берётся из SOURCE_DATE_EPOCH — по умолчанию время
+последнего коммита (source_date_epoch). Одинаковые исходники дают
+одинаковый сайт и одинаковый манифест.
+
+Манифест выкладывается вместе с сайтом, поэтому следующая выкладка
+сравнивает новый сайт с тем, что уже лежит на хостинге, и отправляет
+только добавленные и изменённые файлы, удаляя исчезнувшие. Скриншоты
+с хешем в имени не меняются, правка текста — это килобайты страниц,
+поискового индекса и sw.js. Манифест отправляется последним: прерванная
+выкладка при следующем запуске повторяется.
+
+Цели выкладки:
+- каталог: /var/www/docs
+- rsync: user@host:/var/www/docs (rsync 3.1+ на обеих сторонах)
+Прошлый манифест берётся из цели или явно (--previous файл, каталог, URL).
+
+    python scripts/site_deploy.py                                    # манифест site/
+    python scripts/site_deploy.py --previous https://bvmax.github.io/digital-rop-docs/
+    python scripts/site_deploy.py --target user@host:/var/www/docs --dry-run
+    python scripts/site_deploy.py --target /var/www/docs
+"""
+
+import os
+import sys
+import json
+import shutil
+import hashlib
+import argparse
+import subprocess
+import tempfile
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+from convert_to_mkdocs import write_if_changed
+
+
+MANIFEST_FILE = "site-manifest.json"
+
+
+def source_date_epoch(base_path):
+    """Время последнего коммита (секунды) для SOURCE_DATE_EPOCH или None"""
+    try:
+        result = subprocess.run(["git", "log", "-1", "--format=%ct"], cwd=base_path,
+                                capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    value = result.stdout.strip()
+    return value if result.returncode == 0 and value.isdigit() else None
+
+
+def file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def is_remote(target):
+    """user@host:/path или host:/path — цель rsync, иначе каталог"""
+    target = str(target)
+    head = target.split('/', 1)[0]
+    return ':' in head and not Path(target).exists()
+
+
+class SiteManifest:
+    def __init__(self, site_path):
+        self.site_path = Path(site_path)
+
+    def files(self):
+        """{путь: [sha256, размер]} всех файлов сайта, кроме самого манифеста"""
+        files = {}
+        for dir_path, dir_names, names in os.walk(self.site_path):
+            dir_names.sort()
+            for name in sorted(names):
+                path = Path(dir_path) / name
+                rel_path = path.relative_to(self.site_path).as_posix()
+                if rel_path == MANIFEST_FILE:
+                    continue
+                files[rel_path] = [file_digest(path), path.stat().st_size]
+        return dict(sorted(files.items()))
+
+    def manifest(self):
+        files = self.files()
+        digest = hashlib.sha256(json.dumps(files, sort_keys=True).encode('utf-8')).hexdigest()
+        return {"version": digest[:10], "files": files}
+
+    def build(self):
+        """Пишет site-manifest.json в каталог сайта"""
+        manifest = self.manifest()
+        write_if_changed(self.site_path / MANIFEST_FILE, dump_manifest(manifest))
+        size = sum(size for _, size in manifest["files"].values())
+        print(f"  Манифест сайта: {len(manifest['files'])} файлов, {size / 1024 / 1024:.1f} МБ, "
+              f"версия {manifest['version']}")
+        return manifest
+
+
+def dump_manifest(manifest):
+    # Запись на строку: манифест удобно сравнивать и в git diff
+    return json.dumps(manifest, ensure_ascii=False, sort_keys=True, indent=1).encode('utf-8') + b'\n'
+
+
+def load_manifest(source):
+    """Манифест из файла, каталога сайта, URL сайта или цели rsync; нет манифеста — пустой"""
+    source = str(source)
+    if source.startswith(('http://', 'https://')):
+        url = source if source.endswith('.json') else source.rstrip('/') + '/' + MANIFEST_FILE
+        try:
+            with urllib.request.urlopen(url, timeout=30) as response:
+                return json.loads(response.read().decode('utf-8'))
+        except urllib.error.HTTPError as e:
+            if e.code == 404:
+                return {"version": None, "files": {}}
+            raise
+
+    if is_remote(source):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            local = Path(tmp_dir) / MANIFEST_FILE
+            result = subprocess.run(["rsync", "-q", f"{source.rstrip('/')}/{MANIFEST_FILE}", str(local)],
+                                    capture_output=True, text=True)
+            if result.returncode != 0 or not local.exists():
+                # Первая выкладка: манифеста на цели ещё нет
+                return {"version": None, "files": {}}
+            return json.loads(local.read_text(encoding='utf-8'))
+
+    path = Path(source)
+    if path.is_dir():
+        path = path / MANIFEST_FILE
+    if not path.exists():
+        return {"version": None, "files": {}}
+    return json.loads(path.read_text(encoding='utf-8'))
+
+
+def diff_manifests(previous, current):
+    """Что отправить: {added, changed, removed, unchanged, upload_bytes}"""
+    old, new = previous.get("files", {}), current["files"]
+    added = [path for path in new if path not in old]
+    changed = [path for path in new if path in old and old[path][0] != new[path][0]]
+    removed = sorted(path for path in old if path not in new)
+    return {
+        "added": added,
+        "changed": changed,
+        "removed": removed,
+        "unchanged": len(new) - len(added) - len(changed),
+        "upload_bytes": sum(new[path][1] for path in added + changed),
+    }
+
+
+class SiteDeployer:
+    def __init__(self, site_path, target, dry_run=False):
+        self.site_path = Path(site_path)
+        self.target = str(target)
+        self.dry_run = dry_run
+
+    def deploy(self, manifest, diff):
+        """Отправляет изменения, затем манифест"""
+        if self.dry_run:
+            return
+        upload = diff["added"] + diff["changed"]
+        if is_remote(self.target):
+            self.push_rsync(upload, diff["removed"])
+        else:
+            self.push_directory(upload, diff["removed"])
+
+    def push_directory(self, upload, removed):
+        target = Path(self.target)
+        for rel_path in upload:
+            dest = target / rel_path
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_name = tempfile.mkstemp(dir=dest.parent, prefix=f".{dest.name}.", suffix=".tmp")
+            os.close(fd)
+            try:
+                shutil.copyfile(self.site_path / rel_path, tmp_name)
+                os.replace(tmp_name, dest)
+            except BaseException:
+                os.unlink(tmp_name)
+                raise
+        for rel_path in removed:
+            dest = target / rel_path
+            dest.unlink(missing_ok=True)
+            # Опустевшие каталоги удалённых страниц
+            parent = dest.parent
+            while parent != target and parent.exists() and not any(parent.iterdir()):
+                parent.rmdir()
+                parent = parent.parent
+        shutil.copyfile(self.site_path / MANIFEST_FILE, target / MANIFEST_FILE)
+
+    def push_rsync(self, upload, removed):
+        # Отсутствующие в site/ пути из списка rsync удаляет на цели (--delete-missing-args)
+        files = '\n'.join(upload + removed) + '\n'
+        destination = self.target.rstrip('/') + '/'
+        if upload or removed:
+            subprocess.run(["rsync", "-a", "--files-from=-", "--delete-missing-args", f"{self.site_path}/", destination],
+                           input=files, text=True, check=True)
+        subprocess.run(["rsync", "-a", str(self.site_path / MANIFEST_FILE), destination], check=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Манифест сайта и выкладка только изменившихся файлов')
+    parser.add_argument('--site', help='Каталог собранного сайта (по умолчанию site/)')
+    parser.add_argument('--previous', help='Прошлый манифест: файл, каталог, URL сайта (по умолчанию из --target)')
+    parser.add_argument('--target', help='Куда выложить: каталог или user@host:/путь (rsync)')
+    parser.add_argument('--dry-run', action='store_true', help='Только показать, что будет отправлено')
+
+    args = parser.parse_args()
+    base_path = Path(__file__).parent.parent
+    site_path = Path(args.site) if args.site else base_path / "site"
+    if not site_path.is_dir():
+        parser.error(f"нет каталога сайта {site_path} (сначала mkdocs build)")
+
+    manifest = SiteManifest(site_path).build()
+    previous_source = args.previous or args.target
+    if previous_source is None:
+        return
+
+    previous = load_manifest(previous_source)
+    diff = diff_manifests(previous, manifest)
+    total = sum(size for _, size in manifest["files"].values())
+    print(f"  Было: {previous.get('version') or 'нет манифеста'}, стало: {manifest['version']}")
+    print(f"  Добавлено {len(diff['added'])}, изменено {len(diff['changed'])}, удалено {len(diff['removed'])}, "
+          f"без изменений {diff['unchanged']}")
+    print(f"  К отправке: {diff['upload_bytes'] / 1024:.1f} КБ из {total / 1024 / 1024:.1f} МБ")
+    for path in diff["added"] + diff["changed"]:
+        print(f"    + {path}")
+    for path in diff["removed"]:
+        print(f"    - {path}")
+
+    if args.target:
+        try:
+            SiteDeployer(site_path, args.target, dry_run=args.dry_run).deploy(manifest, diff)
+        except (OSError, subprocess.CalledProcessError) as e:
+            print(f"ОШИБКА выкладки: {e}")
+            sys.exit(1)
+        if not args.dry_run:
+            print(f"  Выложено в {args.target}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Замер времени сборки по этапам и частям
+
+Используется генераторами (--timings / --profile):
+    timer = StageTimer(profile=True)
+    with timer.stage("render", part="04_Тесты"):
+        ...
+    timer.print_summary()
+    timer.write_json(path)
+
+Для каждого этапа считаются wall time, CPU time и число вызовов, для
+частей — то же с разбивкой по этапам. Вложенные этапы входят во время
+внешнего (например, images внутри render) и в таблице помечены └.
+
+С profile=True каждый этап верхнего уровня пишется в свой cProfile:
+в JSON попадают самые тяжёлые функции, рядом кладутся .prof файлы
+(для pstats/snakeviz).
+
+С memory=True (--memprofile) вокруг этапов верхнего уровня снимаются
+снимки tracemalloc: пик и остаток памяти по этапам и частям, места
+с наибольшим приростом. Время при этом завышено в разы — для замеров
+времени запускайте без него.
+"""
+
+import io
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+
+
+TOP_FUNCTIONS = 20
+TOP_SITES = 5
+
+
+def empty_stat():
+    return {"wall": 0.0, "cpu": 0.0, "calls": 0}
+
+
+def add_stat(target, wall, cpu, calls=1):
+    target["wall"] += wall
+    target["cpu"] += cpu
+    target["calls"] += calls
+
+
+def format_memory(size):
+    if abs(size) < 1024 * 1024:
+        return f"{size / 1024:.0f} КБ"
+    return f"{size / 1024 / 1024:.1f} МБ"
+
+
+def allocation_sites(statistics, limit=TOP_SITES):
+    """Строки tracemalloc → [{site, size, count}] по убыванию размера"""
+    sites = []
+    for stat in statistics[:limit]:
+        frame = stat.traceback[0]
+        size = getattr(stat, 'size_diff', stat.size)
+        count = getattr(stat, 'count_diff', stat.count)
+        if size > 0:
+            sites.append({"site": f"{Path(frame.filename).name}:{frame.lineno}", "size": size, "count": count})
+    return sites
+
+
+def memory_snapshot():
+    """Снимок tracemalloc без служебных аллокаций самого tracemalloc"""
+    return tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, __file__),
+    ))
+
+
+class StageTimer:
+    def __init__(self, profile=False, memory=False):
+        self.profile = profile
+        self.memory = memory
+        self.stages = {}    # этап → {wall, cpu, calls}
+        self.parts = {}     # часть → {этап → {wall, cpu, calls}}
+        self.profiles = {}  # этап → cProfile.Profile
+        self.nested = set()  # этапы, вызванные внутри другого этапа
+        self.memory_stages = {}  # этап → {peak, retained, calls}
+        self.memory_parts = {}   # часть → {этап → {peak, retained, top}}
+        if memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        self.depth = 0
+        self.started = (time.perf_counter(), time.process_time())
+
+    @contextmanager
+    def stage(self, name, part=None):
+        """Замер одного вызова этапа (опционально — в разрезе части)"""
+        profiler = None
+        if self.profile and self.depth == 0:
+            # cProfile не вкладывается: профилируем только внешний этап
+            import cProfile
+            profiler = self.profiles.setdefault(name, cProfile.Profile())
+            profiler.enable()
+
+        snapshot = None
+        if self.memory and self.depth == 0:
+            snapshot = memory_snapshot()
+            memory_before = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+
+        if self.depth:
+            self.nested.add(name)
+        self.depth += 1
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - wall_start
+            cpu = time.process_time() - cpu_start
+            self.depth -= 1
+            if profiler:
+                profiler.disable()
+
+            add_stat(self.stages.setdefault(name, empty_stat()), wall, cpu)
+            if part is not None:
+                add_stat(self.parts.setdefault(part, {}).setdefault(name, empty_stat()), wall, cpu)
+            if snapshot is not None:
+                self.record_memory(name, part, memory_before, snapshot)
+
+    def record_memory(self, name, part, memory_before, snapshot):
+        """Пик и остаток памяти этапа относительно его начала"""
+        current, peak = tracemalloc.get_traced_memory()
+        peak, retained = peak - memory_before, current - memory_before
+
+        stage = self.memory_stages.setdefault(name, {"peak": 0, "retained": 0, "calls": 0})
+        stage["peak"] = max(stage["peak"], peak)
+        stage["retained"] += retained
+        stage["calls"] += 1
+
+        if part is not None:
+            top = allocation_sites(memory_snapshot().compare_to(snapshot, 'lineno'))
+            self.memory_parts.setdefault(part, {})[name] = {"peak": peak, "retained": retained, "top": top}
+
+    def merge(self, report):
+        """Добавляет замеры из report() другого таймера (воркера пула)"""
+        self.nested.update(report["nested"])
+        for name, stat in report["stages"].items():
+            add_stat(self.stages.setdefault(name, empty_stat()), stat["wall"], stat["cpu"], stat["calls"])
+        for part, stages in report["parts"].items():
+            for name, stat in stages.items():
+                target = self.parts.setdefault(part, {}).setdefault(name, empty_stat())
+                add_stat(target, stat["wall"], stat["cpu"], stat["calls"])
+
+    def top_functions(self, name, limit=TOP_FUNCTIONS):
+        """Самые тяжёлые функции этапа по cumulative time"""
+        import pstats
+        stats = pstats.Stats(self.profiles[name], stream=io.StringIO())
+        rows = []
+        for (filename, line, function), (_, ncalls, tottime, cumtime, _) in stats.stats.items():
+            rows.append({
+                "function": f"{Path(filename).name}:{line}({function})",
+                "calls": ncalls,
+                "tottime": round(tottime, 4),
+                "cumtime": round(cumtime, 4),
+            })
+        rows.sort(key=lambda row: -row["cumtime"])
+        return rows[:limit]
+
+    def report(self):
+        wall_start, cpu_start = self.started
+        return {
+            "total": {
+                "wall": time.perf_counter() - wall_start,
+                "cpu": time.process_time() - cpu_start,
+            },
+            "stages": self.stages,
+            "parts": self.parts,
+            "nested": sorted(self.nested),
+            "profiles": {name: self.top_functions(name) for name in self.profiles},
+            "memory": self.memory_report(),
+        }
+
+    def memory_report(self):
+        if not self.memory:
+            return None
+        current, peak = tracemalloc.get_traced_memory()
+        return {
+            "current": current,
+            "peak": peak,
+            "stages": self.memory_stages,
+            "parts": self.memory_parts,
+            "top": allocation_sites(memory_snapshot().statistics('lineno'), limit=TOP_FUNCTIONS),
+        }
+
+    def print_summary(self, parts_limit=10):
+        report = self.report()
+        print("=" * 60)
+        print(f"{'Этап':<16} {'wall, с':>9} {'CPU, с':>9} {'вызовов':>8}")
+        for name, stat in sorted(report["stages"].items(), key=lambda item: (item[0] in self.nested, -item[1]["wall"])):
+            label = f"  └ {name}" if name in self.nested else name
+            print(f"{label:<16} {stat['wall']:9.3f} {stat['cpu']:9.3f} {stat['calls']:8}")
+        print(f"{'всего':<16} {report['total']['wall']:9.3f} {report['total']['cpu']:9.3f}")
+
+        if report["parts"]:
+            print("\nСамые долгие части:")
+            totals = {
+                part: sum(stat["wall"] for name, stat in stages.items() if name not in self.nested)
+                for part, stages in report["parts"].items()
+            }
+            for part, wall in sorted(totals.items(), key=lambda item: -item[1])[:parts_limit]:
+                detail = ", ".join(f"{name} {stat['wall']:.3f}" for name, stat in report["parts"][part].items())
+                print(f"  {part:<40} {wall:8.3f} с  ({detail})")
+
+        if report["memory"]:
+            self.print_memory(report["memory"], parts_limit)
+        print("=" * 60)
+
+    def print_memory(self, memory, parts_limit):
+        print(f"\nПамять: сейчас {format_memory(memory['current'])}, пик {format_memory(memory['peak'])}")
+        for name, stat in sorted(memory["stages"].items(), key=lambda item: -item[1]["retained"]):
+            print(f"  {name:<16} пик {format_memory(stat['peak']):>10}  остаток {format_memory(stat['retained']):>10}")
+
+        if memory["parts"]:
+            print("\nЧасти с наибольшим остатком памяти:")
+            retained = {part: sum(stat["retained"] for stat in stages.values()) for part, stages in memory["parts"].items()}
+            for part, size in sorted(retained.items(), key=lambda item: -item[1])[:parts_limit]:
+                peak = max(stat["peak"] for stat in memory["parts"][part].values())
+                print(f"  {part:<40} пик {format_memory(peak):>10}  остаток {format_memory(size):>10}")
+                top = max(memory["parts"][part].values(), key=lambda stat: stat["retained"])["top"]
+                for site in top[:3]:
+                    print(f"      {site['site']:<36} +{format_memory(site['size'])}")
+
+        print("\nГде живёт память сейчас:")
+        for site in memory["top"][:TOP_SITES]:
+            print(f"  {site['site']:<40} {format_memory(site['size']):>10}  ({site['count']} блоков)")
+
+    def write_json(self, path):
+        """JSON-отчёт; при профилировании рядом — <этап>.prof"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.report(), f, ensure_ascii=False, indent=2)
+
+        for name, profiler in self.profiles.items():
+            profiler.dump_stats(str(path.with_name(f"{path.stem}.{name}.prof")))
+
+        print(f"Отчёт о времени: {path}")
@@ -0,0 +1,120 @@
+/*
+ * Service worker документации Цифровой РОП
+ *
+ * Собирается из scripts/sw_template.js в on_post_build (precache.py):
+ * __PRECACHE_MANIFEST__ заменяется содержимым precache-manifest.json,
+ * поэтому каждая сборка с изменениями даёт новый sw.js и браузер
+ * обновляет кеш в фоне.
+ *
+ * Стратегия:
+ * - install: докачиваются только записи с изменившейся ревизией
+ * - fetch: cache-first; страницы и индекс поиска обновляются в фоне,
+ *   картинки с хешем в имени неизменяемы и не перезапрашиваются;
+ *   в кеш попадают только адреса из манифеста, остальное идёт в сеть
+ * - activate: удаляются записи, которых больше нет в манифесте
+ */
+
+const MANIFEST = __PRECACHE_MANIFEST__;
+const CACHE_NAME = "rop-docs-precache";
+const REVISIONS_KEY = "__precache-revisions__";
+
+const scopeUrl = (path) => new URL(path, self.registration.scope).href;
+const PRECACHED = new Set(MANIFEST.entries.map((entry) => scopeUrl(entry.url)));
+
+/* Адрес записи кеша: без параметров и якоря, как в манифесте */
+function cacheKey(request) {
+  const url = new URL(request.url);
+  url.search = "";
+  url.hash = "";
+  return url.href;
+}
+
+async function loadRevisions(cache) {
+  const response = await cache.match(scopeUrl(REVISIONS_KEY));
+  return response ? response.json() : {};
+}
+
+async function saveRevisions(cache, revisions) {
+  await cache.put(
+    scopeUrl(REVISIONS_KEY),
+    new Response(JSON.stringify(revisions), {
+      headers: { "Content-Type": "application/json" }
+    })
+  );
+}
+
+self.addEventListener("install", (event) => {
+  event.waitUntil((async () => {
+    const cache = await caches.open(CACHE_NAME);
+    const revisions = await loadRevisions(cache);
+
+    for (const entry of MANIFEST.entries) {
+      const url = scopeUrl(entry.url);
+      if (revisions[url] === entry.revision && await cache.match(url))
+        continue;
+
+      const response = await fetch(url, { cache: "reload" });
+      if (response.ok) {
+        await cache.put(url, response);
+        revisions[url] = entry.revision;
+      }
+    }
+
+    await saveRevisions(cache, revisions);
+    await self.skipWaiting();
+  })());
+});
+
+self.addEventListener("activate", (event) => {
+  event.waitUntil((async () => {
+    const cache = await caches.open(CACHE_NAME);
+    const revisions = await loadRevisions(cache);
+    for (const url of Object.keys(revisions)) {
+      if (!PRECACHED.has(url)) {
+        await cache.delete(url);
+        delete revisions[url];
+      }
+    }
+
+    await saveRevisions(cache, revisions);
+    await self.clients.claim();
+  })());
+});
+
+async function refresh(cache, request) {
+  try {
+    const response = await fetch(request);
+    const key = cacheKey(request);
+    if (response.ok && PRECACHED.has(key))
+      await cache.put(key, response.clone());
+    return response;
+  } catch (err) {
+    return undefined;
+  }
+}
+
+self.addEventListener("fetch", (event) => {
+  const request = event.request;
+  if (request.method !== "GET" || !request.url.startsWith(self.registration.scope))
+    return;
+
+  event.respondWith((async () => {
+    const cache = await caches.open(CACHE_NAME);
+    const cached = await cache.match(request, { ignoreSearch: true });
+
+    if (cached) {
+      if (!MANIFEST.immutable.some((prefix) => request.url.startsWith(scopeUrl(prefix))))
+        event.waitUntil(refresh(cache, request));
+      return cached;
+    }
+
+    const response = await refresh(cache, request);
+    if (response)
+      return response;
+
+    /* Офлайн и страницы нет в кеше — отдаём главную */
+    if (request.mode === "navigate")
+      return (await cache.match(scopeUrl("./"))) || Response.error();
+    return Response.error();
+  })());
+});
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Генератор синтетической инструкции для профилирования
+
+Создаёт дерево в формате репозитория:
+    <каталог>/Части_инструкции/*.md        — части с {INTERFACE}/{TECHNICAL},
+                                            **Имя.png**, [СКРИНШОТ: ...],
+                                            таблицами, блоками кода и #якорями
+    <каталог>/СКРИНШОТЫ/<раздел>/*.png     — заглушки скриншотов (валидные PNG)
+    <каталог>/scripts/screenshot_mapping.json
+    <каталог>/corpus.json                  — разделы DOCX и file_mapping MkDocs
+
+Размер задаётся масштабом относительно реальной инструкции
+(19 частей, ~100 КБ Markdown). Содержимое детерминировано (--seed).
+
+Использование:
+    python scripts/synthetic_corpus.py /tmp/corpus --scale 50
+    python scripts/benchmark.py --corpus synthetic --scales 1 10 50
+"""
+
+import json
+import zlib
+import random
+import struct
+import argparse
+from pathlib import Path
+
+from anchor_index import slugify
+
+
+# Раскладка реальной инструкции: (префикс, раздел, название страницы MkDocs)
+SECTIONS = [
+    ("00", "intro", "start"),
+    ("01", "settings", "settings"),
+    ("02", "analytics", "analytics"),
+    ("03", "charts", "charts"),
+    ("04", "tests", "tests"),
+    ("05", "billing", "billing"),
+]
+PARTS_PER_SECTION = [3, 6, 4, 2, 2, 2]  # 19 частей на масштаб 1
+
+WORDS = (
+    "система звонок менеджер клиент сделка скрипт промт оценка конверсия "
+    "таблица отчёт интеграция настройка аналитика пользователь группа бот "
+    "транскрипция критерий результат период фильтр график показатель этап "
+    "воронка шаблон проверка карточка статистика запись уведомление доступ"
+).split()
+VERBS = "откройте выберите нажмите укажите проверьте сохраните добавьте настройте".split()
+UI_ITEMS = "Настройки Аналитика Графики Тесты Биллинг Сохранить Добавить Фильтр Экспорт".split()
+
+
+def png_bytes(width, height, size_kb, rng):
+    """Валидный PNG примерно size_kb КБ: шум в начале строк не сжимается"""
+    noise = min(width * 3, size_kb * 1024 // height)
+    rows = [b'\x00' + rng.randbytes(noise).ljust(width * 3, b'\xff') for _ in range(height)]
+
+    def chunk(kind, data):
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+
+    header = struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)
+    return (b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', header)
+            + chunk(b'IDAT', zlib.compress(b''.join(rows), 6)) + chunk(b'IEND', b''))
+
+
+class SyntheticCorpus:
+    def __init__(self, output_path, scale=1, seed=0, part_kb=5, screenshots_per_part=4, image_size=(1600, 1000), image_kb=400):
+        self.base_path = Path(output_path)
+        self.parts_path = self.base_path / "Части_инструкции"
+        self.screenshots_path = self.base_path / "СКРИНШОТЫ"
+        self.scale = scale
+        self.part_kb = part_kb
+        self.screenshots_per_part = screenshots_per_part
+        self.image_size = image_size
+        self.image_kb = image_kb
+        self.rng = random.Random(seed)
+
+        self.sections = {}
+        self.file_mapping = {}
+        self.screenshot_mapping = {}
+        self.titles = {}  # часть → заголовок первого уровня
+
+    @property
+    def part_names(self):
+        return [part for info in self.sections.values() for part in info['parts']]
+
+    def size(self):
+        return sum(path.stat().st_size for path in self.parts_path.glob('*.md'))
+
+    # --- текст ---
+
+    def words(self, count):
+        return " ".join(self.rng.choice(WORDS) for _ in range(count))
+
+    def sentence(self):
+        text = self.words(self.rng.randint(6, 14))
+        return text[0].upper() + text[1:] + "."
+
+    def paragraph(self):
+        return " ".join(self.sentence() for _ in range(self.rng.randint(2, 4)))
+
+    def link(self, current_part):
+        """Ссылка на заголовок другой части"""
+        target = self.rng.choice([part for part in self.titles if part != current_part] or [current_part])
+        title = self.titles[target]
+        return f"[{title}](#{slugify(title)})"
+
+    def block(self, part_name, screenshots):
+        """Один случайный блок разметки"""
+        kind = self.rng.choice(["text", "text", "interface", "technical", "list", "table", "code", "image", "link"])
+        if kind == "interface":
+            path = " → ".join(self.rng.sample(UI_ITEMS, 2))
+            return f"{{INTERFACE}} {self.rng.choice(VERBS).capitalize()} **{path}**. {self.sentence()}"
+        if kind == "technical":
+            return f"{{TECHNICAL}} {self.paragraph()}"
+        if kind == "list":
+            marker = self.rng.choice(["-", "1."])
+            return "\n".join(f"{marker} {self.sentence()}" for _ in range(self.rng.randint(3, 6)))
+        if kind == "table":
+            rows = ["| Поле | Описание |", "|------|----------|"]
+            rows += [f"| **{self.words(1).capitalize()}** | {self.sentence()} |" for _ in range(self.rng.randint(3, 6))]
+            return "\n".join(rows)
+        if kind == "code":
+            lines = [self.sentence() for _ in range(self.rng.randint(2, 4))]
+            return f"**Пример:**\n```\n" + "\n".join(lines) + "\n```"
+        if kind == "image" and screenshots:
+            name = screenshots.pop()
+            if self.rng.random() < 0.5:
+                return f"**{name}**"
+            return f"[СКРИНШОТ: {name}]"
+        if kind == "link":
+            return f"{self.sentence()} Подробнее: {self.link(part_name)}."
+        return self.paragraph()
+
+    def part_text(self, part_name, screenshots):
+        lines = [f"# {self.titles[part_name]}", "", self.paragraph(), ""]
+        size = 0
+        subsection = 0
+        while size < self.part_kb * 1024:
+            subsection += 1
+            lines += [f"## {self.words(2).capitalize()} {subsection}", ""]
+            for _ in range(self.rng.randint(2, 5)):
+                block = self.block(part_name, screenshots)
+                lines += [block, ""]
+                size += len(block.encode('utf-8'))
+        # Оставшиеся скриншоты — в конец части, чтобы маппинг был использован целиком
+        lines += [f"**{name}**\n" for name in reversed(screenshots)]
+        return "\n".join(lines)
+
+    # --- запись ---
+
+    def add_screenshots(self, part_name, section_dir):
+        names = []
+        for number in range(1, self.screenshots_per_part + 1):
+            name = f"{self.titles[part_name]}. Экран {number}.png"
+            rel_path = f"СКРИНШОТЫ/{section_dir}/{part_name} {number}.png"
+            path = self.base_path / rel_path
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(png_bytes(*self.image_size, self.image_kb, self.rng))
+            self.screenshot_mapping[name] = rel_path
+            names.append(name)
+        return names
+
+    def generate(self):
+        """Пишет части, скриншоты, маппинг и corpus.json"""
+        self.parts_path.mkdir(parents=True, exist_ok=True)
+        (self.base_path / "scripts").mkdir(parents=True, exist_ok=True)
+
+        # Сначала все названия, чтобы ссылки могли вести вперёд
+        layout = []
+        for (prefix, key, page), count in zip(SECTIONS, PARTS_PER_SECTION):
+            for copy in range(self.scale):
+                section_key = f"{key}_{copy}" if copy else key
+                section = self.sections.setdefault(section_key, {
+                    "title": f"РАЗДЕЛ {len(self.sections) + 1}: {key.upper()} {copy}",
+                    "parts": [],
+                })
+                for number in range(1, count + 1):
+                    part_name = f"{prefix}_{key}_{copy}_{number}"
+                    self.titles[part_name] = f"{key.capitalize()} {copy}.{number} - {self.words(2).capitalize()}"
+                    section["parts"].append(part_name)
+                    self.file_mapping[part_name] = f"{page}/{copy}/{number}.md"
+                    layout.append((part_name, f"{prefix}. {key} {copy}"))
+
+        for part_name, section_dir in layout:
+            screenshots = self.add_screenshots(part_name, section_dir)
+            text = self.part_text(part_name, screenshots)
+            (self.parts_path / f"{part_name}.md").write_text(text, encoding='utf-8')
+
+        with open(self.base_path / "scripts" / "screenshot_mapping.json", 'w', encoding='utf-8') as f:
+            json.dump({"screenshot_mapping": self.screenshot_mapping}, f, ensure_ascii=False, indent=2)
+        with open(self.base_path / "corpus.json", 'w', encoding='utf-8') as f:
+            json.dump({"sections": self.sections, "file_mapping": self.file_mapping}, f, ensure_ascii=False, indent=2)
+
+        return self
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Синтетическая инструкция для профилирования генераторов')
+    parser.add_argument('output', help='Каталог для корпуса')
+    parser.add_argument('--scale', type=int, default=1, help='Масштаб относительно реальной инструкции (19 частей)')
+    parser.add_argument('--part-kb', type=int, default=5, help='Примерный размер части, КБ')
+    parser.add_argument('--screenshots', type=int, default=4, help='Скриншотов на часть')
+    parser.add_argument('--image-size', default='1600x1000', help='Размер заглушек скриншотов, ШxВ')
+    parser.add_argument('--image-kb', type=int, default=400, help='Примерный размер заглушки скриншота, КБ')
+    parser.add_argument('--seed', type=int, default=0, help='Зерно генератора')
+
+    args = parser.parse_args()
+    width, height = (int(value) for value in args.image_size.split('x'))
+
+    corpus = SyntheticCorpus(
+        args.output,
+        scale=args.scale,
+        seed=args.seed,
+        part_kb=args.part_kb,
+        screenshots_per_part=args.screenshots,
+        image_size=(width, height),
+        image_kb=args.image_kb,
+    ).generate()
+
+    print(f"Частей: {len(corpus.part_names)}, Markdown: {corpus.size() // 1024} КБ, "
+          f"скриншотов: {len(corpus.screenshot_mapping)}")
+    print(f"Корпус: {corpus.base_path}")
+
+
+if __name__ == "__main__":
+    main()
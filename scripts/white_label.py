@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Партнёрские (white-label) сборки инструкции
+
+Профили брендов — JSON {имя: профиль}:
+    {
+      "partner": {
+        "logo": "partners/partner/logo.png",   # от корня репозитория
+        "logo_width": 2.5,                     # дюймы, по умолчанию как в редакции
+        "accent": "1E88E5",                    # заголовки, шапка таблиц, тема сайта
+        "link": "0D47A1",                      # ссылки DOCX (по умолчанию как в редакции)
+        "url": "https://rop.partner.ru/login"  # вместо адреса продукта редакции
+      }
+    }
+
+Документ и сайт собираются один раз; для брендов переписывается только
+то, что зависит от оформления:
+- DOCX: базовый документ рендерится с метками вместо цветов редакции,
+  для бренда в styles.xml и document.xml подставляются цвета и URL,
+  на обложке меняется логотип. Остальные части архива (скриншоты)
+  берутся из базового документа без повторного рендера и сжатия
+- сайт: файлы базовой сборки MkDocs подключаются жёсткими ссылками,
+  заново пишутся логотип, extra.css, страницы с адресом продукта,
+  манифест офлайн-кеша и манифест файлов сайта (site_deploy.py)
+
+Использование:
+    python scripts/white_label.py brands.json
+    python scripts/white_label.py brands.json --output white_label --no-site
+
+Результат: <output>/<бренд>/<документ>.docx и <output>/<бренд>/site/
+"""
+
+import os
+import re
+import json
+import shutil
+import argparse
+import tempfile
+from pathlib import Path
+
+from generate_instruction import (
+    DEFAULT_EDITION, InstructionGenerator, build_time, load_editions, package_entries, write_docx,
+)
+from stage_timer import StageTimer
+
+
+# Метки цветов в базовом документе: заменяются на цвета бренда
+COLOR_MARKS = {"accent": "0D0E01", "table_header": "0D0E02", "link": "0D0E03"}
+
+# Текстовые файлы сайта, в которых ищутся цвета и адрес продукта
+TEXT_SUFFIXES = {".html", ".css", ".js", ".json", ".xml", ".txt"}
+
+SITE_LOGO = "assets/logo.png"
+SITE_STYLES = "stylesheets/extra.css"
+
+EMU_RE = 'cx="{}" cy="{}"'
+
+
+def hex_rgb(color):
+    return tuple(int(color[i:i + 2], 16) for i in (0, 2, 4))
+
+
+def rgb_hex(rgb):
+    return "".join(f"{round(channel):02X}" for channel in rgb)
+
+
+def shades(color):
+    """Оттенки темы сайта, как в extra.css: светлый (+20% к белому) и тёмный (×0.85)"""
+    rgb = hex_rgb(color)
+    return {
+        "light": rgb_hex(channel + (255 - channel) * 0.2 for channel in rgb),
+        "dark": rgb_hex(channel * 0.85 for channel in rgb),
+    }
+
+
+def css_replacements(css, old, new):
+    """Замены цвета темы в extra.css: hex, rgba() и оттенки --light/--dark"""
+    replacements = [
+        (f"#{old}", f"#{new}"),
+        (f"rgba({', '.join(map(str, hex_rgb(old)))},", f"rgba({', '.join(map(str, hex_rgb(new)))},"),
+    ]
+    # Оттенки в extra.css подобраны вручную — берём их из файла, а не из формулы
+    for name, color in shades(new).items():
+        match = re.search(rf'--md-primary-fg-color--{name}:\s*#([0-9A-Fa-f]{{6}})', css)
+        if match:
+            replacements.append((f"#{match.group(1)}", f"#{color}"))
+    return replacements
+
+
+class WhiteLabelBuild:
+    def __init__(self, base_path, brands, output_path, edition=DEFAULT_EDITION, site=True, timer=None):
+        self.base_path = Path(base_path)
+        self.brands = brands
+        self.output_path = Path(output_path)
+        self.edition = edition
+        self.profile = load_editions()[edition]
+        self.url = self.profile['url']
+        self.site = site and edition == DEFAULT_EDITION  # сайт собирается только для облачной редакции
+        self.timer = timer or StageTimer()
+
+        self.generator = None
+        self.entries = {}  # имя в архиве → bytes базового документа
+        self.logo = None   # {name, target, extent} логотипа обложки
+        self.site_path = None
+        self.site_patch = {}  # путь в сайте → текст, где есть что заменить
+
+    # --- базовая сборка ---
+
+    def render_docx(self):
+        """Базовый документ с метками цветов (в памяти)"""
+        self.generator = InstructionGenerator(
+            self.base_path, edition=self.edition, timer=self.timer, overrides={"colors": COLOR_MARKS},
+        )
+        generator = self.generator
+        with self.timer.stage("document"):
+            doc = generator.create_document()
+            generator.add_table_of_contents(doc)
+        for key in generator.sections:
+            generator.add_section_to_doc(doc, key, force_regenerate=True)
+
+        with self.timer.stage("save"):
+            generator.normalize_properties(doc, build_time())
+            self.entries = package_entries(doc)
+        self.logo = self.find_logo()
+
+    def find_logo(self):
+        """Логотип — первая картинка документа (обложка)"""
+        logo_path = self.generator.base_path / self.profile['logo']
+        if not logo_path.exists():
+            return None
+
+        document = self.entries["word/document.xml"].decode('utf-8')
+        match = re.search(r'r:embed="(rId\d+)"', document)
+        if match is None:
+            return None
+        rels = self.entries["word/_rels/document.xml.rels"].decode('utf-8')
+        target = re.search(rf'<Relationship Id="{match.group(1)}"[^>]*Target="([^"]+)"', rels)
+        if target is None:
+            target = re.search(rf'<Relationship [^>]*Target="([^"]+)"[^>]*Id="{match.group(1)}"', rels)
+        if target is None:
+            return None
+        return {
+            "name": f"word/{target.group(1)}",
+            "target": target.group(1),
+            "extent": self.logo_extent(logo_path.read_bytes(), self.profile['logo_width'])[0],
+        }
+
+    def logo_extent(self, data, width):
+        """Размер логотипа в EMU при заданной ширине (как считает add_picture)"""
+        from docx.image.image import Image
+        from docx.shared import Inches
+
+        image = Image.from_blob(data)
+        return image.scaled_dimensions(Inches(width), None), image
+
+    def build_site(self, work_path):
+        """Базовый сайт MkDocs во временный каталог"""
+        from mkdocs.commands.build import build
+        from mkdocs.config import load_config
+
+        self.site_path = Path(work_path) / "site"
+        with self.timer.stage("site"):
+            config = load_config(str(self.base_path / "mkdocs.yml"), site_dir=str(self.site_path))
+            build(config)
+
+        # Тексты, где встречается адрес продукта или цвет темы, читаются один раз
+        tokens = [self.url, f"#{self.profile['colors']['accent']}"]
+        for path in self.site_path.rglob('*'):
+            rel_path = path.relative_to(self.site_path).as_posix()
+            if not path.is_file() or path.suffix not in TEXT_SUFFIXES:
+                continue
+            text = path.read_text(encoding='utf-8', errors='surrogateescape')
+            if any(token in text for token in tokens):
+                self.site_patch[rel_path] = text
+
+    # --- бренды ---
+
+    def brand_colors(self, brand):
+        """Цвета бренда; не заданные берутся из редакции"""
+        edition_colors = self.profile['colors']
+        accent = brand.get("accent", edition_colors["accent"]).lstrip('#').upper()
+        return {
+            "accent": accent,
+            "table_header": brand.get("table_header", accent).lstrip('#').upper(),
+            "link": brand.get("link", edition_colors["link"]).lstrip('#').upper(),
+        }
+
+    def brand_docx(self, name, brand, colors):
+        """DOCX бренда из архива базового документа"""
+        entries = dict(self.entries)
+        for part in ("word/document.xml", "word/styles.xml"):
+            xml = entries[part].decode('utf-8')
+            for key, mark in COLOR_MARKS.items():
+                xml = xml.replace(f'"{mark}"', f'"{colors[key]}"')
+            if part == "word/document.xml":
+                xml = xml.replace(self.url, brand.get("url", self.url))
+            entries[part] = xml.encode('utf-8')
+
+        if brand.get("logo"):
+            self.replace_logo(entries, brand)
+
+        output = self.output_path / name / self.generator.output_path.name
+        output.parent.mkdir(parents=True, exist_ok=True)
+        # Картинки уже сжаты: копируются без повторного deflate
+        write_docx(str(output), entries, store_media=True)
+        return output
+
+    def replace_logo(self, entries, brand):
+        """Логотип бренда вместо логотипа редакции на обложке"""
+        if self.logo is None:
+            print("  ВНИМАНИЕ: в документе редакции нет логотипа, логотип бренда пропущен")
+            return
+
+        data = (self.base_path / brand["logo"]).read_bytes()
+        width = brand.get("logo_width", self.profile['logo_width'])
+        (cx, cy), image = self.logo_extent(data, width)
+        old_cx, old_cy = self.logo["extent"]
+
+        document = entries["word/document.xml"].decode('utf-8')
+        document = document.replace(EMU_RE.format(old_cx, old_cy), EMU_RE.format(cx, cy), 2)
+        entries["word/document.xml"] = document.encode('utf-8')
+
+        name = self.logo["name"]
+        if not name.endswith(f".{image.ext}"):
+            # Другой формат: новое имя части, ссылка на неё и тип содержимого
+            target = f"{self.logo['target'].rsplit('.', 1)[0]}.{image.ext}"
+            rels = entries["word/_rels/document.xml.rels"].decode('utf-8')
+            entries["word/_rels/document.xml.rels"] = rels.replace(
+                f'Target="{self.logo["target"]}"', f'Target="{target}"').encode('utf-8')
+            types = entries["[Content_Types].xml"].decode('utf-8')
+            if f'Extension="{image.ext}"' not in types:
+                types = types.replace('<Default ', f'<Default Extension="{image.ext}" ContentType="{image.content_type}"/><Default ', 1)
+                entries["[Content_Types].xml"] = types.encode('utf-8')
+            del entries[name]
+            name = f"word/{target}"
+        entries[name] = data
+
+    def brand_site(self, name, brand, colors, converter):
+        """Дерево сайта бренда: жёсткие ссылки + переписанные файлы"""
+        from precache import PrecacheBuilder
+        from site_deploy import SiteManifest
+
+        dest = self.output_path / name / "site"
+        if dest.exists():
+            shutil.rmtree(dest)
+
+        replacements = [(self.url, brand.get("url", self.url))]
+        styles = css_replacements(self.site_patch.get(SITE_STYLES, ""), self.profile['colors']['accent'], colors["accent"])
+
+        for path in self.site_path.rglob('*'):
+            rel_path = path.relative_to(self.site_path).as_posix()
+            target = dest / rel_path
+            if path.is_dir():
+                target.mkdir(parents=True, exist_ok=True)
+                continue
+            target.parent.mkdir(parents=True, exist_ok=True)
+
+            if rel_path == SITE_LOGO and brand.get("logo"):
+                shutil.copyfile(self.base_path / brand["logo"], target)
+            elif rel_path in self.site_patch:
+                text = self.site_patch[rel_path]
+                for old, new in replacements + (styles if rel_path == SITE_STYLES else []):
+                    text = text.replace(old, new)
+                target.write_text(text, encoding='utf-8', errors='surrogateescape')
+            else:
+                try:
+                    os.link(path, target)
+                except OSError:
+                    shutil.copy2(path, target)
+
+        # Ревизии изменённых страниц и ресурсов в офлайн-кеше
+        PrecacheBuilder(self.base_path, dest, converter).build()
+        # Манифест базового сайта (жёсткая ссылка) после правок устарел
+        SiteManifest(dest).build()
+        return dest
+
+    def run(self):
+        print("=" * 60)
+        print(f"Партнёрские сборки: {len(self.brands)}")
+        print("=" * 60)
+
+        print("Базовый документ...")
+        self.render_docx()
+
+        results = {}
+        with tempfile.TemporaryDirectory(prefix="rop-white-label-") as work_path:
+            converter = None
+            if self.site:
+                from convert_to_mkdocs import MkDocsConverter
+
+                print("Базовый сайт...")
+                self.build_site(work_path)
+                converter = MkDocsConverter(self.base_path)
+
+            for name, brand in self.brands.items():
+                colors = self.brand_colors(brand)
+                print(f"Бренд {name}: акцент #{colors['accent']}, {brand.get('url', self.url)}")
+                with self.timer.stage("brand_docx", part=name):
+                    results[name] = [self.brand_docx(name, brand, colors)]
+                if self.site:
+                    with self.timer.stage("brand_site", part=name):
+                        results[name].append(self.brand_site(name, brand, colors, converter))
+
+        print("=" * 60)
+        print(f"ГОТОВО: {self.output_path}")
+        print("=" * 60)
+        return results
+
+
+def load_brands(brands_file):
+    with open(brands_file, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Партнёрские сборки инструкции: DOCX и сайт на каждый бренд')
+    parser.add_argument('brands', help='JSON с профилями брендов {имя: {logo, accent, link, url}}')
+    parser.add_argument('--output', default='white_label', help='Каталог результатов (по умолчанию white_label/)')
+    parser.add_argument('--edition', default=DEFAULT_EDITION, help=f'Редакция (по умолчанию {DEFAULT_EDITION})')
+    parser.add_argument('--no-site', action='store_true', help='Только DOCX, без сайта')
+    parser.add_argument('--timings', nargs='?', const='timings/white_label.json', metavar='JSON',
+                        help='Время по этапам и брендам (JSON, по умолчанию timings/white_label.json)')
+
+    args = parser.parse_args()
+    base_path = Path(__file__).parent.parent
+    timer = StageTimer()
+
+    WhiteLabelBuild(
+        base_path, load_brands(args.brands), base_path / args.output,
+        edition=args.edition, site=not args.no_site, timer=timer,
+    ).run()
+
+    if args.timings:
+        timer.print_summary()
+        timer.write_json(base_path / args.timings)
+
+
+if __name__ == "__main__":
+    main()